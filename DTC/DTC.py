@@ -2,6 +2,21 @@ import string
 import re
 import struct
 import os
+from functools import partial
+
+# Двоичный режим вывода: после сигнатуры идут единицы, тип которых задает первый байт
+#   0x00                     - литерал: длина в LEB128 и байты UTF-8 токенов не из библиотеки
+#   0x01 + n, n = 0..4       - код слова длиной n байт
+#   0x06 + n, n = 0..4       - код слова длиной n байт, за которым в тексте идет один пробел
+BINARY_MAGIC = b'DTCB\x01'
+BINARY_LITERAL = 0x00
+BINARY_CODE = 0x01
+BINARY_CODE_SPACE = 0x06
+MAX_CODE_LENGTH = 4
+WORD_PATTERN = re.compile(r'(\w+|[^\w\s]+|\s+)')
+# Двоичный режим читает и пишет файлы байтами: переводы строк не меняются, а
+# байты, которые не декодируются как UTF-8, проходят суррогатами как есть
+RAW_ERRORS = 'surrogateescape'
 
 def load_file(filename, encoding='utf-8'):
     """
@@ -32,6 +47,34 @@ def load_file(filename, encoding='utf-8'):
         print(f"Ошибка при чтении файла '{filename}': {e}")
         return ""
 
+def load_file_exact(filename):
+    """
+    Загружает файл байтами для двоичного режима: переводы строк не
+    преобразуются, байты не из UTF-8 (например, cp1251) сохраняются как есть.
+
+    :param filename: Имя файла.
+    :return: Строка с содержимым файла.
+    """
+    try:
+        with open(filename, 'rb') as file:
+            return file.read().decode('utf-8', RAW_ERRORS)
+    except IOError as e:
+        print(f"Ошибка при чтении файла '{filename}': {e}")
+        return ""
+
+def save_file_exact(filename, content):
+    """
+    Сохраняет строку из load_file_exact/decrypt_binary теми же байтами.
+
+    :param filename: Имя файла для сохранения.
+    :param content: Строка с содержимым.
+    """
+    try:
+        with open(filename, 'wb') as file:
+            file.write(content.encode('utf-8', RAW_ERRORS))
+    except IOError as e:
+        print(f"Ошибка при записи в файл '{filename}': {e}")
+
 def save_file(filename, content, encoding='utf-8'):
     """
     Сохраняет содержимое в текстовый файл с указанной кодировкой.
@@ -53,8 +96,7 @@ def split_into_words(text):
     :param text: Исходный текст.
     :return: Список слов и разделительных символов.
     """
-    pattern = r'(\w+|[^\w\s]+|\s+)'
-    return re.findall(pattern, text)
+    return WORD_PATTERN.findall(text)
 
 def load_binary_library(library_filename):
     """
@@ -67,7 +109,10 @@ def load_binary_library(library_filename):
     try:
         with open(library_filename, 'rb') as file:
             while True:
-                word_length = struct.unpack('I', file.read(4))[0]
+                header = file.read(4)
+                if len(header) < 4:
+                    break
+                word_length = struct.unpack('I', header)[0]
                 if word_length == 0:
                     break
                 word = file.read(word_length).decode('utf-8')
@@ -132,10 +177,11 @@ def save_binary_library(word_list, code_list, filename):
     try:
         with open(filename, 'wb') as file:
             for word, code in zip(word_list, code_list):
-                # Записываем длину слова
-                file.write(struct.pack('I', len(word)))
+                word_bytes = word.encode('utf-8')
+                # Записываем длину слова в байтах
+                file.write(struct.pack('I', len(word_bytes)))
                 # Записываем слово
-                file.write(word.encode('utf-8'))
+                file.write(word_bytes)
                 # Записываем длину кода
                 file.write(struct.pack('B', len(code) // 2))  # Делим на 2, так как hex_str - это строка из двух символов на байт
                 # Записываем код
@@ -143,13 +189,14 @@ def save_binary_library(word_list, code_list, filename):
     except IOError as e:
         print(f"Ошибка при записи в файл '{filename}': {e}")
 
-def process_files_in_folder(folder_path, output_folder, library_filename):
+def process_files_in_folder(folder_path, output_folder, library_filename, binary=False):
     """
     Обрабатывает все файлы в указанной папке, шифруя их.
 
     :param folder_path: Путь к папке с исходными файлами.
     :param output_folder: Путь к папке для сохранения зашифрованных файлов.
     :param library_filename: Имя файла библиотеки.
+    :param binary: Писать результат в двоичном режиме.
     """
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
@@ -162,17 +209,26 @@ def process_files_in_folder(folder_path, output_folder, library_filename):
             output_path = os.path.join(output_folder, output_filename)
             dynamic_library_filename = f"{base_name}.dtl"
             dynamic_library_path = os.path.join(output_folder, dynamic_library_filename)
-            encrypt_file(input_path, output_path, dynamic_library_path)
+            encrypt_file(input_path, output_path, dynamic_library_path, binary)
 
-def encrypt_file(input_filename, output_filename, library_filename):
+def encrypt_file(input_filename, output_filename, library_filename, binary=False):
     """
     Шифрует файл, используя библиотеку слов.
 
     :param input_filename: Имя входного файла.
     :param output_filename: Имя выходного файла.
     :param library_filename: Имя файла библиотеки.
+    :param binary: Двоичный режим: байты кодов вместо hex-строк через пробел.
     """
     library = load_binary_library(library_filename)
+    if binary:
+        text = load_file_exact(input_filename)
+        try:
+            with open(output_filename, 'wb') as file:
+                file.write(encrypt_binary(text, library))
+        except IOError as e:
+            print(f"Ошибка при записи в файл '{output_filename}': {e}")
+        return
     text = load_file(input_filename)
     encrypted_text = encrypt_text(text, library)
     save_file(output_filename, encrypted_text)
@@ -189,15 +245,167 @@ def encrypt_text(text, word_dict):
     encrypted_tokens = [word_dict.get(token.strip(), token) for token in tokens]
     return ' '.join(encrypted_tokens)
 
+def write_varint(out, value):
+    """
+    Дописывает число в формате LEB128.
+
+    :param out: bytearray для записи.
+    :param value: Неотрицательное целое число.
+    """
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    """
+    Читает число в формате LEB128.
+
+    :param data: Байты.
+    :param pos: Позиция начала числа.
+    :return: Кортеж (число, позиция после него).
+    """
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def binary_encode_units(word_dict):
+    """
+    Готовит единицы двоичного режима для слов библиотеки.
+
+    :param word_dict: Словарь с кодами слов (hex-строки, как из load_binary_library).
+    :return: Кортеж (слово -> единица кода, слово -> единица кода с пробелом).
+    """
+    codes = {word: bytes.fromhex(code) for word, code in word_dict.items()}
+    units = {word: bytes([BINARY_CODE + len(code)]) + code for word, code in codes.items()
+             if len(code) <= MAX_CODE_LENGTH}
+    spaced_units = {word: bytes([BINARY_CODE_SPACE + len(code)]) + code for word, code in codes.items()
+                    if len(code) <= MAX_CODE_LENGTH}
+    return units, spaced_units
+
+def encrypt_binary(text, word_dict, units=None):
+    """
+    Зашифровывает текст в двоичном режиме: коды пишутся сырыми байтами,
+    токены не из библиотеки - литералами. В отличие от текстового режима
+    пробелы и переводы строк сохраняются: decrypt_binary возвращает ту же
+    строку. Файл восстанавливается побайтно, если он прочитан
+    load_file_exact и записан save_file_exact (так делают encrypt_file и
+    decrypt_file); слова в кодировке не UTF-8 остаются литералами.
+
+    :param text: Исходный текст.
+    :param word_dict: Словарь с кодами слов (hex-строки, как из load_binary_library).
+    :param units: Готовый результат binary_encode_units(word_dict), чтобы не
+                  строить его заново для каждого текста.
+    :return: Зашифрованные байты.
+    """
+    units, spaced_units = units or binary_encode_units(word_dict)
+    tokens = split_into_words(text)
+    encrypted = bytearray(BINARY_MAGIC)
+    literal = []
+    i = 0
+    count = len(tokens)
+    while i < count:
+        token = tokens[i]
+        unit = units.get(token)
+        if unit is None:
+            literal.append(token)
+            i += 1
+            continue
+        if literal:
+            literal_bytes = ''.join(literal).encode('utf-8', RAW_ERRORS)
+            encrypted.append(BINARY_LITERAL)
+            write_varint(encrypted, len(literal_bytes))
+            encrypted += literal_bytes
+            literal.clear()
+        if i + 1 < count and tokens[i + 1] == ' ':
+            encrypted += spaced_units[token]
+            i += 2
+        else:
+            encrypted += unit
+            i += 1
+    if literal:
+        literal_bytes = ''.join(literal).encode('utf-8', RAW_ERRORS)
+        encrypted.append(BINARY_LITERAL)
+        write_varint(encrypted, len(literal_bytes))
+        encrypted += literal_bytes
+    return bytes(encrypted)
+
+def binary_decode_units(reverse_dict):
+    """
+    Готовит таблицу декодирования двоичного режима.
+
+    :param reverse_dict: Обратный словарь {код (bytes): слово}.
+    :return: Словарь {единица целиком (первый байт и код): слово или слово с пробелом}.
+    """
+    units = {}
+    for code, word in reverse_dict.items():
+        if len(code) <= MAX_CODE_LENGTH:
+            units[bytes([BINARY_CODE + len(code)]) + code] = word
+            units[bytes([BINARY_CODE_SPACE + len(code)]) + code] = word + ' '
+    return units
+
+def decrypt_binary(data, reverse_dict, units=None):
+    """
+    Расшифровывает результат encrypt_binary.
+
+    :param data: Зашифрованные байты (с сигнатурой BINARY_MAGIC).
+    :param reverse_dict: Обратный словарь {код (bytes): слово}.
+    :param units: Готовый результат binary_decode_units(reverse_dict).
+    :return: Исходный текст.
+    """
+    if not data.startswith(BINARY_MAGIC):
+        raise ValueError("Данные не в двоичном режиме DTC")
+    units = units or binary_decode_units(reverse_dict)
+    unit_lengths = [0] + [1 + n for n in range(MAX_CODE_LENGTH + 1)] * 2
+    parts = []
+    i = len(BINARY_MAGIC)
+    end = len(data)
+    while i < end:
+        lead = data[i]
+        if lead == BINARY_LITERAL:
+            length, i = read_varint(data, i + 1)
+            parts.append(data[i:i + length].decode('utf-8', RAW_ERRORS))
+            i += length
+        else:
+            unit_end = i + unit_lengths[lead]
+            parts.append(units[data[i:unit_end]])
+            i = unit_end
+    return ''.join(parts)
+
+def is_binary_file(filename):
+    """
+    Проверяет, записан ли файл в двоичном режиме.
+
+    :param filename: Имя файла.
+    :return: True, если файл начинается с BINARY_MAGIC.
+    """
+    try:
+        with open(filename, 'rb') as file:
+            return file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    except IOError:
+        return False
+
 def decrypt_file(input_filename, output_filename, library_filename):
     """
     Расшифровывает файл, используя библиотеку слов.
+    Двоичный режим определяется по сигнатуре файла.
 
     :param input_filename: Имя входного зашифрованного файла.
     :param output_filename: Имя выходного файла для сохранения расшифрованного текста.
     :param library_filename: Имя файла библиотеки.
     """
     library = load_binary_library(library_filename)
+    if is_binary_file(input_filename):
+        reverse_dict = {bytes.fromhex(code): word for word, code in library.items()}
+        with open(input_filename, 'rb') as file:
+            decrypted_text = decrypt_binary(file.read(), reverse_dict)
+        save_file_exact(output_filename, decrypted_text)
+        return
     reverse_dict = {code: word for word, code in library.items()}
     text = load_file(input_filename)
     decrypted_text = decrypt_text(text, reverse_dict)
@@ -218,25 +426,45 @@ def decrypt_text(encrypted_text, reverse_dict):
 def verify_files(original_folder, decrypted_folder):
     """
     Проверяет, совпадают ли оригинальные и расшифрованные файлы.
+    Файлы сравниваются как текст UTF-8 с универсальными переводами строк
+    (CRLF и LF считаются одинаковыми), но не загружаются целиком: текст
+    хешируется порциями, при нескольких парах - параллельно. Сообщается о
+    каждом несовпадении.
 
     :param original_folder: Путь к папке с оригинальными файлами.
     :param decrypted_folder: Путь к папке с расшифрованными файлами.
     :return: True, если все файлы совпадают, иначе False.
     """
-    for filename in os.listdir(original_folder):
+    try:
+        from .verify import file_digest
+    except ImportError:  # запуск как скрипта из папки DTC
+        from verify import file_digest
+
+    pairs = []
+    all_match = True
+    for filename in sorted(os.listdir(original_folder)):
         if filename.endswith('.txt'):
             original_path = os.path.join(original_folder, filename)
             decrypted_path = os.path.join(decrypted_folder, filename)
             if not os.path.exists(decrypted_path):
                 print(f"Файл '{decrypted_path}' не найден.")
-                return False
-            with open(original_path, 'r', encoding='utf-8') as original_file, open(decrypted_path, 'r', encoding='utf-8') as decrypted_file:
-                original_content = original_file.read()
-                decrypted_content = decrypted_file.read()
-                if original_content != decrypted_content:
-                    print(f"Файл '{filename}' не совпадает с расшифрованным файлом.")
-                    return False
-    return True
+                all_match = False
+            else:
+                pairs.append((filename, original_path, decrypted_path))
+
+    paths = [path for _, original_path, decrypted_path in pairs for path in (original_path, decrypted_path)]
+    text_digest = partial(file_digest, text=True)
+    if len(pairs) < 2:
+        digests = list(map(text_digest, paths))
+    else:
+        from concurrent.futures import ProcessPoolExecutor  # multiprocessing - только для пула
+        with ProcessPoolExecutor() as pool:
+            digests = list(pool.map(text_digest, paths))
+    for index, (filename, _, _) in enumerate(pairs):
+        if digests[2 * index] != digests[2 * index + 1]:
+            print(f"Файл '{filename}' не совпадает с расшифрованным файлом.")
+            all_match = False
+    return all_match
 
 def main():
     # Путь к папке с исходными текстовыми файлами
@@ -8,6 +8,9 @@ from collections import defaultdict
 from itertools import product
 import logging
 
+logger = logging.getLogger(__name__)
+
+
 class TextEncryptorDecryptor:
     """
     Класс для шифрования и дешифрования текстовых файлов с использованием динамических ключей переменной длины.
@@ -174,6 +177,7 @@ class TextEncryptorDecryptor:
 
             # Процесс дешифровки
             decrypted = []
+            replaced = 0  # Символы замены; в журнал пишется итог, а не каждый символ
             i = 0
             max_key_len = max(len(k) for k in dictionary.keys()) if dictionary else 1
 
@@ -198,9 +202,11 @@ class TextEncryptorDecryptor:
                             i += 1
                         except:
                             decrypted.append('\uFFFD')  # Символ замены
-                            logging.debug("Символ замены добавлен")
+                            replaced += 1
 
                     i += 1
+            if replaced:
+                logger.debug('Символов замены добавлено: %d', replaced)
 
             # Сохранение результата
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -3,7 +3,9 @@ import re
 from collections import defaultdict
 from itertools import product
 import logging
-import chardet
+
+logger = logging.getLogger(__name__)
+
 
 class TextEncryptorDecryptor:
     """
@@ -97,9 +99,10 @@ class TextEncryptorDecryptor:
             # Определение кодировки файла
             with open(os.path.join('txt', self.input_filename), 'rb') as f:
                 raw_data = f.read()
+                import chardet  # Импорт при первом вызове: заметно замедляет запуск процесса
                 result = chardet.detect(raw_data)
                 encoding = result['encoding']
-                logging.debug(f"Определена кодировка: {encoding}")
+                logger.debug('Определена кодировка: %s', encoding)
 
             # Чтение файла с учетом обнаруженной кодировки
             with open(os.path.join('txt', self.input_filename), 'r', encoding=encoding) as f:
@@ -174,11 +177,12 @@ class TextEncryptorDecryptor:
             # Извлечение кодировки из последних 20 байт
             encoded_encoding = encrypted_data[-20:]
             encoding = encoded_encoding.rstrip(b'\x00').decode('utf-8')
-            logging.debug(f"Извлечена кодировка: {encoding}")
+            logger.debug('Извлечена кодировка: %s', encoding)
             encrypted_data = encrypted_data[:-20]
 
             # Процесс дешифровки
             decrypted = []
+            replaced = 0  # Символы замены; в журнал пишется итог, а не каждый символ
             i = 0
             max_key_len = max(len(k) for k in dictionary.keys()) if dictionary else 1
             while i < len(encrypted_data):
@@ -202,8 +206,10 @@ class TextEncryptorDecryptor:
                             i += 1
                         except:
                             decrypted.append('\uFFFD')  # Символ замены
-                            logging.debug("Символ замены добавлен")
+                            replaced += 1
                     i += 1
+            if replaced:
+                logger.debug('Символов замены добавлено: %d', replaced)
 
             # Соединение расшифрованных частей
             decrypted_text = ''.join(decrypted)
@@ -6,7 +6,9 @@ import re
 from collections import defaultdict
 from itertools import product
 import logging
-import chardet
+
+logger = logging.getLogger(__name__)
+
 
 class TextEncryptorDecryptor:
     """
@@ -100,9 +102,10 @@ class TextEncryptorDecryptor:
             # Определение кодировки файла
             with open(os.path.join('txt', self.input_filename), 'rb') as f:
                 raw_data = f.read()
+                import chardet  # Импорт при первом вызове: заметно замедляет запуск процесса
                 result = chardet.detect(raw_data)
                 encoding = result['encoding']
-                logging.debug(f"Определена кодировка: {encoding}")
+                logger.debug('Определена кодировка: %s', encoding)
 
             # Чтение файла в бинарном режиме
             with open(os.path.join('txt', self.input_filename), 'rb') as f:
@@ -125,7 +128,6 @@ class TextEncryptorDecryptor:
                     # Кодирование специальных символов
                     if token == b'\t':
                         encrypted_data.extend(b'\x09')
-                        logging.debug(f"Токен является табуляцией: {token} -> \\t")
                     elif token == b'\n':
                         encrypted_data.extend(b'\x0A')
                         # logging.debug(f"Токен является новой строкой: {token} -> \\n")
@@ -134,7 +136,6 @@ class TextEncryptorDecryptor:
                         # logging.debug(f"Токен является новой строкой (CR+LF): {token} -> \\r\\n")
                     elif token == b'\xC2\xA0':
                         encrypted_data.extend(b'\xC2\xA0')
-                        logging.debug(f"Токен является непереносимым пробелом: {token} -> \\xa0")
                     else:
                         encrypted_data.extend(token)
                         # logging.debug(f"Токен добавлен как есть: {token}")
@@ -143,18 +144,18 @@ class TextEncryptorDecryptor:
             os.makedirs(os.path.dirname(output_dtc_path), exist_ok=True)
             with open(output_dtc_path, 'wb') as f:
                 f.write(encrypted_data)
-            logging.info(f"Зашифрованные данные сохранены в {output_dtc_path}")
+            logger.info('Зашифрованные данные сохранены в %s', output_dtc_path)
 
             # Сохранение словаря
             with open(output_dict_path, 'w', encoding='utf-8') as f:
                 for word, key in dictionary.items():
                     f.write(f"{key.hex()} {word.decode('utf-8')}\n")
-            logging.info(f"Словарь сохранен в {output_dict_path}")
+            logger.info('Словарь сохранен в %s', output_dict_path)
 
         except FileNotFoundError:
-            logging.error(f"Файл {self.input_filename} не найден")
+            logger.error('Файл %s не найден', self.input_filename)
         except Exception as e:
-            logging.error(f"Ошибка при шифровании: {str(e)}")
+            logger.error('Ошибка при шифровании: %s', e)
 
     def decrypt_file(self, input_dtc_path, output_path, dict_path):
         """
@@ -179,7 +180,7 @@ class TextEncryptorDecryptor:
                         key = bytes.fromhex(key_hex)
                         dictionary[key] = word.encode('utf-8')
                     except ValueError:
-                        logging.warning(f"Неверный формат ключа: {key_hex}")
+                        logger.warning('Неверный формат ключа: %s', key_hex)
 
             # Чтение зашифрованных данных
             with open(input_dtc_path, 'rb') as f:
@@ -208,12 +209,12 @@ class TextEncryptorDecryptor:
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             with open(output_path, 'wb') as f:
                 f.write(decrypted)
-            logging.info(f"Дешифрованные данные сохранены в {output_path}")
+            logger.info('Дешифрованные данные сохранены в %s', output_path)
 
         except FileNotFoundError:
-            logging.error(f"Файл {input_dtc_path} или {dict_path} не найден")
+            logger.error('Файл %s или %s не найден', input_dtc_path, dict_path)
         except Exception as e:
-            logging.error(f"Ошибка при дешифровании: {str(e)}")
+            logger.error('Ошибка при дешифровании: %s', e)
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -9,9 +9,11 @@ import re
 from collections import defaultdict
 from itertools import product
 import logging
-import chardet
 # import pyzpaq
 
+logger = logging.getLogger(__name__)
+
+
 class TextEncryptorDecryptor:
     """
     Класс для шифрования и дешифрования текстовых файлов с использованием динамических ключей переменной длины.
@@ -75,9 +77,10 @@ class TextEncryptorDecryptor:
         try:
             with open(os.path.join('txt', self.input_filename), 'rb') as f:
                 raw_data = f.read()
+                import chardet  # Импорт при первом вызове: заметно замедляет запуск процесса
                 result = chardet.detect(raw_data)
                 encoding = result['encoding']
-                logging.debug(f"Определена кодировка: {encoding}")
+                logger.debug('Определена кодировка: %s', encoding)
 
             with open(os.path.join('txt', self.input_filename), 'rb') as f:
                 data = f.read()
@@ -108,18 +111,18 @@ class TextEncryptorDecryptor:
             os.makedirs(os.path.dirname(output_dtc_path), exist_ok=True)
             with open(output_dtc_path, 'wb') as f:
                 f.write(encrypted_data)
-            logging.info(f"Зашифрованные данные сохранены в {output_dtc_path}")
+            logger.info('Зашифрованные данные сохранены в %s', output_dtc_path)
 
             os.makedirs(os.path.dirname(output_dict_path), exist_ok=True)
             with open(output_dict_path, 'wb') as f:
                 for word, key in dictionary.items():
                     f.write(key + b' ' + word + b'\n')
-            logging.info(f"Словарь сохранен в {output_dict_path}")
+            logger.info('Словарь сохранен в %s', output_dict_path)
 
         except FileNotFoundError:
-            logging.error(f"Файл {self.input_filename} не найден")
+            logger.error('Файл %s не найден', self.input_filename)
         except Exception as e:
-            logging.error(f"Ошибка при шифровании: {str(e)}")
+            logger.error('Ошибка при шифровании: %s', e)
 
     def decrypt_file(self, input_dtc_path, output_path, dict_path):
         try:
@@ -134,7 +137,7 @@ class TextEncryptorDecryptor:
                         dictionary[key] = word
                         # logging.debug(f"Загруженная запись из словаря (строка {line_number}): {key} -> {word}")
                     except ValueError:
-                        logging.error(f"Неверный формат записи в словаре (строка {line_number}): {line}")
+                        logger.error('Неверный формат записи в словаре (строка %s): %s', line_number, line)
                         continue
 
             with open(input_dtc_path, 'rb') as f:
@@ -144,9 +147,9 @@ class TextEncryptorDecryptor:
             try:
                 encoding = encoded_encoding.rstrip(b'\x00').decode('utf-8')
             except UnicodeDecodeError as e:
-                logging.error(f"Ошибка при декодировании кодировки: {str(e)}")
+                logger.error('Ошибка при декодировании кодировки: %s', e)
                 return
-            logging.debug(f"Извлечена кодировка: {encoding}")
+            logger.debug('Извлечена кодировка: %s', encoding)
             encrypted_data = encrypted_data[:-20]
 
             decrypted = bytearray()
@@ -171,20 +174,20 @@ class TextEncryptorDecryptor:
             try:
                 decrypted_text = decrypted.decode('utf-8')
                 decrypted_final = decrypted_text.encode(encoding)
-                logging.debug(f"Расшифрованный текст успешно сформирован")
+                logger.debug('Расшифрованный текст успешно сформирован')
             except UnicodeDecodeError as e:
-                logging.error(f"Ошибка при декодировании данных из UTF-8: {str(e)}")
+                logger.error('Ошибка при декодировании данных из UTF-8: %s', e)
                 return
 
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             with open(output_path, 'wb') as f:
                 f.write(decrypted_final)
-            logging.info(f"Дешифрованные данные сохранены в {output_path}")
+            logger.info('Дешифрованные данные сохранены в %s', output_path)
 
         except FileNotFoundError:
-            logging.error(f"Файл {input_dtc_path} или {dict_path} не найден")
+            logger.error('Файл %s или %s не найден', input_dtc_path, dict_path)
         except Exception as e:
-            logging.error(f"Ошибка при дешифровании: {str(e)}")
+            logger.error('Ошибка при дешифровании: %s', e)
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -2,11 +2,502 @@
 # Версия 1.4
 import os
 import re
+import time
+import codecs
+import hashlib
+import io
 import logging
-import chardet
-from collections import defaultdict
-from itertools import product
-import heapq
+import tracemalloc
+from contextlib import contextmanager
+from collections import Counter
+from itertools import islice, product
+
+try:
+    from .container import (MAGIC as CONTAINER_MAGIC, SECTION_DICTIONARY, SECTION_ENCODING,
+                            SECTION_HEADER, SECTION_PAYLOAD, ContainerReader, encode_header,
+                            write_container)
+except ImportError:  # запуск как скрипта из папки DTC
+    from container import (MAGIC as CONTAINER_MAGIC, SECTION_DICTIONARY, SECTION_ENCODING,
+                           SECTION_HEADER, SECTION_PAYLOAD, ContainerReader, encode_header,
+                           write_container)
+
+logger = logging.getLogger(__name__)
+
+CODEC_NAME = 'DTC_v1.4'
+
+TARGET_ENCODING = 'utf-8'
+TRANSCODE_CHUNK_SIZE = 1024 * 1024  # Размер порции при потоковой перекодировке
+DECODE_CHUNK_SIZE = 256 * 1024  # Байтов входа на порцию результата при потоковом декодировании
+ENGINE_AUTO = 'auto'
+ENGINE_PYTHON = 'python'
+ENGINE_NUMPY = 'numpy'
+NUMPY_CHUNK_BYTES = 1 << 20  # Байтов результата на один проход NumPy: ограничивает память индексов
+ENCODE_CHUNK_TOKENS = 4096  # Токенов на одну склейку: join держит по Py_buffer на фрагмент
+DIGEST_ALGORITHM = 'blake2b'  # Хеш исходного файла в заголовке контейнера
+DIGEST_SIZE = 32
+# Блок кодировки в конце .dtc без контейнера: имя кодировки, дополненное нулями.
+# Последний байт TRAILER_DIGEST - перед блоком лежат DIGEST_SIZE байтов BLAKE2b
+# исходного файла; в старых файлах он нулевой и хеша нет
+ENCODING_BLOCK_SIZE = 20
+TRAILER_DIGEST = 0x01
+UTF8_COMPATIBLE = {'ascii', 'utf-8'}
+
+# Однобайтовые кодовые страницы, которые можно токенизировать без перевода в UTF-8
+SINGLE_BYTE_CODEPAGES = {'cp1251', 'koi8-r', 'koi8-u', 'cp866', 'iso8859-5', 'mac-cyrillic'}
+NATIVE_PREFIX = 'raw:'  # Признак данных в исходной кодовой странице в блоке кодировки
+ASCII_SEPARATOR_BYTES = (
+    {0x00, 0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x20}
+    | set(range(0x21, 0x30)) | set(range(0x3A, 0x41))
+    | set(range(0x5B, 0x61)) | set(range(0x7B, 0x7F))
+)
+# Разделители вне ASCII; их байт свой в каждой кодовой странице
+EXTRA_SEPARATOR_CHARS = '\xa0«»„“”–—…'
+
+# Формат .dtc с escape-байтом: длина ключа определяется первым байтом,
+# поэтому под ключи доступны все 255 ненулевых значений.
+#   0x00                   - литерал: varint-длина и сырые байты
+#   0x01..N                - однобайтовый ключ
+#   N+1..0xFE + 1 байт     - двухбайтовый ключ
+#   0xFF + 3 байта         - четырехбайтовый ключ
+# Граница N подбирается под размер словаря и хранится в заголовке .dtl.
+LAYOUT_CLASSIC = 'classic'
+LAYOUT_ESCAPE = 'escape'
+ESCAPE_MAGIC = b'DTCE\x00'
+ESCAPE_DICT_MAGIC = b'DTLE\x00'
+ESCAPE_DICT_COUNTS_MAGIC = b'DTLE\x01'  # После каждого слова - его частота (LEB128)
+ESCAPE_LITERAL = 0x00
+ESCAPE_LONG_LEAD = 0xFF
+ESCAPE_MIN_ONE_BYTE_KEYS = 64
+ESCAPE_LONG_KEYS = 1 << 24
+
+
+def normalize_encoding(name):
+    """Каноническое имя кодировки (None считается UTF-8)"""
+    return codecs.lookup(name or TARGET_ENCODING).name
+
+
+def same_encoding(source, target):
+    """True, если байты в кодировке source уже являются байтами в target"""
+    source, target = normalize_encoding(source), normalize_encoding(target)
+    return source == target or (source in UTF8_COMPATIBLE and target in UTF8_COMPATIBLE)
+
+
+def transcode_pieces(pieces, source, target):
+    """Потоковая перекодировка последовательности порций: отдает порции байтов в кодировке target"""
+    decoder = codecs.getincrementaldecoder(normalize_encoding(source))()
+    encoder = codecs.getincrementalencoder(normalize_encoding(target))()
+    for piece in pieces:
+        text = decoder.decode(piece)
+        if text:
+            yield encoder.encode(text)
+    tail = encoder.encode(decoder.decode(b'', final=True), final=True)
+    if tail:
+        yield tail
+
+
+def iter_transcode(data, source, target, chunk_size=TRANSCODE_CHUNK_SIZE):
+    """Потоковая перекодировка: отдает порции байтов в кодировке target"""
+    view = memoryview(data)
+    return transcode_pieces((view[start:start + chunk_size] for start in range(0, len(view), chunk_size)),
+                            source, target)
+
+
+def transcode(data, source, target=TARGET_ENCODING, chunk_size=TRANSCODE_CHUNK_SIZE):
+    """Перекодировка без промежуточной строки; при совпадении кодировок данные не копируются"""
+    if same_encoding(source, target):
+        return data
+    result = bytearray()
+    for piece in iter_transcode(data, source, target, chunk_size):
+        result += piece
+    return result
+
+
+def separator_table(codepage):
+    """Множество байтов-разделителей для однобайтовой кодовой страницы"""
+    table = set(ASCII_SEPARATOR_BYTES)
+    for char in EXTRA_SEPARATOR_CHARS:
+        try:
+            table.add(char.encode(codepage)[0])
+        except UnicodeEncodeError:
+            continue
+    return frozenset(table)
+
+
+SEPARATOR_TABLES = {codepage: separator_table(codepage) for codepage in SINGLE_BYTE_CODEPAGES}
+
+
+def byte_class_pattern(separator_bytes):
+    """Регулярное выражение: одиночный разделитель или слово из остальных байтов"""
+    byte_class = b''.join(b'\\x%02x' % b for b in sorted(separator_bytes))
+    return re.compile(b'[' + byte_class + b']|[^' + byte_class + b']+')
+
+
+# Токенизаторы кодовых страниц компилируются один раз на процесс
+CODEPAGE_PATTERNS = {codepage: byte_class_pattern(table) for codepage, table in SEPARATOR_TABLES.items()}
+
+
+def write_varint(out, value):
+    """Дописывает в bytearray число в формате LEB128"""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    """Читает число LEB128; возвращает (значение, позиция после него)"""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def escape_one_byte_keys(vocabulary_size):
+    """Число однобайтовых ключей: максимум, при котором словарь помещается в два байта"""
+    fit = ((ESCAPE_LONG_LEAD - 1) * 256 - vocabulary_size) // 255
+    return max(ESCAPE_MIN_ONE_BYTE_KEYS, min(ESCAPE_LONG_LEAD - 1, fit))
+
+
+def escape_key(rank, one_byte_keys):
+    """Ключ escape-формата для слова с номером rank в словаре"""
+    if rank < one_byte_keys:
+        return bytes([rank + 1])
+    rank -= one_byte_keys
+    two_byte_keys = (ESCAPE_LONG_LEAD - 1 - one_byte_keys) * 256
+    if rank < two_byte_keys:
+        return bytes([one_byte_keys + 1 + rank // 256, rank % 256])
+    rank -= two_byte_keys
+    if rank < ESCAPE_LONG_KEYS:
+        return bytes([ESCAPE_LONG_LEAD]) + rank.to_bytes(3, 'big')
+    raise ValueError("Словарь слишком велик для escape-формата")
+
+
+def fill_exact(size, pieces, trailer=b'', chunk_tokens=ENCODE_CHUNK_TOKENS):
+    """
+    Собирает данные в буфер заранее известного размера: буфер выделяется
+    один раз, порции склеиваются b''.join и копируются срезом через memoryview.
+
+    :param size: Точный размер результата вместе с trailer.
+    :param pieces: Итератор фрагментов (bytes).
+    :param trailer: Байты в конце буфера.
+    :return: bytearray размера size.
+    """
+    encrypted = bytearray(size)
+    view = memoryview(encrypted)
+    pos = 0
+    while True:
+        chunk = b''.join(islice(pieces, chunk_tokens))
+        if not chunk:
+            break
+        end = pos + len(chunk)
+        if end > size:
+            raise ValueError("Данные больше расчетного размера")
+        view[pos:end] = chunk
+        pos = end
+    view[pos:pos + len(trailer)] = trailer
+    if pos + len(trailer) != size:
+        raise ValueError("Данные меньше расчетного размера")
+    return encrypted
+
+
+def count_tokens(tokens, skip=None):
+    """
+    Частоты токенов одним проходом Counter - подсчет идет на C, без вызова
+    Python-кода на каждое вхождение. Фильтр skip (например, разделители)
+    вызывается только для различных токенов.
+    """
+    counts = Counter(tokens)
+    if skip is not None:
+        for token in [token for token in counts if skip(token)]:
+            del counts[token]
+    return counts
+
+
+def load_numpy():
+    """
+    NumPy импортируется при первом обращении, а не при импорте модуля:
+    он необязателен и заметно замедляет запуск. None, если не установлен.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def detect_charset(raw_data):
+    """chardet.detect с отложенным импортом chardet (тяжелый импорт при запуске процесса)"""
+    import chardet
+    return chardet.detect(raw_data)
+
+
+def resolve_engine(engine):
+    """
+    Выбор движка кодирования: 'auto' - NumPy, если он установлен.
+    Без NumPy 'numpy' заменяется на 'python' с предупреждением.
+    """
+    if engine not in (ENGINE_AUTO, ENGINE_PYTHON, ENGINE_NUMPY):
+        raise ValueError(f"Неизвестный движок кодирования: {engine}")
+    if engine == ENGINE_PYTHON:
+        return engine
+    if load_numpy() is None:
+        if engine == ENGINE_NUMPY:
+            logger.warning("NumPy не установлен, используется движок 'python'")
+        return ENGINE_PYTHON
+    return ENGINE_NUMPY
+
+
+def fill_numpy(tokens, pieces_of, trailer=b'', chunk_bytes=NUMPY_CHUNK_BYTES):
+    """
+    Векторное кодирование: токены заменяются целыми ID, байты всех
+    различных токенов лежат подряд в одном буфере со смещениями, и для
+    каждой порции результата байты собираются одной выборкой по индексам
+    (np.repeat + arange). Память и время пропорциональны размеру
+    результата, а не длине самого длинного токена.
+
+    :param tokens: Список токенов.
+    :param pieces_of: Функция токен -> байты результата (вызывается для
+                      различных токенов, а не для каждого вхождения).
+    :param trailer: Байты в конце буфера.
+    :param chunk_bytes: Примерный размер порции результата на один проход.
+    :return: bytearray с результатом (тот же, что у fill_exact).
+    """
+    np = load_numpy()
+    ids_of = {}
+    pieces = []
+    for token in dict.fromkeys(tokens):
+        ids_of[token] = len(pieces)
+        pieces.append(pieces_of(token))
+    piece_lengths = np.fromiter(map(len, pieces), dtype=np.int64, count=len(pieces))
+    piece_offsets = np.cumsum(piece_lengths) - piece_lengths
+    flat = np.frombuffer(b''.join(pieces), dtype=np.uint8)
+
+    ids = np.fromiter(map(ids_of.__getitem__, tokens), dtype=np.int32, count=len(tokens))
+    ends = np.cumsum(piece_lengths[ids])
+    payload_size = int(ends[-1]) if len(ends) else 0
+    encrypted = bytearray(payload_size + len(trailer))
+    out = np.frombuffer(encrypted, dtype=np.uint8)
+    start = pos = 0
+    while start < len(ids):
+        # Порция - токены, которые заканчиваются в пределах chunk_bytes (хотя бы один)
+        stop = max(start + 1, int(np.searchsorted(ends, pos + chunk_bytes, side='right')))
+        chunk = ids[start:stop]
+        lengths = piece_lengths[chunk]
+        total = int(ends[stop - 1]) - pos
+        # Индекс байта в flat: начало куска токена + номер байта внутри куска
+        shifts = piece_offsets[chunk] - (np.cumsum(lengths) - lengths)
+        out[pos:pos + total] = flat[np.repeat(shifts, lengths) + np.arange(total)]
+        start, pos = stop, pos + total
+    out[pos:] = np.frombuffer(trailer, dtype=np.uint8)
+    return encrypted
+
+
+def format_digest(hash_object):
+    """Хеш в виде 'blake2b:<hex>' для заголовка контейнера"""
+    return f"{DIGEST_ALGORITHM}:{hash_object.hexdigest()}"
+
+
+def new_digest(data=b''):
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE)
+
+
+def encoding_block(encoding, digest=None):
+    """
+    Хвост .dtc без контейнера: блок кодировки, а при digest
+    ('blake2b:<hex>') - хеш исходного файла перед ним.
+    """
+    block = encoding.encode('utf-8').ljust(ENCODING_BLOCK_SIZE - 1, b'\x00')
+    if digest is None:
+        return block + b'\x00'
+    return bytes.fromhex(digest.split(':', 1)[1]) + block + bytes([TRAILER_DIGEST])
+
+
+def read_trailer(f):
+    """
+    Читает хвост .dtc без контейнера из файла с произвольным доступом.
+
+    :return: (размер данных без хвоста, кодировка, хеш исходного файла или None).
+    """
+    f.seek(-ENCODING_BLOCK_SIZE, os.SEEK_END)
+    payload_size = f.tell()
+    block = f.read(ENCODING_BLOCK_SIZE)
+    encoding = block.split(b'\x00')[0].decode('utf-8')
+    if block[-1] != TRAILER_DIGEST:
+        return payload_size, encoding, None
+    payload_size -= DIGEST_SIZE
+    f.seek(payload_size)
+    return payload_size, encoding, format_digest_bytes(f.read(DIGEST_SIZE))
+
+
+def format_digest_bytes(digest):
+    """Хеш из байтов хвоста .dtc в формате заголовка контейнера"""
+    return f"{DIGEST_ALGORITHM}:{digest.hex()}"
+
+
+class DigestWriter:
+    """Файлоподобный приемник: вместо записи считает хеш и размер"""
+
+    def __init__(self):
+        self.hash = new_digest()
+        self.size = 0
+
+    def write(self, data):
+        self.hash.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.size
+
+    def digest(self):
+        return format_digest(self.hash)
+
+
+def write_transcoded(f, data, source, target, chunk_size=TRANSCODE_CHUNK_SIZE):
+    """Запись данных в файл с перекодировкой порциями; возвращает число записанных байтов"""
+    if same_encoding(source, target):
+        f.write(data)
+        return len(data)
+    written = 0
+    for piece in iter_transcode(data, source, target, chunk_size):
+        f.write(piece)
+        written += len(piece)
+    return written
+
+
+def collect(pieces):
+    """Склеивает порции в один bytearray"""
+    result = bytearray()
+    for piece in pieces:
+        result += piece
+    return result
+
+
+def read_input(source):
+    """Байты источника: bytes-подобный объект, открытый двоичный файл или путь"""
+    if isinstance(source, memoryview):
+        return source.tobytes()
+    if isinstance(source, (bytes, bytearray)):
+        return source
+    if hasattr(source, 'read'):
+        return source.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+@contextmanager
+def open_input(source):
+    """
+    Источник для чтения с произвольным доступом: открытый файл передается
+    как есть, путь открывается и закрывается, байты оборачиваются в BytesIO.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+        return
+    if hasattr(source, 'read'):
+        yield source
+        return
+    with open(source, 'rb') as f:
+        yield f
+
+
+@contextmanager
+def open_output(target):
+    """Приемник для записи: открытый файл передается как есть, путь открывается и закрывается"""
+    if hasattr(target, 'write'):
+        yield target
+        return
+    with open(target, 'wb') as f:
+        yield f
+
+
+class StageStats:
+    """Замер одного этапа конвейера"""
+    def __init__(self, name, bytes_in=0):
+        self.name = name
+        self.bytes_in = bytes_in
+        self.bytes_out = 0
+        self.items = 0
+        self.seconds = 0.0
+        self.allocated = None  # Прирост памяти за этап (при trace_memory)
+        self.peak = None  # Пик памяти сверх уровня начала этапа
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+class PipelineStats:
+    """
+    Опциональная статистика шифрования/дешифрования по этапам.
+    trace_memory включает tracemalloc, profile - cProfile на время этапов.
+    """
+    def __init__(self, trace_memory=False, profile=False):
+        self.stages = []
+        self.trace_memory = trace_memory
+        self.profiler = None
+        if profile:
+            import cProfile
+            self.profiler = cProfile.Profile()
+
+    @contextmanager
+    def stage(self, name, bytes_in=0):
+        record = StageStats(name, bytes_in)
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        if self.profiler:
+            self.profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            if self.profiler:
+                self.profiler.disable()
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                record.allocated = current - memory_before
+                record.peak = peak - memory_before
+            if started_tracing:
+                tracemalloc.stop()
+            self.stages.append(record)
+
+    @property
+    def total_seconds(self):
+        return sum(record.seconds for record in self.stages)
+
+    def as_dict(self):
+        return {'total_seconds': self.total_seconds, 'stages': [record.as_dict() for record in self.stages]}
+
+    def report(self):
+        """Текстовая таблица этапов"""
+        lines = []
+        for record in self.stages:
+            line = (f"{record.name:<26}{record.seconds * 1000:10.1f} мс"
+                    f"{record.bytes_in:>14} -> {record.bytes_out:<14}")
+            if record.items:
+                line += f" элементов: {record.items}"
+            if record.peak is not None:
+                line += f" пик памяти: {record.peak}"
+            lines.append(line)
+        lines.append(f"{'итого':<26}{self.total_seconds * 1000:10.1f} мс")
+        return '\n'.join(lines)
+
+    def profile_report(self, sort='cumulative', limit=20):
+        """Сводка cProfile (пустая строка, если профилирование выключено)"""
+        if not self.profiler:
+            return ''
+        import pstats
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
 
 
 class TextProcessor:
@@ -25,55 +516,117 @@ class TextProcessor:
         b'\xAB',
         b'\xBB',
         b'\xBD',
-        b'\xE2\x80\x9C',  # «
-        b'\xE2\x80\x9D',  # »
+        b'\xE2\x80\x9C',  # “
+        b'\xE2\x80\x9D',  # ”
     }
 
-    def __init__(self, input_filename):
+    # Слово заканчивается и перед кавычками “ ”: их первый байт 0xE2 не входит
+    # в класс разделителей, и без проверки кавычка попадала внутрь слова
+    UTF8_TOKEN_PATTERN = re.compile(
+        b'((' + b'|'.join(re.escape(sep) for sep in MULTIBYTE_SEPARATORS) + b')'
+        b'|[\x00-\x20\xA0\xC2\x21-\x2F\x3A-\x40\x5B-\x60\x7B-\x7E])'
+        b'|((?:[^\x00-\x20\xA0\xC2\x21-\x2F\x3A-\x40\x5B-\x60\x7B-\x7E\xE2]+|\xE2(?!\x80[\x9C\x9D]))+)'
+    )
+
+    def __init__(self, input_filename='', native_codepage=False):
         self.input_filename = input_filename
         self.base_name = os.path.splitext(input_filename)[0]
+        # native_codepage: токенизировать cp1251/KOI8 и т.п. без перевода в UTF-8
+        self.native_codepage = native_codepage
+        self.reset()
+
+    def reset(self):
+        """Сбрасывает состояние последнего файла: объект готов к следующему"""
         self.encoding_info = None
+        self.input_size = 0
+        self.input_digest = None
+        self.working_encoding = TARGET_ENCODING
+        self.forbidden_bytes = self.FORBIDDEN_BYTES
+        self.multibyte_separators = self.MULTIBYTE_SEPARATORS
+        self.token_pattern = self.UTF8_TOKEN_PATTERN
+
+    def use_codepage(self, codepage):
+        """Переключает токенизатор и ключи на таблицу разделителей кодовой страницы"""
+        self.working_encoding = codepage
+        self.forbidden_bytes = SEPARATOR_TABLES[codepage]
+        self.multibyte_separators = set()
+        self.token_pattern = CODEPAGE_PATTERNS[codepage]
 
     def load_and_detect_encoding(self):
         with open(os.path.join('txt', self.input_filename), 'rb') as f:
-            raw_data = f.read()
-            result = chardet.detect(raw_data)
-            self.encoding_info = result
-            return raw_data.decode(result['encoding']).encode('utf-8')
+            return self.detect_encoding(f.read())
+
+    def detect_encoding(self, raw_data):
+        """Определяет кодировку данных и возвращает их в рабочей кодировке"""
+        self.reset()
+        self.input_size = len(raw_data)
+        self.input_digest = format_digest(new_digest(raw_data))
+        result = detect_charset(raw_data)
+        result['encoding'] = result['encoding'] or TARGET_ENCODING
+        self.encoding_info = result
+        encoding = normalize_encoding(result['encoding'])
+        if self.native_codepage and encoding in SINGLE_BYTE_CODEPAGES:
+            self.use_codepage(encoding)
+            return raw_data
+        try:
+            return transcode(raw_data, result['encoding'], TARGET_ENCODING)
+        except UnicodeError:
+            # Двоичные данные или ошибка определения: байты кодируются как есть,
+            # блок кодировки UTF-8 восстанавливает их без перекодировки
+            logger.warning('Данные не декодируются как %s, перекодировка пропущена', result['encoding'])
+            result['encoding'] = TARGET_ENCODING
+            return raw_data
+
+    def stored_encoding(self):
+        """Значение блока кодировки в конце .dtc"""
+        if self.working_encoding != TARGET_ENCODING:
+            return NATIVE_PREFIX + self.working_encoding
+        return self.encoding_info['encoding']
 
     def tokenize(self, data):
         """Токенизация с учетом многобайтовых разделителей"""
-        separators = b'|'.join(re.escape(sep) for sep in self.MULTIBYTE_SEPARATORS)
-        pattern = re.compile(
-            b'((' + separators + b')|[\x00-\x20\xA0\xC2\x21-\x2F\x3A-\x40\x5B-\x60\x7B-\x7E])'
-            b'|([^\x00-\x20\xA0\xC2\x21-\x2F\x3A-\x40\x5B-\x60\x7B-\x7E]+)'
-        )
-        return (match.group(0) for match in pattern.finditer(data))
+        return (match.group(0) for match in self.token_pattern.finditer(data))
 
 
 class AdvancedEncoder(TextProcessor):
-    def __init__(self, *args, max_key_length=5, **kwargs):
+    def __init__(self, *args, max_key_length=5, layout=LAYOUT_CLASSIC, min_count=2, engine=ENGINE_PYTHON,
+                 **kwargs):
         super().__init__(*args, **kwargs)
         self.max_key_length = max_key_length
+        # engine: 'numpy' - векторное кодирование classic-формата, 'python' - fill_exact,
+        # 'auto' - NumPy, если установлен; результат одинаковый. По умолчанию 'python':
+        # перевод токенов-bytes в ID на Python стоит столько же, сколько fill_exact целиком
+        self.engine = resolve_engine(engine)
+        # layout=LAYOUT_ESCAPE: ключи всем токенам, включая разделители;
+        # токены, встречающиеся реже min_count раз, пишутся литералами
+        self.layout = layout
+        self.min_count = min_count
+
+    def reset(self):
+        super().reset()
+        self.one_byte_keys = 0
         self.word_dictionary = {}
         self.reverse_dictionary = {}
+        # Частоты слов словаря; сохраняются в .dtl для статистики без дешифрования
+        self.word_counts = {}
 
     def is_separator(self, token):
         if len(token) == 1:
-            return token[0] in self.FORBIDDEN_BYTES
-        return token in self.MULTIBYTE_SEPARATORS
+            return token[0] in self.forbidden_bytes
+        return token in self.multibyte_separators
 
     def generate_keys(self):
-        allowed_bytes = [b for b in range(0x01, 0x100) if b not in self.FORBIDDEN_BYTES]
+        allowed_bytes = [b for b in range(0x01, 0x100) if b not in self.forbidden_bytes]
         for length in range(1, self.max_key_length + 1):
             for combo in product(allowed_bytes, repeat=length):
                 yield bytes(combo)
 
     def build_dictionary(self, tokens):
-        frequency = defaultdict(int)
-        for token in tokens:
-            if not self.is_separator(token):
-                frequency[token] += 1
+        if self.layout == LAYOUT_ESCAPE:
+            return self.build_escape_dictionary(tokens)
+
+        self.word_dictionary = {}
+        frequency = count_tokens(tokens, self.is_separator)
 
         # Улучшенная сортировка с приоритетами
         sorted_words = sorted(
@@ -92,93 +645,473 @@ class AdvancedEncoder(TextProcessor):
                     self.word_dictionary[word] = key
                     used_keys.add(key)
                     break
+        self.word_counts = frequency
+
+    def build_escape_dictionary(self, tokens):
+        self.word_dictionary = {}
+        self.word_counts = {}
+        frequency = count_tokens(tokens)
+
+        sorted_words = sorted(
+            (item for item in frequency.items() if item[1] >= self.min_count),
+            key=lambda x: (-x[1], -len(x[0]), x[0])
+        )
+        self.one_byte_keys = escape_one_byte_keys(len(sorted_words))
+        for rank, (word, count) in enumerate(sorted_words):
+            self.word_dictionary[word] = escape_key(rank, self.one_byte_keys)
+            self.word_counts[word] = count
 
     def encrypt_data(self, tokens):
-        encrypted = bytearray()
+        if self.layout == LAYOUT_ESCAPE:
+            return self.encrypt_data_escape(tokens)
+
+        if not isinstance(tokens, list):
+            tokens = list(tokens)
+        keys = self.word_dictionary
+        trailer = encoding_block(self.stored_encoding())
+        if self.engine == ENGINE_NUMPY:
+            return fill_numpy(tokens, lambda token: keys.get(token, token), trailer)
+        # Точный размер из частот словаря: каждое вхождение слова заменяется
+        # ключом, разделители переносятся как есть
+        size = sum(map(len, tokens)) + len(trailer) + sum(
+            count * (len(keys[word]) - len(word)) for word, count in self.word_counts.items())
+        # Разделителей нет в словаре, get(token, token) возвращает их самих
+        return fill_exact(size, map(keys.get, tokens, tokens), trailer)
+
+    def encrypt_data_escape(self, tokens):
+        encrypted = bytearray(ESCAPE_MAGIC)
+        literal = bytearray()
         for token in tokens:
-            if self.is_separator(token):
-                encrypted.extend(token)
-            else:
-                encrypted.extend(self.word_dictionary[token])
-        encrypted += self.encoding_info['encoding'].encode('utf-8').ljust(20, b'\x00')
+            key = self.word_dictionary.get(token)
+            if key is None:
+                literal += token
+                continue
+            if literal:
+                encrypted.append(ESCAPE_LITERAL)
+                write_varint(encrypted, len(literal))
+                encrypted += literal
+                literal.clear()
+            encrypted += key
+        if literal:
+            encrypted.append(ESCAPE_LITERAL)
+            write_varint(encrypted, len(literal))
+            encrypted += literal
+        encrypted += encoding_block(self.stored_encoding())
         return encrypted
 
-    def encrypt_file(self, output_dtc, output_dict):
-        try:
-            data = self.load_and_detect_encoding()
+    def write_dictionary(self, f):
+        """Словарь вместе с частотами слов: 'ключ слово частота' по строкам или escape-формат"""
+        counts = self.word_counts
+        if self.layout == LAYOUT_ESCAPE:
+            # Ключ однозначно следует из номера слова, поэтому хранятся только слова
+            entries = bytearray(ESCAPE_DICT_COUNTS_MAGIC)
+            entries.append(self.one_byte_keys)
+            for word in self.word_dictionary:
+                write_varint(entries, len(word))
+                entries += word
+                write_varint(entries, counts[word])
+            f.write(entries)
+            return
+        for word, key in self.word_dictionary.items():
+            f.write(key + b' ' + word + b' %d\n' % counts[word])
+
+    def prepare_tokens(self, stats, raw_data=None):
+        """
+        Общие этапы: чтение, токенизация и построение словаря.
+        raw_data: исходные байты; по умолчанию читается файл из папки txt.
+        """
+        with stats.stage('load_and_detect_encoding') as stage:
+            data = self.load_and_detect_encoding() if raw_data is None else self.detect_encoding(raw_data)
+            stage.bytes_in = self.input_size
+            stage.bytes_out = len(data)
+        with stats.stage('tokenize', len(data)) as stage:
             tokens = list(self.tokenize(data))
+            stage.bytes_out = len(data)
+            stage.items = len(tokens)
+        with stats.stage('build_dictionary', len(data)) as stage:
             self.build_dictionary(tokens)
+            stage.items = len(self.word_dictionary)
+        return data, tokens
 
-            with open(output_dict, 'wb') as f:
-                for word, key in self.word_dictionary.items():
-                    f.write(key + b' ' + word + b'\n')
+    def encrypt_file(self, output_dtc, output_dict, stats=None):
+        """stats: PipelineStats для замеров по этапам (необязательно)"""
+        stats = stats or PipelineStats()
+        try:
+            data, tokens = self.prepare_tokens(stats)
 
-            encrypted = self.encrypt_data(tokens)
-            with open(output_dtc, 'wb') as f:
-                f.write(encrypted)
+            with stats.stage('write_dictionary') as stage, open(output_dict, 'wb') as f:
+                self.write_dictionary(f)
+                stage.bytes_out = f.tell()
 
-            logging.info(f"Файл зашифрован: {output_dtc}")
+            with stats.stage('encrypt_data', len(data)) as stage:
+                encrypted = self.encrypt_data(tokens)
+                stage.bytes_out = len(encrypted)
+            with stats.stage('write_payload', len(encrypted)) as stage, open(output_dtc, 'wb') as f:
+                # Блок кодировки из encrypt_data заменяется хвостом с хешом исходного файла
+                f.write(memoryview(encrypted)[:-ENCODING_BLOCK_SIZE])
+                f.write(encoding_block(self.stored_encoding(), self.input_digest))
+                stage.bytes_out = f.tell()
+
+            logger.info('Файл зашифрован: %s', output_dtc)
+            return True
+
+        except Exception as e:
+            logger.error('Ошибка: %s', e)
+            return False
+
+    def encrypt_to_container(self, output_path, compression='zlib', payload_compression=None, stats=None):
+        """
+        Шифрует файл в однофайловый контейнер (см. container.py).
+        compression: сжатие секции словаря - None, 'zlib', 'bz2', 'lzma' (можно с уровнем, 'lzma:9').
+        payload_compression: второй этап сжатия данных после замены слов ключами.
+        """
+        try:
+            with open(output_path, 'wb') as f:
+                self.encode_container(f, None, compression, payload_compression, stats)
+            logger.info('Файл зашифрован: %s', output_path)
             return True
 
         except Exception as e:
-            logging.error(f"Ошибка: {str(e)}")
+            logger.error('Ошибка: %s', e)
             return False
 
+    def encode_container(self, f, raw_data=None, compression='zlib', payload_compression=None, stats=None):
+        """
+        Шифрует данные в контейнер, записывая его в открытый двоичный файл.
+        В отличие от encrypt_to_container ошибки не перехватываются.
+
+        :param raw_data: Исходные байты; None - файл input_filename из папки txt.
+        :return: Число записанных байтов.
+        """
+        stats = stats or PipelineStats()
+        data, tokens = self.prepare_tokens(stats, raw_data)
+
+        with stats.stage('write_dictionary') as stage:
+            dictionary = io.BytesIO()
+            self.write_dictionary(dictionary)
+            stage.bytes_out = dictionary.tell()
+
+        with stats.stage('encrypt_data', len(data)) as stage:
+            encrypted = self.encrypt_data(tokens)
+            stage.bytes_out = len(encrypted)
+
+        header = encode_header({
+            'codec': CODEC_NAME,
+            'layout': self.layout,
+            'payload_compression': payload_compression or 'none',
+            'digest': self.input_digest,
+        })
+        # Блок кодировки в конце encrypt_data заменяется секцией контейнера
+        payload = memoryview(encrypted)[:-ENCODING_BLOCK_SIZE]
+        with stats.stage('write_container', len(encrypted)) as stage:
+            stage.bytes_out = write_container(f, [
+                (SECTION_HEADER, header, None),
+                (SECTION_ENCODING, self.stored_encoding().encode('utf-8'), None),
+                (SECTION_DICTIONARY, dictionary.getvalue(), compression),
+                (SECTION_PAYLOAD, payload, payload_compression),
+            ])
+        return stage.bytes_out
+
 
 class AdvancedDecoder(TextProcessor):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    def reset(self):
+        super().reset()
+        self.clear_dictionary()
+
+    def clear_dictionary(self):
         self.reverse_dict = {}
         self.max_key_len = 0
+        self.escape_words = []
+        self.one_byte_keys = 0
+        self.word_counts = {}
+        self.dictionary_data = None  # Данные загруженного словаря
 
     def load_dictionary(self, dict_path):
         with open(dict_path, 'rb') as f:
-            for line in f:
-                key, word = line.strip().split(b' ', 1)
+            self.load_dictionary_data(f.read())
+
+    def load_dictionary_data(self, data):
+        """
+        Загрузка словаря вместо предыдущего; частоты (если записаны) попадают
+        в word_counts. Повторная загрузка тех же данных ничего не делает.
+        """
+        if self.dictionary_data is not None and data == self.dictionary_data:
+            return
+        self.clear_dictionary()
+        self.dictionary_data = data
+        if data.startswith(ESCAPE_DICT_MAGIC) or data.startswith(ESCAPE_DICT_COUNTS_MAGIC):
+            self.load_escape_dictionary(data[len(ESCAPE_DICT_MAGIC):],
+                                        counts=data.startswith(ESCAPE_DICT_COUNTS_MAGIC))
+            return
+        for line in data.split(b'\n'):
+            if line.strip():
+                # Слова и ключи не содержат пробелов; частоты нет в старых словарях
+                key, word, *count = line.strip().split(b' ')
                 self.reverse_dict[key] = word
                 self.max_key_len = max(self.max_key_len, len(key))
+                if count:
+                    self.word_counts[word] = int(count[0])
 
-    def decrypt_data(self, encrypted_data):
-        decrypted = bytearray()
+    def load_escape_dictionary(self, data, counts=False):
+        self.one_byte_keys = data[0]
+        words = []
+        pos = 1
+        while pos < len(data):
+            length, pos = read_varint(data, pos)
+            word = data[pos:pos + length]
+            words.append(word)
+            pos += length
+            if counts:
+                self.word_counts[word], pos = read_varint(data, pos)
+        self.escape_words = words
+
+    def iter_data_escape(self, encrypted_data, chunk_size=DECODE_CHUNK_SIZE):
+        """
+        Декодирование escape-формата: длина каждого ключа известна по первому
+        байту. Результат отдается порциями - по одной на chunk_size байтов
+        входа (единица, начатая в блоке, дочитывается целиком).
+        """
+        words = self.escape_words
+        one_byte_keys = self.one_byte_keys
+        long_base = one_byte_keys + (ESCAPE_LONG_LEAD - 1 - one_byte_keys) * 256
         i = 0
         while i < len(encrypted_data):
-            found = False
-            for l in range(min(self.max_key_len, len(encrypted_data) - i), 0, -1):
-                chunk = encrypted_data[i:i + l]
-                if chunk in self.reverse_dict:
-                    decrypted.extend(self.reverse_dict[chunk])
-                    i += l
-                    found = True
-                    break
-            if not found:
-                decrypted.append(encrypted_data[i])
-                i += 1
-        return decrypted
+            decrypted = bytearray()
+            block_end = min(i + chunk_size, len(encrypted_data))
+            while i < block_end:
+                lead = encrypted_data[i]
+                if lead == ESCAPE_LITERAL:
+                    length, i = read_varint(encrypted_data, i + 1)
+                    decrypted += encrypted_data[i:i + length]
+                    i += length
+                elif lead <= one_byte_keys:
+                    decrypted += words[lead - 1]
+                    i += 1
+                elif lead < ESCAPE_LONG_LEAD:
+                    decrypted += words[one_byte_keys + (lead - one_byte_keys - 1) * 256 + encrypted_data[i + 1]]
+                    i += 2
+                else:
+                    rank = long_base + int.from_bytes(encrypted_data[i + 1:i + 4], 'big')
+                    decrypted += words[rank]
+                    i += 4
+            yield decrypted
 
-    def decrypt_file(self, input_dtc, output_path, dict_path):
-        try:
-            with open(input_dtc, 'rb') as f:
-                encrypted_data = f.read()
+    def iter_data(self, encrypted_data, chunk_size=DECODE_CHUNK_SIZE):
+        """
+        Декодирование classic-формата: самый длинный ключ словаря с текущей
+        позиции. Результат отдается порциями, как в iter_data_escape.
+        """
+        i = 0
+        while i < len(encrypted_data):
+            decrypted = bytearray()
+            block_end = min(i + chunk_size, len(encrypted_data))
+            while i < block_end:
+                found = False
+                for l in range(min(self.max_key_len, len(encrypted_data) - i), 0, -1):
+                    chunk = encrypted_data[i:i + l]
+                    if chunk in self.reverse_dict:
+                        decrypted.extend(self.reverse_dict[chunk])
+                        i += l
+                        found = True
+                        break
+                if not found:
+                    decrypted.append(encrypted_data[i])
+                    i += 1
+            yield decrypted
 
-            encoding = encrypted_data[-20:].split(b'\x00')[0].decode('utf-8')
-            encrypted_data = encrypted_data[:-20]
+    def iter_payload(self, encrypted_data):
+        """Восстановленные данные порциями, без сборки результата целиком"""
+        if encrypted_data.startswith(ESCAPE_MAGIC):
+            return self.iter_data_escape(memoryview(encrypted_data)[len(ESCAPE_MAGIC):])
+        return self.iter_data(encrypted_data)
 
-            self.load_dictionary(dict_path)
-            decrypted = self.decrypt_data(encrypted_data)
+    def decrypt_data_escape(self, encrypted_data):
+        return collect(self.iter_data_escape(encrypted_data))
 
-            final_data = decrypted.decode('utf-8').encode(encoding)
+    def decrypt_data(self, encrypted_data):
+        return collect(self.iter_data(encrypted_data))
 
-            with open(output_path, 'wb') as f:
-                f.write(final_data)
+    def decrypt_payload(self, encrypted_data):
+        return collect(self.iter_payload(encrypted_data))
+
+    def iter_output(self, pieces, encoding):
+        """Порции восстановленных данных в исходной кодировке"""
+        if encoding.startswith(NATIVE_PREFIX) or same_encoding(TARGET_ENCODING, encoding):
+            # Данные уже в исходной кодировке
+            return pieces
+        return transcode_pieces(pieces, TARGET_ENCODING, encoding)
+
+    def write_output(self, f, decrypted, encoding):
+        """Запись в исходной кодировке; возвращает число записанных байтов"""
+        if encoding.startswith(NATIVE_PREFIX):
+            # Данные уже в исходной кодовой странице
+            f.write(decrypted)
+            return len(decrypted)
+        return write_transcoded(f, decrypted, TARGET_ENCODING, encoding)
+
+    def open_archive(self, input_dtc, dict_path=None, stats=None):
+        """
+        Читает .dtc (или контейнер) и загружает его словарь.
+
+        :param input_dtc: Путь, открытый двоичный файл или байты архива.
+        :param dict_path: Словарь для .dtc без контейнера - так же путь, файл или байты.
+        :return: (закодированные данные, блок кодировки, заголовок контейнера
+                 или {'digest': ...} из хвоста .dtc, если хеш записан).
+        """
+        stats = stats or PipelineStats()
+        header = {}
+        with stats.stage('read_payload') as stage, open_input(input_dtc) as f:
+            # Читаются только нужные секции и хвост, а не весь файл сразу
+            base = f.tell()
+            is_container = f.read(len(CONTAINER_MAGIC)) == CONTAINER_MAGIC
+            f.seek(base)
+            if is_container:
+                container = ContainerReader(f)
+                header = container.header
+                encoding = container.encoding
+                dictionary_data = container.dictionary
+                encrypted_data = container.payload
+            else:
+                payload_end, encoding, digest = read_trailer(f)
+                if digest is not None:
+                    header['digest'] = digest
+                f.seek(base)
+                encrypted_data = f.read(payload_end - base)
+            stage.bytes_out = len(encrypted_data)
 
-            logging.info(f"Файл дешифрован: {output_path}")
+        if not is_container:
+            if dict_path is None:
+                raise ValueError("Для .dtc без контейнера нужен словарь .dtl")
+            dictionary_data = read_input(dict_path)
+
+        with stats.stage('load_dictionary', len(dictionary_data)) as stage:
+            self.load_dictionary_data(dictionary_data)
+            stage.items = len(self.reverse_dict) or len(self.escape_words)
+        return encrypted_data, encoding, header
+
+    def decrypt_archive(self, input_dtc, dict_path=None, stats=None):
+        """
+        Читает и декодирует .dtc (или контейнер) без записи результата.
+
+        :return: (данные, блок кодировки, заголовок - см. open_archive).
+        """
+        stats = stats or PipelineStats()
+        encrypted_data, encoding, header = self.open_archive(input_dtc, dict_path, stats)
+        with stats.stage('decrypt_data', len(encrypted_data)) as stage:
+            decrypted = self.decrypt_payload(encrypted_data)
+            stage.bytes_out = len(decrypted)
+        return decrypted, encoding, header
+
+    def digest_file(self, input_dtc, dict_path=None, stats=None):
+        """
+        Дешифрует в хеш: порции декодера (после перекодировки в исходную
+        кодировку) сразу уходят в BLAKE2b, результат целиком не собирается
+        и на диск не пишется.
+
+        :return: (хеш восстановленного файла, хеш из заголовка или хвоста .dtc, или None).
+        """
+        stats = stats or PipelineStats()
+        encrypted_data, encoding, header = self.open_archive(input_dtc, dict_path, stats)
+        with stats.stage('decrypt_digest', len(encrypted_data)) as stage:
+            sink = DigestWriter()
+            for piece in self.iter_output(self.iter_payload(encrypted_data), encoding):
+                sink.write(piece)
+            stage.bytes_out = sink.size
+        return sink.digest(), header.get('digest')
+
+    def decrypt_file(self, input_dtc, output_path, dict_path=None, stats=None):
+        """
+        Дешифрует .dtc со словарем dict_path или однофайловый контейнер
+        (для контейнера dict_path не нужен).
+        stats: PipelineStats для замеров по этапам (необязательно)
+        """
+        stats = stats or PipelineStats()
+        try:
+            decrypted, encoding, _ = self.decrypt_archive(input_dtc, dict_path, stats)
+
+            with stats.stage('write_output', len(decrypted)) as stage, open(output_path, 'wb') as f:
+                self.write_output(f, decrypted, encoding)
+                stage.bytes_out = f.tell()
+
+            logger.info('Файл дешифрован: %s', output_path)
             return True
 
         except Exception as e:
-            logging.error(f"Ошибка: {str(e)}")
+            logger.error('Ошибка: %s', e)
             return False
 
 
+class CodecSession:
+    """
+    Многоразовая сессия кодека для долгоживущих процессов: один кодировщик
+    и один декодер обрабатывают сколько угодно входов подряд. Входы - байты,
+    открытые двоичные файлы или пути, без привязки к папке txt; ошибки не
+    перехватываются, а поднимаются исключениями.
+
+    Состояние файла (словарь, кодировка) сбрасывается перед каждым входом,
+    а скомпилированные токенизаторы и последний загруженный словарь
+    переиспользуются.
+    """
+    __slots__ = ('encoder', 'decoder', 'compression', 'payload_compression')
+
+    def __init__(self, layout=LAYOUT_CLASSIC, compression='zlib', payload_compression=None,
+                 native_codepage=False, **encoder_options):
+        """
+        :param layout: Формат данных: LAYOUT_CLASSIC или LAYOUT_ESCAPE.
+        :param compression: Сжатие секции словаря контейнера (см. container.parse_compression).
+        :param payload_compression: Сжатие секции данных.
+        :param native_codepage: Токенизировать однобайтовые кодовые страницы без перевода в UTF-8.
+        :param encoder_options: Остальные параметры AdvancedEncoder (min_count, engine, ...).
+        """
+        self.encoder = AdvancedEncoder(layout=layout, native_codepage=native_codepage, **encoder_options)
+        self.decoder = AdvancedDecoder()
+        self.compression = compression
+        self.payload_compression = payload_compression
+
+    def encode_to(self, source, target, stats=None):
+        """
+        Шифрует источник в контейнер.
+
+        :param source: Байты, открытый двоичный файл или путь к исходному тексту.
+        :param target: Путь или открытый на запись двоичный файл.
+        :return: Число записанных байтов.
+        """
+        raw_data = read_input(source)
+        with open_output(target) as f:
+            return self.encoder.encode_container(f, raw_data, self.compression, self.payload_compression, stats)
+
+    def encode(self, source, stats=None):
+        """Шифрует источник и возвращает контейнер в виде bytes"""
+        out = io.BytesIO()
+        self.encode_to(source, out, stats)
+        return out.getvalue()
+
+    def decode_to(self, source, target, dictionary=None, stats=None):
+        """
+        Дешифрует архив в исходной кодировке.
+
+        :param source: Контейнер или .dtc - байты, открытый файл или путь.
+        :param target: Путь или открытый на запись двоичный файл.
+        :param dictionary: Словарь для .dtc без контейнера (байты, файл или путь).
+        :return: Число записанных байтов.
+        """
+        stats = stats or PipelineStats()
+        decrypted, encoding, _ = self.decoder.decrypt_archive(source, dictionary, stats)
+        with stats.stage('write_output', len(decrypted)) as stage, open_output(target) as f:
+            stage.bytes_out = self.decoder.write_output(f, decrypted, encoding)
+        return stage.bytes_out
+
+    def decode(self, source, dictionary=None, stats=None):
+        """Дешифрует архив и возвращает текст в исходной кодировке в виде bytes"""
+        out = io.BytesIO()
+        self.decode_to(source, out, dictionary, stats)
+        return out.getvalue()
+
+    def digest(self, source, dictionary=None, stats=None):
+        """(хеш восстановленного текста, хеш из заголовка или None) - см. AdvancedDecoder.digest_file"""
+        return self.decoder.digest_file(source, dictionary, stats)
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
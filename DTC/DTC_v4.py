@@ -1,13 +1,17 @@
 import os
 import re
 import logging
-import chardet
-from collections import defaultdict
-from itertools import product
+from collections import Counter
+from itertools import islice, product
 
-# Настройка логирования
-logging.basicConfig(level=logging.DEBUG,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+try:
+    from .dtl import export_text, load_dictionary, write_dictionary
+except ImportError:  # запуск как скрипта из папки DTC
+    from dtl import export_text, load_dictionary, write_dictionary
+
+logger = logging.getLogger(__name__)
+
+ENCODE_CHUNK_TOKENS = 4096  # Токенов на одну склейку: join держит по Py_buffer на фрагмент
 
 
 class TextEncryptorDecryptor:
@@ -35,6 +39,8 @@ class TextEncryptorDecryptor:
         self.input_filename = input_filename
         self.base_name = os.path.splitext(input_filename)[0]
         self.original_encoding = 'utf-8'
+        # Частоты слов последнего словаря; сохраняются в .dtl
+        self.word_counts = {}
 
     def generate_keys(self):
         """Генератор ключей переменной длины"""
@@ -52,16 +58,19 @@ class TextEncryptorDecryptor:
         for match in pattern.finditer(text):
             word, sep = match.groups()
             tokens.append(word if word else sep)
-        logging.debug(f"Выделено {len(tokens)} токенов")
+        logger.debug('Выделено %d токенов', len(tokens))
         return tokens
 
     def create_dictionary(self, tokens):
         """Создание словаря с проверкой уникальности ключей"""
-        word_counts = defaultdict(int)
-        for token in tokens:
-            if len(token) > 1 or (len(token) == 1 and ord(token[0]) not in self.FORBIDDEN_BYTES):
-                word_counts[token] += 1
-        logging.debug(f"Уникальных слов для словаря: {len(word_counts)}")
+        # Подсчет одним проходом Counter; разделители отбрасываются среди
+        # различных токенов, а не проверяются на каждом вхождении
+        word_counts = Counter(tokens)
+        for token in [token for token in word_counts
+                      if len(token) == 1 and ord(token) in self.FORBIDDEN_BYTES]:
+            del word_counts[token]
+        self.word_counts = word_counts
+        logger.debug('Уникальных слов для словаря: %d', len(word_counts))
 
         sorted_words = sorted(word_counts.items(), key=lambda x: (-x[1], -len(x[0]), x[0]))
 
@@ -78,49 +87,70 @@ class TextEncryptorDecryptor:
                     break
         return dictionary
 
-    def encrypt_file(self, output_dtc_path, output_dict_path):
-        """Улучшенное шифрование с поддержкой кодировок"""
+    def encode_tokens(self, tokens, dictionary, trailer=b''):
+        """
+        Кодирует токены в буфер точного размера: размер считается заранее,
+        буфер выделяется один раз и заполняется срезами через memoryview.
+        """
+        # Байты для каждого различного токена: ключ или сам токен в UTF-8
+        counts = Counter(tokens)
+        encoded = {token: dictionary.get(token) or token.encode('utf-8') for token in counts}
+        size = sum(count * len(encoded[token]) for token, count in counts.items()) + len(trailer)
+        encrypted_data = bytearray(size)
+        view = memoryview(encrypted_data)
+        pieces = map(encoded.__getitem__, tokens)
+        pos = 0
+        while pos < size - len(trailer):
+            chunk = b''.join(islice(pieces, ENCODE_CHUNK_TOKENS))
+            view[pos:pos + len(chunk)] = chunk
+            pos += len(chunk)
+        view[pos:] = trailer
+        return encrypted_data
+
+    def encrypt_file(self, output_dtc_path, output_dict_path, debug_dict_path=None):
+        """
+        Улучшенное шифрование с поддержкой кодировок.
+        Словарь пишется в двоичном формате (см. dtl.py); debug_dict_path -
+        необязательная текстовая выгрузка словаря для отладки.
+        """
         try:
             # Чтение и определение кодировки
             input_path = os.path.join('txt', self.input_filename)
             with open(input_path, 'rb') as f:
                 raw_data = f.read()
+                import chardet  # Импорт при первом вызове: заметно замедляет запуск процесса
                 result = chardet.detect(raw_data)
                 self.original_encoding = result['encoding'] if result['confidence'] > 0.7 else 'utf-8'
-                logging.debug(f"Определена кодировка: {self.original_encoding}")
+                logger.debug('Определена кодировка: %s', self.original_encoding)
 
             # Конвертация в UTF-8
             try:
                 text = raw_data.decode(self.original_encoding)
             except UnicodeDecodeError:
                 text = raw_data.decode('utf-8', errors='replace')
-                logging.warning("Ошибка декодирования, использован utf-8 с заменой символов")
+                logger.warning('Ошибка декодирования, использован utf-8 с заменой символов')
 
             # Основной процесс шифрования
             tokens = self.get_words_and_separators(text)
             dictionary = self.create_dictionary(tokens)
 
-            encrypted_data = bytearray()
-            for token in tokens:
-                encrypted_data.extend(dictionary.get(token, token.encode('utf-8')))
-
             # Добавление метаданных о кодировке
             encoding_info = self.ENCODING_MARKER + self.original_encoding.encode('utf-8').ljust(12)
-            encrypted_data.extend(encoding_info)
+            encrypted_data = self.encode_tokens(tokens, dictionary, encoding_info)
 
             # Сохранение результатов
             os.makedirs(os.path.dirname(output_dtc_path), exist_ok=True)
             with open(output_dtc_path, 'wb') as f:
                 f.write(encrypted_data)
-                logging.info(f"Файл {output_dtc_path} успешно зашифрован")
+                logger.info('Файл %s успешно зашифрован', output_dtc_path)
 
-            with open(output_dict_path, 'w', encoding='utf-8') as f:
-                for word, key in dictionary.items():
-                    f.write(f"{key.hex()} {word}\n")
-                logging.info(f"Словарь {output_dict_path} успешно создан")
+            write_dictionary(output_dict_path, dictionary, self.word_counts)
+            logger.info('Словарь %s успешно создан', output_dict_path)
+            if debug_dict_path:
+                export_text(debug_dict_path, dictionary)
 
         except Exception as e:
-            logging.error(f"Ошибка шифрования: {str(e)}", exc_info=True)
+            logger.error('Ошибка шифрования: %s', e, exc_info=True)
 
     def decrypt_file(self, input_dtc_path, output_path, dict_path):
         """Дешифрование с восстановлением кодировки"""
@@ -134,22 +164,13 @@ class TextEncryptorDecryptor:
             if encoding_info.startswith(self.ENCODING_MARKER):
                 self.original_encoding = encoding_info[len(self.ENCODING_MARKER):].decode('utf-8').strip()
                 encrypted_data = encrypted_data[:-self.ENCODING_LENGTH]
-                logging.debug(f"Восстановлена кодировка: {self.original_encoding}")
+                logger.debug('Восстановлена кодировка: %s', self.original_encoding)
             else:
                 self.original_encoding = 'utf-8'
-                logging.warning("Маркер кодировки не найден, используется utf-8")
-
-            # Загрузка словаря
-            dictionary = {}
-            with open(dict_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    parts = line.strip().split(' ', 1)
-                    if len(parts) == 2:
-                        key_hex, word = parts
-                        try:
-                            dictionary[bytes.fromhex(key_hex)] = word
-                        except ValueError:
-                            continue
+                logger.warning('Маркер кодировки не найден, используется utf-8')
+
+            # Загрузка словаря (двоичного или старого текстового)
+            dictionary = load_dictionary(dict_path)
 
             # Процесс дешифровки
             decrypted = []
@@ -177,19 +198,22 @@ class TextEncryptorDecryptor:
                 result = ''.join(decrypted).encode('utf-8').decode(self.original_encoding)
             except UnicodeEncodeError:
                 result = ''.join(decrypted)
-                logging.error("Ошибка конвертации в исходную кодировку")
+                logger.error('Ошибка конвертации в исходную кодировку')
 
             # Сохранение результата
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             with open(output_path, 'w', encoding=self.original_encoding, errors='replace') as f:
                 f.write(result)
-                logging.info(f"Файл {output_path} успешно дешифрован")
+                logger.info('Файл %s успешно дешифрован', output_path)
 
         except Exception as e:
-            logging.error(f"Ошибка дешифрования: {str(e)}", exc_info=True)
+            logger.error('Ошибка дешифрования: %s', e, exc_info=True)
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
     # Тестовые данные
     test_file = 'test_file.txt'  # имя входящего файла
 
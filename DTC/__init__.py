@@ -0,0 +1,42 @@
+"""
+Пакет DTC: кодеки и инструменты для архивов .dtc.
+
+Импорт пакета ничего не загружает и не настраивает (логирование
+настраивается только в main() инструментов). Модули и основные классы
+подгружаются при первом обращении:
+
+    import DTC
+    session = DTC.CodecSession()          # кодек DTC_v1.4
+    DTC.search.search('слово', ['dtc/'])  # модуль DTC.search
+
+Версии кодека с точкой в имени файла загружаются через DTC.load_version.
+"""
+import importlib
+
+from .loader import load_version
+
+CODEC_FILE = 'DTC_v1.4.py'
+
+# Имена, которые берутся из текущей версии кодека (DTC_v1.4)
+CODEC_EXPORTS = (
+    'AdvancedDecoder', 'AdvancedEncoder', 'CodecSession', 'PipelineStats',
+    'LAYOUT_CLASSIC', 'LAYOUT_ESCAPE',
+)
+SUBMODULES = (
+    'aio', 'bench', 'cli', 'container', 'daemon', 'dtl', 'index', 'search', 'stats', 'stream', 'verify',
+    'vocabulary',
+)
+
+__all__ = ['load_version', *CODEC_EXPORTS, *SUBMODULES]
+
+
+def __getattr__(name):
+    if name in CODEC_EXPORTS:
+        return getattr(load_version(CODEC_FILE), name)
+    if name in SUBMODULES:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
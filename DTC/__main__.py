@@ -0,0 +1,6 @@
+"""Запуск пакета: python -m DTC encode|decode|verify|bench (см. cli.py)"""
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Асинхронное шифрование DTC_v1.4 для сервисов на asyncio.
+
+encode_stream и decode_stream читают asyncio.StreamReader и пишут в
+asyncio.StreamWriter (или объекты с теми же методами read/readexactly и
+write/drain) в формате потока DTCS из stream.py, так что результат
+совместим с python -m DTC decode и stream.decode_stream.
+
+Цикл событий только читает и пишет; шифрование кадров выполняется в
+executor (по умолчанию - пул потоков цикла). Для сервисов, где важна
+задержка остальных запросов, лучше передать общий ProcessPoolExecutor:
+в потоках шифрование конкурирует с циклом за GIL. Сессии кодека
+создаются один раз на поток или процесс пула и общие для всех запросов.
+
+Обратное давление: в работе не больше max_pending кадров на запрос,
+следующий кадр читается только после записи готового, а запись ждет
+writer.drain(). Память запроса - около (max_pending + 1) * frame_size.
+
+    async def handle(reader, writer):
+        await aio.encode_stream(reader, writer, executor=pool)
+        writer.close()
+"""
+import asyncio
+from collections import deque
+from contextlib import aclosing
+
+try:
+    from . import stream
+except ImportError:  # запуск как скрипта из папки DTC
+    import stream
+
+DEFAULT_FRAME_SIZE = 1024 * 1024  # Меньше, чем в stream.py: память запроса и время кадра в executor
+MAX_PENDING = 2  # Кадров запроса в executor одновременно
+
+
+async def iter_frames(reader, frame_size=DEFAULT_FRAME_SIZE):
+    """Исходные данные кадрами не длиннее frame_size, по границам строк (см. stream.iter_frames)"""
+    if frame_size <= 0:
+        raise ValueError(f"Размер кадра должен быть положительным: {frame_size}")
+    pending = b''
+    while True:
+        data = await reader.read(frame_size - len(pending))
+        if not data:
+            break
+        pending += data
+        if len(pending) < frame_size:
+            continue
+        cut = pending.rfind(b'\n') + 1 or len(pending)
+        yield pending[:cut]
+        pending = pending[cut:]
+    if pending:
+        yield pending
+
+
+async def read_exact(reader, size):
+    """Ровно size байтов; обрыв потока - ValueError, как в stream.read_exact"""
+    try:
+        return await reader.readexactly(size)
+    except asyncio.IncompleteReadError:
+        raise ValueError("Поток DTCS оборван") from None
+
+
+async def read_limited(reader, limit):
+    """Данные до конца потока, но не больше limit байтов (см. stream.read_limited)"""
+    chunks = []
+    size = 0
+    while size <= limit:
+        chunk = await reader.read(min(limit + 1 - size, stream.READ_CHUNK_SIZE))
+        if not chunk:
+            return b''.join(chunks)
+        chunks.append(chunk)
+        size += len(chunk)
+    raise ValueError(f"Контейнер больше {limit} байтов")
+
+
+async def iter_containers(reader, max_size=stream.MAX_CONTAINER_SIZE):
+    """Контейнеры кадров из потока DTCS или одиночный контейнер не больше max_size"""
+    head = await read_exact(reader, len(stream.STREAM_MAGIC))
+    if head.startswith(stream.CONTAINER_MAGIC):
+        yield head + await read_limited(reader, max_size - len(head))
+        return
+    if head != stream.STREAM_MAGIC:
+        raise ValueError("Вход не является потоком DTCS или контейнером DTC")
+    while True:
+        (length,) = stream.FRAME_LENGTH.unpack(await read_exact(reader, stream.FRAME_LENGTH.size))
+        if not length:
+            return
+        if length > max_size:
+            raise ValueError(f"Кадр потока DTCS больше {max_size} байтов")
+        yield await read_exact(reader, length)
+
+
+async def ordered_map(func, items, executor=None, max_pending=MAX_PENDING):
+    """
+    Асинхронный map в executor с сохранением порядка: в работе не больше
+    max_pending элементов. Невыполненные задачи отменяются при ошибке или
+    отмене корутины.
+    """
+    loop = asyncio.get_running_loop()
+    pending = deque()
+    try:
+        async for item in items:
+            pending.append(loop.run_in_executor(executor, func, item))
+            if len(pending) >= max_pending:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def _encode_tasks(frames, options):
+    async for raw in frames:
+        yield options, raw
+
+
+async def encode_stream(reader, writer, frame_size=DEFAULT_FRAME_SIZE, executor=None,
+                        max_pending=MAX_PENDING, **options):
+    """
+    Шифрует асинхронный поток в поток DTCS.
+
+    :param reader: asyncio.StreamReader с исходными данными.
+    :param writer: asyncio.StreamWriter для результата (не закрывается).
+    :param frame_size: Максимальный размер исходных данных кадра.
+    :param executor: Executor для шифрования кадров (None - пул потоков цикла).
+    :param max_pending: Кадров запроса в работе одновременно.
+    :param options: Параметры CodecSession (layout, compression, ...).
+    :return: Число кадров.
+    """
+    writer.write(stream.STREAM_MAGIC)
+    frames = 0
+    tasks = _encode_tasks(iter_frames(reader, frame_size), options)
+    # aclosing: при ошибке drain() невыполненные кадры отменяются сразу, а не при сборке мусора
+    async with aclosing(ordered_map(stream._encode_frame, tasks, executor, max_pending)) as containers:
+        async for container in containers:
+            if len(container) > stream.MAX_CONTAINER_SIZE:
+                raise ValueError(f"Кадр больше {stream.MAX_CONTAINER_SIZE} байтов, уменьшите frame_size")
+            writer.write(stream.FRAME_LENGTH.pack(len(container)))
+            writer.write(container)
+            await writer.drain()
+            frames += 1
+    writer.write(stream.FRAME_LENGTH.pack(0))
+    await writer.drain()
+    return frames
+
+
+async def decode_stream(reader, writer, executor=None, max_pending=MAX_PENDING):
+    """
+    Дешифрует асинхронный поток DTCS (или одиночный контейнер).
+
+    :return: Число кадров.
+    """
+    frames = 0
+    async with aclosing(ordered_map(stream._decode_frame, iter_containers(reader), executor,
+                                    max_pending)) as pieces:
+        async for data in pieces:
+            writer.write(data)
+            await writer.drain()
+            frames += 1
+    return frames
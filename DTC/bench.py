@@ -0,0 +1,622 @@
+"""
+Бенчмарки кодеков DTC.
+
+Запуск из корня репозитория:
+    python -m DTC.bench codecs --sizes 1M,100M,1G --output bench_results.json
+    python -m DTC.bench entropy --size 16M
+    python -m DTC.bench transcode --size 8
+    python -m DTC.bench prof-decode --size 8
+    python -m DTC.bench imports --repeat 5 --output import_times.json
+
+Набор codecs прогоняет шифрование и дешифрование каждой версии кодека
+на синтетическом русско-английском корпусе и пишет JSON с пропускной
+способностью, пиковым RSS, степенью сжатия и проверкой совпадения.
+Набор imports замеряет импорт модулей в чистом процессе (-X importtime):
+рабочие процессы запускаются часто, и время запуска - часть их стоимости.
+"""
+import argparse
+import contextlib
+import filecmp
+import io
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+from itertools import accumulate
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .loader import PACKAGE_DIR, load_version
+
+SAMPLE_PATH = os.path.join(PACKAGE_DIR, 't.txt')
+MB = 1024 * 1024
+SIZE_UNITS = {'K': 1024, 'M': MB, 'G': 1024 * MB}
+
+CORPUS_NAME = 'corpus.txt'
+VOCABULARY_SIZE = 20000
+ENGLISH_WORDS = (
+    'the of and to in is you that it he was for on are as with his they at be this have from '
+    'or one had by word but not what all were we when your can said there use an each which '
+    'she do how their if will up other about out many then them these so some her would make '
+    'like him into time has look two more write go see number no way could people my than '
+    'first water been call who oil its now find long down day did get come made may part'
+).split()
+RUSSIAN_SYLLABLES = (
+    'ба ва га да же за ка ла ма на па ра са та фа ха ца ча ша бо во го до ко ло мо но по ро '
+    'со то ре ле не ме ве ти ли ни ми ви ру ну му ду ку ст пр тр кр бр гр ой ый ий ая ое ые'
+).split()
+
+
+def parse_size(text):
+    """
+    Разбирает размер вида '1M', '100M', '1G' или число байтов.
+
+    :param text: Строка с размером.
+    :return: Размер в байтах.
+    """
+    text = text.strip().upper()
+    if text and text[-1] in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+    return int(text)
+
+
+def corpus_vocabulary(size=VOCABULARY_SIZE, seed=0):
+    """
+    Словарь корпуса в порядке убывания частоты: слова t.txt, частые
+    английские слова и детерминированные псевдослова из русских слогов.
+
+    :param size: Число слов.
+    :param seed: Зерно генератора.
+    :return: Список слов.
+    """
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as f:
+        sample_words = re.findall(r'\w+', f.read().lower())
+    vocabulary = list(dict.fromkeys(sample_words + ENGLISH_WORDS))
+    known = set(vocabulary)
+    rng = random.Random(seed)
+    while len(vocabulary) < size:
+        word = ''.join(rng.choice(RUSSIAN_SYLLABLES) for _ in range(rng.randint(2, 5)))
+        if word not in known:
+            known.add(word)
+            vocabulary.append(word)
+    return vocabulary[:size]
+
+
+def generate_corpus(path, size, seed=0, chunk_size=MB):
+    """
+    Записывает детерминированный текст размером не меньше size байт.
+    Слова выбираются по закону Ципфа, предложения и абзацы - случайной длины.
+
+    :param path: Путь к файлу корпуса.
+    :param size: Размер в байтах (UTF-8).
+    :param seed: Зерно генератора.
+    :param chunk_size: Размер порции записи.
+    """
+    vocabulary = corpus_vocabulary(seed=seed)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    cum_weights = list(accumulate(weights))
+    rng = random.Random(seed)
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        while written < size:
+            parts = []
+            chunk_bytes = 0
+            while chunk_bytes < chunk_size:
+                words = rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(4, 16))
+                words[0] = words[0].capitalize()
+                for i in range(1, len(words) - 1):
+                    if rng.random() < 0.1:
+                        words[i] += ','
+                sentence = ' '.join(words) + rng.choice('...!?')
+                sentence += '\n' if rng.random() < 0.2 else ' '
+                parts.append(sentence)
+                chunk_bytes += len(sentence.encode('utf-8'))
+            f.write(''.join(parts))
+            written += chunk_bytes
+
+
+def ensure_corpus(corpus_dir, size, seed=0):
+    """
+    Возвращает путь к корпусу заданного размера, генерируя его при отсутствии.
+
+    :param corpus_dir: Папка кэша корпусов.
+    :param size: Размер в байтах.
+    :param seed: Зерно генератора.
+    :return: Путь к файлу.
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    path = os.path.join(corpus_dir, f'corpus_{size}_{seed}.txt')
+    if not os.path.exists(path):
+        generate_corpus(path + '.tmp', size, seed)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+def sample_text(size):
+    """
+    Текст не короче size байт в UTF-8, собранный повторением t.txt.
+
+    :param size: Требуемый размер в байтах.
+    :return: Строка.
+    """
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as f:
+        base = f.read() + '\n'
+    repeats = size // len(base.encode('utf-8')) + 1
+    return base * repeats
+
+
+def measure(func):
+    """
+    Измеряет время выполнения и пиковый объем памяти, выделенной внутри func.
+
+    :param func: Функция без аргументов.
+    :return: (секунды, пик в байтах)
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+# Пути внутри рабочей папки кодека: все версии читают исходник из txt/
+DTC_PATH = os.path.join('dtc', 'corpus.dtc')
+DTL_PATH = os.path.join('dtc', 'corpus.dtl')
+OUT_PATH = os.path.join('decrypted', CORPUS_NAME)
+STATIC_LIBRARY = 'word_lib.dtl'
+
+
+def _encode_static(module, binary=False):
+    module.encrypt_file(os.path.join('txt', CORPUS_NAME), DTC_PATH, STATIC_LIBRARY, binary=binary)
+
+
+def _decode_static(module):
+    module.decrypt_file(DTC_PATH, OUT_PATH, STATIC_LIBRARY)
+
+
+def _encode_classic(module):
+    module.TextEncryptorDecryptor(CORPUS_NAME).encrypt_file(DTC_PATH, DTL_PATH)
+
+
+def _decode_classic(module):
+    module.TextEncryptorDecryptor(CORPUS_NAME).decrypt_file(DTC_PATH, OUT_PATH, DTL_PATH)
+
+
+def _encode_advanced(module, **options):
+    if not module.AdvancedEncoder(CORPUS_NAME, **options).encrypt_file(DTC_PATH, DTL_PATH):
+        raise RuntimeError('encrypt_file завершился с ошибкой')
+
+
+def _decode_advanced(module):
+    if not module.AdvancedDecoder(CORPUS_NAME).decrypt_file(DTC_PATH, OUT_PATH, DTL_PATH):
+        raise RuntimeError('decrypt_file завершился с ошибкой')
+
+
+# Имя варианта -> (файл модуля, шифрование, дешифрование)
+CODECS = {
+    'DTC': ('DTC.py', _encode_static, _decode_static),
+    'DTC-binary': ('DTC.py', partial(_encode_static, binary=True), _decode_static),
+    'DTC_v1.0': ('DTC_v1.0.py', _encode_classic, _decode_classic),
+    'DTC_v1.1': ('DTC_v1.1.py', _encode_classic, _decode_classic),
+    'DTC_v1.2': ('DTC_v1.2.py', _encode_classic, _decode_classic),
+    'DTC_v1.3': ('DTC_v1.3.py', _encode_classic, _decode_classic),
+    'DTC_v1.4': ('DTC_v1.4.py', _encode_advanced, _decode_advanced),
+    'DTC_v1.4-escape': ('DTC_v1.4.py', partial(_encode_advanced, layout='escape'), _decode_advanced),
+    'DTC_v4': ('DTC_v4.py', _encode_classic, _decode_classic),
+    'prof_dtc': ('prof_dtc.py', _encode_classic, _decode_classic),
+}
+
+
+def peak_rss():
+    """Пиковый RSS текущего процесса в байтах (None, если недоступен)"""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _run_stage(name, stage, workdir, results):
+    """Выполняется в дочернем процессе, чтобы пиковый RSS относился к одному этапу"""
+    os.chdir(workdir)
+    filename, encode, decode = CODECS[name]
+    try:
+        module = load_version(filename)
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            (encode if stage == 'encode' else decode)(module)
+            elapsed = time.perf_counter() - start
+        results.put({'seconds': elapsed, 'peak_rss': peak_rss()})
+    except Exception as e:
+        results.put({'error': f'{type(e).__name__}: {e}'})
+
+
+def run_stage(name, stage, workdir, timeout=None):
+    """
+    Запускает этап кодека в отдельном процессе.
+
+    :param name: Имя варианта из CODECS.
+    :param stage: 'encode' или 'decode'.
+    :param workdir: Рабочая папка с подпапками txt, dtc, decrypted.
+    :param timeout: Ограничение времени в секундах.
+    :return: Словарь с seconds и peak_rss либо с error.
+    """
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=_run_stage, args=(name, stage, workdir, results))
+    process.start()
+    try:
+        result = results.get(timeout=timeout)
+    except queue.Empty:
+        process.kill()
+        result = {'error': 'timeout'}
+    process.join()
+    return result
+
+
+def prepare_workdir(root, corpus_path, name):
+    """Создает рабочую папку кодека и подкладывает корпус в txt/"""
+    workdir = tempfile.mkdtemp(prefix=name + '-', dir=root)
+    for folder in ('txt', 'dtc', 'decrypted'):
+        os.makedirs(os.path.join(workdir, folder))
+    target = os.path.join(workdir, 'txt', CORPUS_NAME)
+    try:
+        os.link(corpus_path, target)
+    except OSError:
+        shutil.copyfile(corpus_path, target)
+    if name.startswith('DTC') and CODECS[name][0] == 'DTC.py':
+        # Статическая библиотека строится из словаря корпуса до замера
+        module = load_version('DTC.py')
+        vocabulary = corpus_vocabulary()
+        module.save_binary_library(vocabulary, module.generate_hex_codes(len(vocabulary)),
+                                   os.path.join(workdir, STATIC_LIBRARY))
+    return workdir
+
+
+def _file_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def bench_codecs(sizes, names, corpus_dir, seed=0, timeout=None):
+    """
+    Шифрует и дешифрует корпуса заданных размеров каждым вариантом кодека.
+
+    :param sizes: Размеры корпусов в байтах.
+    :param names: Имена вариантов из CODECS.
+    :param corpus_dir: Папка кэша корпусов.
+    :param seed: Зерно генератора корпуса.
+    :param timeout: Ограничение времени одного этапа в секундах.
+    :return: Список строк результатов.
+    """
+    results = []
+    work_root = tempfile.mkdtemp(prefix='dtc-bench-')
+    try:
+        for size in sizes:
+            corpus_path = ensure_corpus(corpus_dir, size, seed)
+            corpus_bytes = os.path.getsize(corpus_path)
+            for name in names:
+                workdir = prepare_workdir(work_root, corpus_path, name)
+                row = {'codec': name, 'corpus_bytes': corpus_bytes}
+                for stage in ('encode', 'decode'):
+                    stage_result = run_stage(name, stage, workdir, timeout)
+                    if 'error' in stage_result:
+                        row['error'] = f"{stage}: {stage_result['error']}"
+                        break
+                    row[f'{stage}_mb_per_s'] = corpus_bytes / MB / stage_result['seconds']
+                    row[f'{stage}_peak_rss'] = stage_result['peak_rss']
+                payload = _file_size(os.path.join(workdir, DTC_PATH))
+                dictionary = _file_size(os.path.join(workdir, DTL_PATH))
+                output = os.path.join(workdir, OUT_PATH)
+                row.update({
+                    'payload_bytes': payload,
+                    'dictionary_bytes': dictionary,
+                    'ratio': (payload + dictionary) / corpus_bytes,
+                    'roundtrip': os.path.exists(output) and filecmp.cmp(corpus_path, output, shallow=False),
+                })
+                results.append(row)
+                shutil.rmtree(workdir, ignore_errors=True)
+    finally:
+        shutil.rmtree(work_root, ignore_errors=True)
+    return results
+
+
+def write_results(path, suite, results, **meta):
+    """Сохраняет результаты в JSON вместе с описанием окружения"""
+    document = {
+        'suite': suite,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        **meta,
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+
+
+ENTROPY_BACKENDS = ('none', 'zlib:1', 'zlib:6', 'zlib:9', 'bz2:9', 'lzma:1', 'lzma:6', 'lzma:9')
+
+
+def bench_entropy(size, corpus_dir, seed=0, backends=ENTROPY_BACKENDS):
+    """
+    Второй этап сжатия данных DTC_v1.4 каждым алгоритмом в сравнении со
+    сжатием исходного текста тем же алгоритмом. Словарь во всех вариантах
+    DTC сжимается zlib:9 и учитывается в итоговом размере.
+
+    :param size: Размер корпуса в байтах.
+    :param corpus_dir: Папка кэша корпусов.
+    :param seed: Зерно генератора корпуса.
+    :param backends: Строки сжатия в формате container.parse_compression.
+    :return: Список строк результатов.
+    """
+    from . import container
+
+    codec = load_version('DTC_v1.4.py')
+    with open(ensure_corpus(corpus_dir, size, seed), 'rb') as f:
+        raw = f.read()
+
+    sources = {'raw': (raw, b'')}
+    for layout in (codec.LAYOUT_CLASSIC, codec.LAYOUT_ESCAPE):
+        encoder = codec.AdvancedEncoder(CORPUS_NAME, layout=layout)
+        encoder.encoding_info = {'encoding': codec.TARGET_ENCODING}
+        tokens = list(encoder.tokenize(raw))
+        encoder.build_dictionary(tokens)
+        dictionary = io.BytesIO()
+        encoder.write_dictionary(dictionary)
+        payload = bytes(encoder.encrypt_data(tokens)[:-20])
+        dictionary = container.compress(dictionary.getvalue(), container.parse_compression('zlib:9'))
+        sources['dtc-' + layout] = (payload, dictionary)
+
+    results = []
+    for source, (payload, dictionary) in sources.items():
+        for backend in backends:
+            method = container.parse_compression(None if backend == 'none' else backend)
+            start = time.perf_counter()
+            body = container.compress(payload, method)
+            compress_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            restored = container.decompress(body, method)
+            decompress_seconds = time.perf_counter() - start
+            total = len(body) + len(dictionary)
+            results.append({
+                'source': source,
+                'backend': backend,
+                'payload_bytes': len(payload),
+                'compressed_bytes': len(body),
+                'total_bytes': total,
+                'ratio': total / len(raw),
+                # Скорость в пересчете на объем исходного текста
+                'compress_mb_per_s': len(raw) / MB / max(compress_seconds, 1e-9),
+                'decompress_mb_per_s': len(raw) / MB / max(decompress_seconds, 1e-9),
+                'roundtrip': restored == payload,
+            })
+    return results
+
+
+def bench_transcode(size):
+    """
+    Сравнивает перекодировку через полную строку (decode/encode) с потоковой
+    перекодировкой DTC_v1.4 в обоих направлениях.
+
+    :param size: Размер входных данных в байтах.
+    :return: Список строк результатов.
+    """
+    codec = load_version('DTC_v1.4.py')
+    text = sample_text(size)
+    results = []
+    for encoding in ('utf-8', 'cp1251'):
+        raw = text.encode(encoding)
+        utf8 = text.encode('utf-8')
+        cases = [
+            ('encode', 'decode/encode', lambda: raw.decode(encoding).encode('utf-8')),
+            ('encode', 'transcode', lambda: codec.transcode(raw, encoding, 'utf-8')),
+            ('decode', 'decode/encode', lambda: utf8.decode('utf-8').encode(encoding)),
+            ('decode', 'write_transcoded', lambda: _write_null(codec, utf8, encoding)),
+        ]
+        for direction, method, func in cases:
+            elapsed, peak = measure(func)
+            results.append({
+                'encoding': encoding,
+                'direction': direction,
+                'method': method,
+                'input_bytes': len(raw) if direction == 'encode' else len(utf8),
+                'seconds': elapsed,
+                'peak_bytes': peak,
+            })
+    return results
+
+
+def _write_null(codec, data, encoding):
+    with open(os.devnull, 'wb') as f:
+        codec.write_transcoded(f, data, 'utf-8', encoding)
+
+
+def bench_prof_decode(size):
+    """
+    Сравнивает побайтовый цикл декодирования prof_dtc с табличным
+    декодированием для словаря из однобайтовых ключей.
+
+    :param size: Размер исходного текста в байтах.
+    :return: Список строк результатов.
+    """
+    from .prof_dtc import TextEncryptorDecryptor
+
+    codec = TextEncryptorDecryptor('bench.txt')
+    text = sample_text(size)
+    tokens = codec.get_words_and_separators(text)
+    dictionary = codec.create_dictionary(tokens)
+    encrypted = bytes(codec.encode_tokens(tokens, dictionary))
+    reverse = {key: word for word, key in dictionary.items()}
+    text_size = len(text.encode('utf-8'))
+
+    results = []
+    for method, decode in (('loop', codec.decode_bytes), ('table', codec.decode_bytes_table)):
+        start = time.perf_counter()
+        decoded = decode(encrypted, reverse)
+        elapsed = time.perf_counter() - start
+        results.append({
+            'method': method,
+            'encrypted_bytes': len(encrypted),
+            'seconds': elapsed,
+            'mb_per_s': text_size / MB / elapsed,
+            'roundtrip': decoded == text,
+        })
+    return results
+
+
+# Импорты, время которых отслеживается: имя -> оператор в дочернем процессе
+IMPORT_TARGETS = {
+    'DTC': 'import DTC',
+    'DTC.cli': 'import DTC.cli',
+    'DTC.stream': 'import DTC.stream',
+    'DTC.search': 'import DTC.search',
+    'DTC.index': 'import DTC.index',
+    'DTC.DTC': 'import DTC.DTC',
+    'DTC.daemon': 'import DTC.daemon',
+    'DTC_v1.4': "from DTC.loader import load_version; load_version('DTC_v1.4.py')",
+    'DTC_v1.3': "from DTC.loader import load_version; load_version('DTC_v1.3.py')",
+    'DTC_v4': "from DTC.loader import load_version; load_version('DTC_v4.py')",
+    'prof_dtc': "from DTC.loader import load_version; load_version('prof_dtc.py')",
+}
+# Модули, которые не должны загружаться при импорте кодека
+HEAVY_MODULES = ('chardet', 'numpy', 'pstats', 'cProfile', 'sqlite3', 'multiprocessing')
+IMPORT_MARKER = '-- bench imports --'
+IMPORT_SCRIPT = '''
+import sys, time
+sys.stderr.write({marker!r} + '\\n')
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed, *[name for name in {heavy!r} if name in sys.modules])
+'''
+
+
+def parse_importtime(stderr):
+    """
+    Строки -X importtime после маркера.
+
+    :return: [(модуль, микросекунды с вложенными, глубина вложенности)].
+    """
+    entries = []
+    lines = stderr.splitlines()
+    for line in lines[lines.index(IMPORT_MARKER) + 1:]:
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            entries.append((name.strip(), int(cumulative), depth))
+    return entries
+
+
+def bench_imports(targets=tuple(IMPORT_TARGETS), repeat=5):
+    """
+    Время импорта в новом процессе интерпретатора.
+
+    :param targets: Имена из IMPORT_TARGETS.
+    :param repeat: Число запусков; берется самый быстрый.
+    :return: Строки результатов: время оператора импорта, сумма -X importtime,
+             самые медленные импорты верхнего уровня и загруженные тяжелые модули.
+    """
+    results = []
+    for target in targets:
+        script = IMPORT_SCRIPT.format(marker=IMPORT_MARKER, statement=IMPORT_TARGETS[target],
+                                      heavy=HEAVY_MODULES)
+        best = None
+        for _ in range(repeat):
+            process = subprocess.run([sys.executable, '-X', 'importtime', '-c', script],
+                                     cwd=os.path.dirname(PACKAGE_DIR), capture_output=True, text=True)
+            if process.returncode:
+                best = {'error': process.stderr.strip().splitlines()[-1]}
+                break
+            seconds, *heavy = process.stdout.split()
+            entries = parse_importtime(process.stderr)
+            # Самые медленные сторонние и стандартные модули, импортированные пакетом напрямую
+            external = [(name, us) for name, us, depth in entries
+                        if depth <= 1 and name.split('.')[0] != 'DTC']
+            if best is None or float(seconds) < best['seconds']:
+                best = {
+                    'seconds': float(seconds),
+                    'importtime_ms': sum(us for _, us, depth in entries if depth == 0) / 1000,
+                    'slowest': ' '.join(f'{name}:{us / 1000:.1f}ms'
+                                        for name, us in sorted(external, key=lambda e: -e[1])[:3]),
+                    'heavy': ' '.join(heavy) or '-',
+                }
+        results.append({'target': target, **best})
+    return results
+
+
+def print_results(results):
+    for row in results:
+        print(', '.join(f'{name}={value:.3f}' if isinstance(value, float) else f'{name}={value}'
+                        for name, value in row.items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Бенчмарки кодеков DTC')
+    suites = parser.add_subparsers(dest='suite', required=True)
+
+    codecs_parser = suites.add_parser('codecs', help='Все версии кодека на синтетическом корпусе')
+    codecs_parser.add_argument('--sizes', default='1M', help='Размеры корпусов через запятую: 1M,100M,1G')
+    codecs_parser.add_argument('--codecs', default=','.join(CODECS), help='Варианты кодека через запятую')
+    codecs_parser.add_argument('--corpus-dir', default=os.path.join(tempfile.gettempdir(), 'dtc-corpus'))
+    codecs_parser.add_argument('--seed', type=int, default=0)
+    codecs_parser.add_argument('--timeout', type=float, default=None, help='Секунд на один этап')
+    codecs_parser.add_argument('--output', default='bench_results.json')
+
+    entropy_parser = suites.add_parser('entropy', help='Второй этап сжатия данных .dtc')
+    entropy_parser.add_argument('--size', default='8M')
+    entropy_parser.add_argument('--backends', default=','.join(ENTROPY_BACKENDS))
+    entropy_parser.add_argument('--corpus-dir', default=os.path.join(tempfile.gettempdir(), 'dtc-corpus'))
+    entropy_parser.add_argument('--seed', type=int, default=0)
+    entropy_parser.add_argument('--output', default=None, help='JSON с результатами')
+
+    imports_parser = suites.add_parser('imports', help='Время импорта модулей в новом процессе')
+    imports_parser.add_argument('--targets', default=','.join(IMPORT_TARGETS), help='Имена через запятую')
+    imports_parser.add_argument('--repeat', type=int, default=5)
+    imports_parser.add_argument('--output', default=None, help='JSON с результатами')
+
+    for suite in ('transcode', 'prof-decode'):
+        suite_parser = suites.add_parser(suite)
+        suite_parser.add_argument('--size', type=int, default=8, help='Размер входных данных, МБ')
+
+    args = parser.parse_args(argv)
+
+    if args.suite == 'codecs':
+        sizes = [parse_size(size) for size in args.sizes.split(',')]
+        names = args.codecs.split(',')
+        results = bench_codecs(sizes, names, args.corpus_dir, args.seed, args.timeout)
+        write_results(args.output, 'codecs', results, sizes=sizes, seed=args.seed)
+        print_results(results)
+    elif args.suite == 'entropy':
+        size = parse_size(args.size)
+        results = bench_entropy(size, args.corpus_dir, args.seed, args.backends.split(','))
+        if args.output:
+            write_results(args.output, 'entropy', results, size=size, seed=args.seed)
+        print_results(results)
+    elif args.suite == 'imports':
+        results = bench_imports(args.targets.split(','), args.repeat)
+        if args.output:
+            write_results(args.output, 'imports', results, repeat=args.repeat)
+        print_results(results)
+    elif args.suite == 'transcode':
+        print_results(bench_transcode(args.size * MB))
+    elif args.suite == 'prof-decode':
+        print_results(bench_prof_decode(args.size * MB))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""
+Единая точка входа DTC: python -m DTC encode|decode|verify|bench.
+
+Без путей (или с путем '-') encode, decode и verify работают потоком
+stdin -> stdout в формате DTCS (см. stream.py): память ограничена размером
+кадра, промежуточных файлов нет. С путями обрабатываются файлы: пути
+могут быть файлами, папками (обходятся рекурсивно: *.txt для encode,
+*.dtc для decode и verify) и шаблонами glob; файлы обрабатываются
+параллельно в процессах. Результат файла - однофайловый контейнер .dtc
+рядом с исходным или в папке --output-dir.
+
+По умолчанию используется escape-формат: он без потерь восстанавливает
+любые байты (в том числе tar-архивы), а в classic-формате двоичные данные
+могут совпасть с ключами словаря.
+
+Код выхода: 0 - успех, 1 - ошибка обработки или проверки хоть одного
+входа, 2 - неверные аргументы.
+
+Примеры из корня репозитория:
+    tar cf - docs | python -m DTC encode --workers 4 > docs.dtcs
+    python -m DTC decode < docs.dtcs | tar xf -
+    python -m DTC verify < docs.dtcs
+    python -m DTC encode 'txt/**/*.txt' --output-dir dtc/
+    python -m DTC decode dtc/ --output-dir decrypted/
+    python -m DTC verify dtc/ --originals txt/
+    python -m DTC bench codecs --sizes 1M
+"""
+import argparse
+import glob
+import logging
+import os
+import sys
+import concurrent.futures  # ProcessPoolExecutor (и multiprocessing) загружается при первом пуле
+
+try:
+    from . import stream
+except ImportError:  # запуск как скрипта из папки DTC
+    import stream
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+STDIN_PATH = '-'
+
+
+def expand_paths(patterns, suffix):
+    """
+    Файлы по списку путей: шаблоны glob раскрываются (с '**'), папки
+    обходятся рекурсивно в поиске файлов с расширением suffix.
+    """
+    for pattern in patterns:
+        paths = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for path in paths:
+            if not os.path.isdir(path):
+                yield path
+                continue
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.endswith(suffix):
+                        yield os.path.join(root, name)
+
+
+def output_path(source, output_dir, suffix):
+    """Путь результата: имя источника с новым расширением, в output_dir или рядом"""
+    name = os.path.splitext(os.path.basename(source))[0] + suffix
+    return os.path.join(output_dir or os.path.dirname(source), name)
+
+
+def _encode_task(task):
+    source, target, options = task
+    try:
+        stream.session(options).encode_to(source, target)
+        return source, None
+    except Exception as e:
+        return source, str(e)
+
+
+def _decode_task(task):
+    source, target = task
+    dict_path = os.path.splitext(source)[0] + '.dtl'
+    try:
+        # Для контейнера словарь не нужен и игнорируется
+        stream.session({}).decode_to(source, target, dict_path if os.path.exists(dict_path) else None)
+        return source, None
+    except Exception as e:
+        return source, str(e)
+
+
+def run_files(func, tasks, workers):
+    """Обработка файлов в пуле процессов; возвращает (число файлов, список (путь, ошибка))"""
+    if workers == 1 or len(tasks) < 2:
+        results = list(map(func, tasks))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(func, tasks))
+    return len(results), [(path, error) for path, error in results if error is not None]
+
+
+def plan_outputs(sources, output_dir, suffix, force):
+    """Пары (источник, результат); существующие результаты без force - ошибки"""
+    planned, errors = [], []
+    for source in sources:
+        target = output_path(source, output_dir, suffix)
+        if os.path.exists(target) and not force:
+            errors.append((source, f"{target} уже существует (--force для перезаписи)"))
+        else:
+            planned.append((source, target))
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    return planned, errors
+
+
+def compression_arg(value):
+    """Значение --compression: 'none' - без сжатия"""
+    return None if value == 'none' else value
+
+
+def positive_int(value):
+    """Целое больше нуля (для --frame-size)"""
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"нужно целое больше нуля: {value}")
+    return number
+
+
+def is_stream(paths):
+    return not paths or paths == [STDIN_PATH]
+
+
+def encode_command(args):
+    options = {'layout': args.layout, 'compression': args.compression,
+               'payload_compression': args.payload_compression, 'native_codepage': args.native_codepage}
+    if is_stream(args.paths):
+        frames = stream.encode_stream(sys.stdin.buffer, sys.stdout.buffer, args.frame_size * MB,
+                                      args.workers, **options)
+        logger.info('Зашифровано кадров: %d', frames)
+        return []
+    planned, errors = plan_outputs(expand_paths(args.paths, '.txt'), args.output_dir, '.dtc', args.force)
+    count, failures = run_files(_encode_task, [(source, target, options) for source, target in planned],
+                                args.workers)
+    logger.info('Зашифровано файлов: %d', count - len(failures))
+    return errors + failures
+
+
+def decode_command(args):
+    if is_stream(args.paths):
+        frames = stream.decode_stream(sys.stdin.buffer, sys.stdout.buffer, args.workers)
+        logger.info('Дешифровано кадров: %d', frames)
+        return []
+    planned, errors = plan_outputs(expand_paths(args.paths, '.dtc'), args.output_dir, '.txt', args.force)
+    count, failures = run_files(_decode_task, planned, args.workers)
+    logger.info('Дешифровано файлов: %d', count - len(failures))
+    return errors + failures
+
+
+def verify_command(args):
+    if is_stream(args.paths):
+        frames, failures = stream.verify_stream(sys.stdin.buffer, args.workers)
+        logger.info('Проверено кадров: %d, с ошибками: %d', frames, len(failures))
+        return [(f'кадр {number}', error) for number, error in failures]
+    try:
+        from .verify import verify
+    except ImportError:  # запуск как скрипта из папки DTC
+        from verify import verify
+    checked, failures = verify(list(expand_paths(args.paths, '.dtc')), args.originals, args.workers)
+    logger.info('Проверено: %d, с ошибками: %d', checked, len(failures))
+    return failures
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m DTC', description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_common(command):
+        command.add_argument('paths', nargs='*', help="Файлы, папки, шаблоны glob; без путей или '-' - stdin")
+        command.add_argument('--workers', type=int, default=None, help='Число процессов (1 - без пула)')
+
+    encode = commands.add_parser('encode', help='Шифрование в контейнеры или поток DTCS')
+    add_common(encode)
+    encode.add_argument('--output-dir', default=None, help='Папка для .dtc (по умолчанию рядом с исходными)')
+    encode.add_argument('--force', action='store_true', help='Перезаписывать существующие файлы')
+    encode.add_argument('--layout', choices=('classic', 'escape'), default='escape',
+                        help='escape (по умолчанию) восстанавливает любые байты, classic - только текст')
+    encode.add_argument('--compression', type=compression_arg, default='zlib',
+                        help='Сжатие словаря: none, zlib, bz2, lzma[:уровень]')
+    encode.add_argument('--payload-compression', type=compression_arg, default=None,
+                        help='Сжатие данных после замены слов ключами')
+    encode.add_argument('--native-codepage', action='store_true',
+                        help='Однобайтовые кодовые страницы без перевода в UTF-8')
+    encode.add_argument('--frame-size', type=positive_int, default=stream.DEFAULT_FRAME_SIZE // MB,
+                        help='Размер кадра потока, МБ')
+
+    decode = commands.add_parser('decode', help='Дешифрование контейнеров, пар .dtc/.dtl или потока DTCS')
+    add_common(decode)
+    decode.add_argument('--output-dir', default=None, help='Папка для .txt (по умолчанию рядом с архивами)')
+    decode.add_argument('--force', action='store_true', help='Перезаписывать существующие файлы')
+
+    verify = commands.add_parser('verify', help='Проверка архивов или потока DTCS по хешам')
+    add_common(verify)
+    verify.add_argument('--originals', default=None, help='Папка с исходными файлами')
+
+    bench = commands.add_parser('bench', help='Бенчмарки (аргументы передаются в DTC.bench)')
+    bench.add_argument('args', nargs=argparse.REMAINDER)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Журнал - в stderr: stdout занят данными потока
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.command == 'bench':
+        from .bench import main as bench_main
+        return bench_main(args.args) or 0
+
+    command = {'encode': encode_command, 'decode': decode_command, 'verify': verify_command}[args.command]
+    try:
+        failures = command(args)
+    except Exception as e:
+        logger.error('Ошибка: %s', e)
+        return 1
+    for path, error in failures:
+        logger.error('%s: %s', path, error)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
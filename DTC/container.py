@@ -0,0 +1,272 @@
+"""
+Однофайловый контейнер .dtc: заголовок, кодировка, словарь и данные в одном файле.
+
+Структура (числа little-endian):
+    b'DTCC'          - сигнатура
+    версия           - 1 байт
+    число секций     - 1 байт
+    каталог секций   - на каждую: тип (1), сжатие (1), смещение (8), длина (8)
+    тела секций
+
+Байт сжатия: младшие 4 бита - алгоритм (COMPRESSION_*), старшие - уровень
+(0 - уровень алгоритма по умолчанию). Сжатие задается строкой 'zlib',
+'bz2', 'lzma' или с уровнем: 'lzma:9'.
+
+Каталог читается при открытии, тела секций - только при обращении к ним,
+поэтому, например, словарь можно прочитать без загрузки данных.
+"""
+import bz2
+import io
+import lzma
+import struct
+import zlib
+
+MAGIC = b'DTCC'
+VERSION = 1
+PREFIX = struct.Struct('<4sBB')
+ENTRY = struct.Struct('<BBQQ')
+
+SECTION_HEADER = 1      # Метаданные "имя=значение" по строкам
+SECTION_ENCODING = 2    # Имя исходной кодировки
+SECTION_DICTIONARY = 3  # Словарь в формате кодека
+SECTION_PAYLOAD = 4     # Закодированные данные
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_LZMA = 2
+COMPRESSION_BZ2 = 3
+COMPRESSION_IDS = {None: COMPRESSION_NONE, 'zlib': COMPRESSION_ZLIB, 'lzma': COMPRESSION_LZMA,
+                   'bz2': COMPRESSION_BZ2}
+DEFAULT_LEVELS = {COMPRESSION_ZLIB: 6, COMPRESSION_LZMA: 6, COMPRESSION_BZ2: 9}
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+def parse_compression(spec):
+    """
+    Разбирает строку сжатия.
+
+    :param spec: None, 'zlib', 'bz2', 'lzma' или 'алгоритм:уровень'.
+    :return: Байт сжатия для каталога.
+    """
+    if not spec:
+        return COMPRESSION_NONE
+    name, _, level = spec.partition(':')
+    if name not in COMPRESSION_IDS:
+        raise ValueError(f"Неизвестный метод сжатия: {name}")
+    level = int(level) if level else 0
+    if not 0 <= level <= 9:
+        raise ValueError(f"Недопустимый уровень сжатия: {level}")
+    return COMPRESSION_IDS[name] | (level << 4)
+
+
+def _lzma_filters(level):
+    # Сырой LZMA2 без xz-обертки: для маленьких словарей заголовок xz заметен.
+    # Размер окна зависит от уровня, поэтому уровень хранится в каталоге
+    return [{'id': lzma.FILTER_LZMA2, 'preset': level}]
+
+
+def _compressor(method):
+    algorithm, level = method & 0x0F, (method >> 4) or DEFAULT_LEVELS.get(method & 0x0F)
+    if algorithm == COMPRESSION_ZLIB:
+        return zlib.compressobj(level)
+    if algorithm == COMPRESSION_LZMA:
+        return lzma.LZMACompressor(format=lzma.FORMAT_RAW, filters=_lzma_filters(level))
+    if algorithm == COMPRESSION_BZ2:
+        return bz2.BZ2Compressor(level)
+    raise ValueError(f"Неизвестный метод сжатия: {method}")
+
+
+def _decompressor(method):
+    algorithm, level = method & 0x0F, (method >> 4) or DEFAULT_LEVELS.get(method & 0x0F)
+    if algorithm == COMPRESSION_ZLIB:
+        return zlib.decompressobj()
+    if algorithm == COMPRESSION_LZMA:
+        return lzma.LZMADecompressor(format=lzma.FORMAT_RAW, filters=_lzma_filters(level))
+    if algorithm == COMPRESSION_BZ2:
+        return bz2.BZ2Decompressor()
+    raise ValueError(f"Неизвестный метод сжатия: {method}")
+
+
+def iter_compress(data, method, chunk_size=STREAM_CHUNK_SIZE):
+    """Потоковое сжатие: данные проходят через компрессор порциями"""
+    compressor = _compressor(method)
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        piece = compressor.compress(view[start:start + chunk_size])
+        if piece:
+            yield piece
+    yield compressor.flush()
+
+
+def compress(data, method):
+    """Сжимает тело секции (метод - байт сжатия из parse_compression)"""
+    if method == COMPRESSION_NONE:
+        return data
+    return b''.join(iter_compress(data, method))
+
+
+def iter_decompress(chunks, method):
+    """Потоковая распаковка последовательности сжатых порций"""
+    if method == COMPRESSION_NONE:
+        yield from chunks
+        return
+    decompressor = _decompressor(method)
+    for chunk in chunks:
+        piece = decompressor.decompress(chunk)
+        if piece:
+            yield piece
+    if hasattr(decompressor, 'flush'):
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+    if not decompressor.eof:
+        # Без конца сжатого потока распаковка молча дала бы укороченные данные
+        raise ValueError("Сжатая секция контейнера обрезана")
+
+
+def decompress(data, method):
+    """Распаковывает тело секции по байту сжатия из каталога"""
+    if method == COMPRESSION_NONE:
+        return data
+    return b''.join(iter_decompress([data], method))
+
+
+def encode_header(fields):
+    """Словарь метаданных -> тело секции заголовка"""
+    return ''.join(f"{name}={value}\n" for name, value in fields.items()).encode('utf-8')
+
+
+def decode_header(data):
+    """Тело секции заголовка -> словарь метаданных"""
+    fields = {}
+    for line in data.decode('utf-8').splitlines():
+        name, _, value = line.partition('=')
+        fields[name] = value
+    return fields
+
+
+def write_container(f, sections):
+    """
+    Записывает контейнер в открытый двоичный файл.
+
+    :param f: Файл, открытый на запись.
+    :param sections: Список (тип, данные, сжатие), сжатие - см. parse_compression;
+                     если сжатие не уменьшает секцию, она хранится как есть.
+    :return: Число записанных байтов.
+    """
+    bodies = []
+    for kind, data, compression in sections:
+        method = parse_compression(compression)
+        body = compress(data, method)
+        if len(body) < len(data):
+            bodies.append((kind, method, body))
+        else:
+            # Сжатие не окупилось (типично для маленьких словарей)
+            bodies.append((kind, COMPRESSION_NONE, data))
+    offset = PREFIX.size + ENTRY.size * len(bodies)
+    directory = bytearray(PREFIX.pack(MAGIC, VERSION, len(bodies)))
+    for kind, method, body in bodies:
+        directory += ENTRY.pack(kind, method, offset, len(body))
+        offset += len(body)
+    f.write(directory)
+    for _, _, body in bodies:
+        f.write(body)
+    return offset
+
+
+def is_container(path):
+    """True, если файл начинается с сигнатуры контейнера"""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class ContainerReader:
+    """Ленивое чтение секций контейнера из файла или bytes"""
+
+    def __init__(self, source):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+            self._owns_file = True
+        elif isinstance(source, str):
+            source = open(source, 'rb')
+            self._owns_file = True
+        else:
+            self._owns_file = False
+        self._file = source
+        self._base = source.tell()
+        prefix = source.read(PREFIX.size)
+        if len(prefix) < PREFIX.size:
+            raise ValueError("Файл не является контейнером DTC")
+        magic, version, count = PREFIX.unpack(prefix)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Файл не является контейнером DTC")
+        directory = source.read(ENTRY.size * count)
+        if len(directory) < ENTRY.size * count:
+            raise ValueError("Каталог контейнера обрезан")
+        size = source.seek(0, io.SEEK_END) - self._base
+        self.sections = {}
+        for kind, method, offset, length in ENTRY.iter_unpack(directory):
+            # Секция должна лежать в файле после каталога
+            if offset < PREFIX.size + ENTRY.size * count or offset + length > size:
+                raise ValueError("Секция контейнера за пределами файла")
+            self.sections[kind] = (method, offset, length)
+        self._cache = {}
+
+    def raw_section(self, kind):
+        """Тело секции как есть (сжатое), без распаковки"""
+        _, offset, length = self.sections[kind]
+        self._file.seek(self._base + offset)
+        return self._file.read(length)
+
+    def iter_section(self, kind, chunk_size=STREAM_CHUNK_SIZE):
+        """Потоковое чтение секции с распаковкой, без загрузки целиком"""
+        method, offset, length = self.sections[kind]
+
+        def raw_chunks():
+            position = self._base + offset
+            remaining = length
+            while remaining:
+                self._file.seek(position)
+                chunk = self._file.read(min(chunk_size, remaining))
+                if not chunk:
+                    raise ValueError("Контейнер обрезан")
+                position += len(chunk)
+                remaining -= len(chunk)
+                yield chunk
+
+        return iter_decompress(raw_chunks(), method)
+
+    def section(self, kind):
+        """Распакованное тело секции; читается при первом обращении"""
+        if kind not in self._cache:
+            if kind not in self.sections:
+                return None
+            self._cache[kind] = decompress(self.raw_section(kind), self.sections[kind][0])
+        return self._cache[kind]
+
+    @property
+    def header(self):
+        data = self.section(SECTION_HEADER)
+        return decode_header(data) if data is not None else {}
+
+    @property
+    def encoding(self):
+        return self.section(SECTION_ENCODING).decode('utf-8')
+
+    @property
+    def dictionary(self):
+        return self.section(SECTION_DICTIONARY)
+
+    @property
+    def payload(self):
+        return self.section(SECTION_PAYLOAD)
+
+    def close(self):
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,449 @@
+"""
+Локальный сервер кодека DTC.py со статической библиотекой в памяти.
+
+encrypt_file/decrypt_file из DTC.py при каждом вызове заново читают и
+разбирают word_lib.dtl; для небольших документов это основная задержка.
+Сервер держит разобранные библиотеки и готовые таблицы двоичного режима в
+памяти и принимает запросы через Unix-сокет на той же машине. Перед каждым
+запросом проверяются размер и время изменения файла библиотеки: измененная
+библиотека перечитывается без перезапуска (горячая перезагрузка).
+
+Протокол (одно соединение - сколько угодно запросов подряд):
+    запрос:  строка JSON {"op": ..., "library": ..., "binary": ...} и тело
+    ответ:   строка JSON {"ok": true|false, "error": ...} и тело
+    тело:    порции (длина uint32 big-endian + байты), порция нулевой длины -
+             конец тела; тело передается потоком, длина заранее не нужна
+Операции: encode, decode, reload, metrics, ping.
+
+Клиент Client повторяет функции DTC.py: encrypt_file, decrypt_file,
+encrypt_text, decrypt_text (вместо словаря - путь к библиотеке).
+
+Запуск из корня репозитория:
+    python -m DTC.daemon serve /tmp/dtc.sock --preload word_lib.dtl
+    python -m DTC.daemon encode /tmp/dtc.sock word_lib.dtl txt/a.txt dtc/a.dtc --binary
+    python -m DTC.daemon decode /tmp/dtc.sock word_lib.dtl dtc/a.dtc decrypted/a.txt
+    python -m DTC.daemon metrics /tmp/dtc.sock
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+try:
+    from .loader import load_version
+except ImportError:  # запуск как скрипта из папки DTC
+    from loader import load_version
+
+logger = logging.getLogger(__name__)
+
+CODEC_FILE = 'DTC.py'
+CHUNK = struct.Struct('>I')
+CHUNK_SIZE = 256 * 1024
+MAX_HEADER_SIZE = 64 * 1024
+LATENCY_WINDOW = 4096  # Последних замеров на операцию для перцентилей
+
+
+def codec():
+    return load_version(CODEC_FILE)
+
+
+def write_message(f, header, body=b''):
+    """Пишет заголовок и тело; body - bytes или итератор порций bytes"""
+    f.write(json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n')
+    chunks = [body] if isinstance(body, (bytes, bytearray, memoryview)) else body
+    for chunk in chunks:
+        view = memoryview(chunk)
+        for start in range(0, len(view), CHUNK_SIZE):
+            piece = view[start:start + CHUNK_SIZE]
+            f.write(CHUNK.pack(len(piece)))
+            f.write(piece)
+    f.write(CHUNK.pack(0))
+    f.flush()
+
+
+def read_header(f):
+    """Заголовок сообщения; None, если соединение закрыто"""
+    line = f.readline(MAX_HEADER_SIZE)
+    if not line:
+        return None
+    if not line.endswith(b'\n'):
+        raise ValueError("Слишком длинный заголовок")
+    return json.loads(line)
+
+
+def iter_body(f):
+    """Порции тела сообщения до порции нулевой длины"""
+    while True:
+        prefix = f.read(CHUNK.size)
+        if len(prefix) < CHUNK.size:
+            raise ConnectionError("Соединение оборвано внутри тела сообщения")
+        (length,) = CHUNK.unpack(prefix)
+        if not length:
+            return
+        chunk = f.read(length)
+        if len(chunk) < length:
+            raise ConnectionError("Соединение оборвано внутри тела сообщения")
+        yield chunk
+
+
+def read_body(f):
+    return b''.join(iter_body(f))
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Library:
+    """Разобранная статическая библиотека и таблицы обоих режимов"""
+
+    def __init__(self, path):
+        dtc = codec()
+        self.path = path
+        # Подпись берется до чтения: изменение во время чтения вызовет повторную загрузку
+        self.signature = _signature(path)
+        self.word_dict = dtc.load_binary_library(path)
+        self.reverse_text = {code: word for word, code in self.word_dict.items()}
+        self.reverse_binary = {bytes.fromhex(code): word for word, code in self.word_dict.items()}
+        self.encode_units = dtc.binary_encode_units(self.word_dict)
+        self.decode_units = dtc.binary_decode_units(self.reverse_binary)
+        self.loaded_at = time.time()
+
+    def encode(self, data, binary=False):
+        """Двоичный режим, как encrypt_file в DTC.py, восстанавливает байты исходного файла точно"""
+        dtc = codec()
+        if binary:
+            return dtc.encrypt_binary(data.decode('utf-8', dtc.RAW_ERRORS), self.word_dict, self.encode_units)
+        return dtc.encrypt_text(data.decode('utf-8'), self.word_dict).encode('utf-8')
+
+    def decode(self, data):
+        """Режим определяется по сигнатуре, как в decrypt_file"""
+        dtc = codec()
+        if data.startswith(dtc.BINARY_MAGIC):
+            text = dtc.decrypt_binary(data, self.reverse_binary, self.decode_units)
+            return text.encode('utf-8', dtc.RAW_ERRORS)
+        return dtc.decrypt_text(data.decode('utf-8'), self.reverse_text).encode('utf-8')
+
+
+class Metrics:
+    """Счетчики и задержки запросов по операциям"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.started = time.time()
+        self.window = window
+        self.lock = threading.Lock()
+        self.operations = {}
+        self.reloads = 0
+
+    def record(self, op, seconds, ok, bytes_in=0, bytes_out=0):
+        with self.lock:
+            entry = self.operations.get(op)
+            if entry is None:
+                entry = self.operations[op] = {'count': 0, 'errors': 0, 'seconds': 0.0, 'bytes_in': 0,
+                                               'bytes_out': 0, 'latencies': deque(maxlen=self.window)}
+            entry['count'] += 1
+            entry['errors'] += not ok
+            entry['seconds'] += seconds
+            entry['bytes_in'] += bytes_in
+            entry['bytes_out'] += bytes_out
+            entry['latencies'].append(seconds)
+
+    def snapshot(self):
+        """Метрики для ответа metrics: задержки в миллисекундах"""
+        with self.lock:
+            operations = {}
+            for op, entry in self.operations.items():
+                latencies = sorted(entry['latencies'])
+                operations[op] = {
+                    'count': entry['count'],
+                    'errors': entry['errors'],
+                    'bytes_in': entry['bytes_in'],
+                    'bytes_out': entry['bytes_out'],
+                    'mean_ms': entry['seconds'] / entry['count'] * 1000,
+                    'p50_ms': percentile(latencies, 0.50) * 1000,
+                    'p95_ms': percentile(latencies, 0.95) * 1000,
+                    'p99_ms': percentile(latencies, 0.99) * 1000,
+                    'max_ms': latencies[-1] * 1000,
+                }
+            return {'uptime_seconds': time.time() - self.started, 'reloads': self.reloads,
+                    'operations': operations}
+
+
+def percentile(values, q):
+    """Перцентиль отсортированного списка (ближайший ранг)"""
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        while True:
+            try:
+                request = read_header(self.rfile)
+                if request is None:
+                    return
+                start = time.perf_counter()
+                body = read_body(self.rfile)
+            except (ValueError, ConnectionError) as e:
+                logger.warning('Соединение закрыто: %s', e)
+                return
+            op = request.get('op')
+            try:
+                header, response = self.server.dispatch(request, body)
+                header['ok'] = True
+            except Exception as e:
+                header, response = {'ok': False, 'error': f'{type(e).__name__}: {e}'}, b''
+            write_message(self.wfile, header, response)
+            self.server.metrics.record(str(op), time.perf_counter() - start, header['ok'],
+                                       len(body), len(response))
+
+
+class CodecServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Сервер с кэшем библиотек; каждое соединение обслуживается своим потоком"""
+    daemon_threads = True
+
+    def __init__(self, socket_path, preload=()):
+        self.libraries = {}
+        self.lock = threading.Lock()
+        self.metrics = Metrics()
+        for path in preload:
+            self.library(path)
+        super().__init__(socket_path, RequestHandler)
+
+    def library(self, path, force=False):
+        """Библиотека из кэша; перечитывается, если файл изменился (или force)"""
+        path = os.path.abspath(path)
+        signature = _signature(path)
+        library = self.libraries.get(path)
+        if library is not None and library.signature == signature and not force:
+            return library
+        with self.lock:
+            library = self.libraries.get(path)
+            if library is None or library.signature != signature or force:
+                if library is not None:
+                    self.metrics.reloads += 1
+                    logger.info('Библиотека изменилась, перезагрузка: %s', path)
+                library = self.libraries[path] = Library(path)
+                logger.info('Библиотека загружена: %s, слов: %d', path, len(library.word_dict))
+        return library
+
+    def dispatch(self, request, body):
+        """Выполняет запрос; возвращает (заголовок ответа, тело ответа)"""
+        op = request.get('op')
+        if op == 'encode':
+            library = self.library(request['library'])
+            return {}, library.encode(body, bool(request.get('binary')))
+        if op == 'decode':
+            return {}, self.library(request['library']).decode(body)
+        if op == 'reload':
+            library = self.library(request['library'], force=True)
+            return {'words': len(library.word_dict)}, b''
+        if op == 'metrics':
+            metrics = self.metrics.snapshot()
+            metrics['libraries'] = {path: {'words': len(library.word_dict), 'loaded_at': library.loaded_at}
+                                    for path, library in list(self.libraries.items())}
+            return {'metrics': metrics}, b''
+        if op == 'ping':
+            return {}, b''
+        raise ValueError(f"Неизвестная операция: {op}")
+
+
+def serve(socket_path, preload=()):
+    """
+    Запускает сервер и обслуживает запросы до прерывания.
+    Оставшийся от прошлого запуска файл сокета удаляется, если к нему
+    никто не подключен.
+    """
+    if os.path.exists(socket_path):
+        try:
+            with Client(socket_path) as client:
+                client.ping()
+        except OSError:
+            os.unlink(socket_path)
+        else:
+            raise RuntimeError(f"Сервер уже запущен: {socket_path}")
+    server = CodecServer(socket_path, preload)
+    logger.info('Сервер DTC слушает %s', socket_path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.unlink(socket_path)
+
+
+class ServerError(Exception):
+    """Ошибка, которую вернул сервер"""
+
+
+class Client:
+    """
+    Клиент сервера DTC; методы повторяют функции DTC.py, но вместо
+    словаря принимают путь к библиотеке. Соединение открывается при
+    первом запросе и переиспользуется.
+    """
+
+    def __init__(self, socket_path, timeout=None):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.connection = None
+        self.file = None
+
+    def connect(self):
+        if self.connection is None:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self.timeout)
+            try:
+                connection.connect(self.socket_path)
+            except OSError:
+                connection.close()
+                raise
+            self.connection = connection
+            self.file = connection.makefile('rwb')
+        return self.file
+
+    def request(self, header, body=b'', sink=None):
+        """
+        Отправляет запрос и читает ответ.
+
+        :param body: bytes или итератор порций.
+        :param sink: Функция для порций тела ответа; без нее тело возвращается целиком.
+        :return: (заголовок ответа, тело ответа или None при sink).
+        """
+        f = self.connect()
+        try:
+            write_message(f, header, body)
+            response = read_header(f)
+            if response is None:
+                raise ConnectionError("Сервер закрыл соединение")
+            if sink is None:
+                data = read_body(f)
+            else:
+                for chunk in iter_body(f):
+                    sink(chunk)
+                data = None
+        except (OSError, ValueError):
+            # Поток рассинхронизирован: следующий запрос откроет новое соединение
+            self.close()
+            raise
+        if not response.get('ok'):
+            raise ServerError(response.get('error'))
+        return response, data
+
+    def encrypt_text(self, text, library_filename, binary=False):
+        """Как DTC.encrypt_text/encrypt_binary: str в текстовом режиме, bytes в двоичном"""
+        _, data = self.request({'op': 'encode', 'library': os.path.abspath(library_filename),
+                                'binary': binary}, text.encode('utf-8', codec().RAW_ERRORS))
+        return data if binary else data.decode('utf-8')
+
+    def decrypt_text(self, data, library_filename):
+        """Как DTC.decrypt_text/decrypt_binary: режим определяется по сигнатуре данных"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        _, decrypted = self.request({'op': 'decode', 'library': os.path.abspath(library_filename)}, data)
+        return decrypted.decode('utf-8', codec().RAW_ERRORS)
+
+    def encrypt_file(self, input_filename, output_filename, library_filename, binary=False):
+        """
+        Как DTC.encrypt_file: в двоичном режиме файл отправляется байтами потоком,
+        в текстовом читается DTC.load_file. Результат пишется потоком.
+        """
+        header = {'op': 'encode', 'library': os.path.abspath(library_filename), 'binary': binary}
+        if not binary:
+            with open(output_filename, 'wb') as f:
+                self.request(header, codec().load_file(input_filename).encode('utf-8'), f.write)
+            return
+        with open(input_filename, 'rb') as source, open(output_filename, 'wb') as f:
+            self.request(header, iter(lambda: source.read(CHUNK_SIZE), b''), f.write)
+
+    def decrypt_file(self, input_filename, output_filename, library_filename):
+        """Как DTC.decrypt_file; файл отправляется и результат пишется потоком"""
+        with open(input_filename, 'rb') as source, open(output_filename, 'wb') as f:
+            self.request({'op': 'decode', 'library': os.path.abspath(library_filename)},
+                         iter(lambda: source.read(CHUNK_SIZE), b''), f.write)
+
+    def reload(self, library_filename):
+        """Принудительно перечитывает библиотеку; возвращает число слов"""
+        response, _ = self.request({'op': 'reload', 'library': os.path.abspath(library_filename)})
+        return response['words']
+
+    def metrics(self):
+        response, _ = self.request({'op': 'metrics'})
+        return response['metrics']
+
+    def ping(self):
+        self.request({'op': 'ping'})
+        return True
+
+    def close(self):
+        if self.connection is not None:
+            self.file.close()
+            self.connection.close()
+            self.connection = self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help='Запустить сервер')
+    serve_parser.add_argument('socket')
+    serve_parser.add_argument('--preload', nargs='*', default=[], help='Библиотеки для загрузки при старте')
+    for name in ('encode', 'decode'):
+        command = commands.add_parser(name, help='Зашифровать файл' if name == 'encode' else 'Расшифровать файл')
+        command.add_argument('socket')
+        command.add_argument('library')
+        command.add_argument('input')
+        command.add_argument('output')
+        if name == 'encode':
+            command.add_argument('--binary', action='store_true', help='Двоичный режим')
+    reload_parser = commands.add_parser('reload', help='Перечитать библиотеку')
+    reload_parser.add_argument('socket')
+    reload_parser.add_argument('library')
+    metrics_parser = commands.add_parser('metrics', help='Метрики сервера в JSON')
+    metrics_parser.add_argument('socket')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.command == 'serve':
+        # SIGTERM завершает сервер так же, как Ctrl+C: файл сокета удаляется
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            serve(args.socket, args.preload)
+        except KeyboardInterrupt:
+            pass
+        except (OSError, RuntimeError) as e:
+            logger.error('Ошибка: %s', e)
+            return 1
+        return 0
+    try:
+        with Client(args.socket) as client:
+            if args.command == 'encode':
+                client.encrypt_file(args.input, args.output, args.library, args.binary)
+            elif args.command == 'decode':
+                client.decrypt_file(args.input, args.output, args.library)
+            elif args.command == 'reload':
+                logger.info('Слов в библиотеке: %d', client.reload(args.library))
+            else:
+                print(json.dumps(client.metrics(), ensure_ascii=False, indent=2))
+    except (OSError, ServerError) as e:
+        logger.error('Ошибка: %s', e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,12 @@
 import string
 import json
 import os
+import re
+
+try:
+    from .encript_dtc import CodeSequence
+except ImportError:  # запуск как скрипта из папки DTC
+    from encript_dtc import CodeSequence
 
 def load_file(filename, encoding='utf-8'):
     """
@@ -64,41 +70,28 @@ def create_word_dictionary(words):
     for word in words:
         frequency[word] = frequency.get(word, 0) + 1
 
-    sorted_words = sorted(frequency.items(), key=lambda x: (-x[1], -len(x[0])))
+    # Слово в ключе сортировки делает порядок (и коды) детерминированным
+    sorted_words = sorted(frequency.items(), key=lambda x: (-x[1], -len(x[0]), x[0]))
 
     codes = generate_codes(len(sorted_words))
 
     word_dict = {}
     reverse_dict = {}
-    for i, (word, freq) in enumerate(sorted_words):
-        word_dict[word] = codes[i]
-        reverse_dict[codes[i]] = word
+    for (word, _), code in zip(sorted_words, codes):
+        word_dict[word] = code
+        reverse_dict[code] = word
 
     return word_dict, reverse_dict
 
 def generate_codes(count):
     """
-    Генерирует уникальные коды без ведущих нулей.
+    Генерирует уникальные коды: короткие идут первыми, поэтому самые частые
+    слова (первые в отсортированном списке) получают самые короткие коды.
 
     :param count: Количество необходимых кодов.
-    :return: Список уникальных кодов.
-    """
-    codes = set()
-    current_length = 1
-    while len(codes) < count:
-        if current_length > 4:
-            current_length += 1
-            continue
-        alphabet = string.ascii_letters + string.digits
-        possible_codes = [''.join(p) for p in product(alphabet, repeat=current_length)]
-        for code in possible_codes:
-            if code not in codes:
-                codes.add(code)
-                if len(codes) == count:
-                    break
-        current_length += 1
-
-    return list(codes)
+    :return: Ленивая последовательность кодов (CodeSequence) с доступом по номеру.
+    """
+    return CodeSequence(count)
 
 def decrypt_text(encrypted_text, reverse_dict):
     """
@@ -0,0 +1,146 @@
+"""
+Двоичный формат словаря .dtl для DTC_v4 и prof_dtc.
+
+Структура файла (все числа little-endian):
+    b'DTLB'             - сигнатура
+    версия              - 1 байт
+    флаги               - 1 байт (FLAG_WIDE_LENGTHS, FLAG_COUNTS, FLAG_WIDE_COUNTS)
+    count               - uint32, число записей
+    длины ключей        - count байт
+    длины слов          - count * uint16 (uint32 при FLAG_WIDE_LENGTHS), в символах
+    частоты слов        - count * uint32 (uint64 при FLAG_WIDE_COUNTS), только при FLAG_COUNTS
+    ключи               - подряд, без разделителей
+    слова               - подряд, одна строка UTF-8
+
+Загрузка - одно чтение файла, одно декодирование UTF-8 и нарезка срезами.
+Слова могут содержать пробелы и переводы строк. Текстовый вид
+"<hex-ключ> <слово>" остается для отладки (export_text) и для чтения
+старых словарей.
+"""
+import struct
+from itertools import accumulate
+
+MAGIC = b'DTLB'
+VERSION = 1
+HEADER = struct.Struct('<4sBBI')
+FLAG_WIDE_LENGTHS = 0x01
+FLAG_COUNTS = 0x02
+FLAG_WIDE_COUNTS = 0x04
+
+
+def write_dictionary(path, dictionary, counts=None):
+    """
+    Сохраняет словарь в двоичном формате.
+
+    :param path: Путь к файлу .dtl.
+    :param dictionary: Словарь {слово: ключ (bytes)}.
+    :param counts: Частоты слов {слово: число} (необязательно); частоты от
+                   2**32 пишутся как uint64, отрицательные - ValueError.
+    """
+    words = list(dictionary)
+    keys = [dictionary[word] for word in words]
+    wide = any(len(word) > 0xFFFF for word in words)
+    flags = FLAG_WIDE_LENGTHS if wide else 0
+    length_format = f"<{len(words)}{'I' if wide else 'H'}"
+    if counts is not None:
+        # Проверка до записи: иначе ошибка struct появилась бы на полузаписанном файле
+        word_counts = [counts[word] for word in words]
+        if any(not 0 <= count < 1 << 64 for count in word_counts):
+            raise ValueError("Частота слова вне диапазона uint64")
+        wide_counts = any(count > 0xFFFFFFFF for count in word_counts)
+        flags |= FLAG_COUNTS | (FLAG_WIDE_COUNTS if wide_counts else 0)
+        counts_format = f"<{len(words)}{'Q' if wide_counts else 'I'}"
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, len(words)))
+        f.write(bytes(len(key) for key in keys))
+        f.write(struct.pack(length_format, *map(len, words)))
+        if counts is not None:
+            f.write(struct.pack(counts_format, *word_counts))
+        f.write(b''.join(keys))
+        f.write(''.join(words).encode('utf-8'))
+
+
+def read_dictionary(data):
+    """
+    Разбирает двоичный словарь.
+
+    :param data: Содержимое файла .dtl.
+    :return: Словарь {ключ (bytes): слово}.
+    """
+    return read_dictionary_counts(data)[0]
+
+
+def read_dictionary_counts(data):
+    """
+    Разбирает двоичный словарь вместе с частотами слов.
+
+    :param data: Содержимое файла .dtl.
+    :return: (словарь {ключ (bytes): слово}, список частот в порядке словаря
+             или None, если словарь записан без частот).
+    """
+    magic, version, flags, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Неподдерживаемый формат словаря")
+    offset = HEADER.size
+    key_lengths = data[offset:offset + count]
+    offset += count
+    length_format = struct.Struct(f"<{count}{'I' if flags & FLAG_WIDE_LENGTHS else 'H'}")
+    word_lengths = length_format.unpack_from(data, offset)
+    offset += length_format.size
+    counts = None
+    if flags & FLAG_COUNTS:
+        counts_format = struct.Struct(f"<{count}{'Q' if flags & FLAG_WIDE_COUNTS else 'I'}")
+        counts = list(counts_format.unpack_from(data, offset))
+        offset += counts_format.size
+    key_ends = list(accumulate(key_lengths))
+    keys_end = offset + (key_ends[-1] if key_ends else 0)
+    keys_blob = data[offset:keys_end]
+    text = data[keys_end:].decode('utf-8')
+    keys = (keys_blob[end - length:end] for end, length in zip(key_ends, key_lengths))
+    words = (text[end - length:end] for end, length in zip(accumulate(word_lengths), word_lengths))
+    return dict(zip(keys, words)), counts
+
+
+def read_text_dictionary(data):
+    """
+    Разбирает текстовый словарь "<hex-ключ> <слово>" по строкам.
+
+    :param data: Содержимое файла .dtl.
+    :return: Словарь {ключ (bytes): слово}.
+    """
+    dictionary = {}
+    for line in data.decode('utf-8').splitlines():
+        parts = line.strip().split(' ', 1)
+        if len(parts) == 2:
+            key_hex, word = parts
+            try:
+                dictionary[bytes.fromhex(key_hex)] = word
+            except ValueError:
+                continue
+    return dictionary
+
+
+def load_dictionary(path):
+    """
+    Загружает словарь .dtl в двоичном или старом текстовом формате.
+
+    :param path: Путь к файлу .dtl.
+    :return: Словарь {ключ (bytes): слово}.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data.startswith(MAGIC):
+        return read_dictionary(data)
+    return read_text_dictionary(data)
+
+
+def export_text(path, dictionary):
+    """
+    Отладочная выгрузка словаря в текстовом виде "<hex-ключ> <слово>".
+
+    :param path: Путь к текстовому файлу.
+    :param dictionary: Словарь {слово: ключ (bytes)}.
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        for word, key in dictionary.items():
+            f.write(f"{key.hex()} {word}\n")
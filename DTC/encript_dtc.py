@@ -1,6 +1,11 @@
 import string
 import json
 import os
+import re
+from collections.abc import Sequence
+from itertools import count as count_from, islice, product
+
+CODE_ALPHABET = string.ascii_letters + string.digits
 
 def load_file(filename, encoding='utf-8'):
     """
@@ -78,41 +83,65 @@ def create_word_dictionary(words):
     for word in words:
         frequency[word] = frequency.get(word, 0) + 1
 
-    sorted_words = sorted(frequency.items(), key=lambda x: (-x[1], -len(x[0])))
+    # Слово в ключе сортировки делает порядок (и коды) детерминированным
+    sorted_words = sorted(frequency.items(), key=lambda x: (-x[1], -len(x[0]), x[0]))
 
     codes = generate_codes(len(sorted_words))
 
     word_dict = {}
     reverse_dict = {}
-    for i, (word, freq) in enumerate(sorted_words):
-        word_dict[word] = codes[i]
-        reverse_dict[codes[i]] = word
+    for (word, _), code in zip(sorted_words, codes):
+        word_dict[word] = code
+        reverse_dict[code] = word
 
     return word_dict, reverse_dict
 
+class CodeSequence(Sequence):
+    """
+    Ленивая упорядоченная последовательность кодов: сначала все коды длины 1,
+    затем длины 2 и т.д. Код вычисляется по номеру, списки не создаются.
+    """
+
+    def __init__(self, count, alphabet=CODE_ALPHABET):
+        self.count = count
+        self.alphabet = alphabet
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("Номер кода вне последовательности")
+        base = len(self.alphabet)
+        length, block = 1, base
+        while index >= block:
+            index -= block
+            length += 1
+            block *= base
+        digits = []
+        for _ in range(length):
+            index, digit = divmod(index, base)
+            digits.append(self.alphabet[digit])
+        return ''.join(reversed(digits))
+
+    def __iter__(self):
+        codes = (''.join(p) for length in count_from(1) for p in product(self.alphabet, repeat=length))
+        return islice(codes, self.count)
+
+
 def generate_codes(count):
     """
-    Генерирует уникальные коды без ведущих нулей.
+    Генерирует уникальные коды: короткие идут первыми, поэтому самые частые
+    слова (первые в отсортированном списке) получают самые короткие коды.
 
     :param count: Количество необходимых кодов.
-    :return: Список уникальных кодов.
-    """
-    codes = set()
-    current_length = 1
-    while len(codes) < count:
-        if current_length > 4:
-            current_length += 1
-            continue
-        alphabet = string.ascii_letters + string.digits
-        possible_codes = [''.join(p) for p in product(alphabet, repeat=current_length)]
-        for code in possible_codes:
-            if code not in codes:
-                codes.add(code)
-                if len(codes) == count:
-                    break
-        current_length += 1
-
-    return list(codes)
+    :return: Ленивая последовательность кодов (CodeSequence) с доступом по номеру.
+    """
+    return CodeSequence(count)
 
 def encrypt_text(text, word_dict):
     """
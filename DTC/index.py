@@ -0,0 +1,235 @@
+"""
+Инвертированный индекс коллекции архивов: слово -> файлы.
+
+Индекс строится только по словарям (см. vocabulary.py), данные .dtc не
+читаются. Хранится в SQLite:
+    files(id, path, mtime_ns, size)       - проиндексированные архивы
+    words(id, word)                       - общий словарь коллекции
+    postings(word_id, file_id, rank, count)
+                                          - WITHOUT ROWID, упорядочены по
+                                            слову, поэтому поиск слова - один
+                                            проход по B-дереву
+
+rank - место слова по частоте в файле, count - частота, если словарь ее хранит.
+
+Пути архивов хранятся абсолютными. Добавление инкрементальное: архивы с
+прежними размером и временем изменения пропускаются, измененные
+переиндексируются.
+
+Запуск из корня репозитория:
+    python -m DTC.index build collection.idx dtc/ --workers 8
+    python -m DTC.index lookup collection.idx слово
+    python -m DTC.index prune collection.idx
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from .search import iter_archives
+    from .vocabulary import archive_path, read_vocabulary
+except ImportError:  # запуск как скрипта из папки DTC
+    from search import iter_archives
+    from vocabulary import archive_path, read_vocabulary
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS words (
+    id INTEGER PRIMARY KEY,
+    word TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS postings (
+    word_id INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    count INTEGER,
+    PRIMARY KEY (word_id, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+"""
+
+LOOKUP_SQL = """
+SELECT files.path, postings.count, postings.rank
+FROM words
+JOIN postings ON postings.word_id = words.id
+JOIN files ON files.id = postings.file_id
+WHERE words.word = ?
+ORDER BY postings.count DESC, postings.rank, files.path
+"""
+
+
+def _signature(path):
+    """Размер и время изменения архива и его словаря: признак изменения"""
+    stats = [os.stat(p) for p in (path, os.path.splitext(path)[0] + '.dtl') if os.path.exists(p)]
+    if not stats:
+        raise FileNotFoundError(f"Архив не найден: {path}")
+    return max(s.st_mtime_ns for s in stats), sum(s.st_size for s in stats)
+
+
+def _read_task(path):
+    try:
+        return path, list(read_vocabulary(path).items()), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+class Index:
+    """Инвертированный индекс в файле SQLite"""
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def add(self, paths, workers=None):
+        """
+        Добавляет архивы в индекс; неизмененные пропускаются.
+
+        :param paths: Архивы .dtc, их словари .dtl или папки с ними.
+        :param workers: Число процессов для чтения словарей (1 - без пула).
+        :return: (число проиндексированных, число пропущенных, список (путь, ошибка)).
+        """
+        known = dict(((path, (mtime, size)) for path, mtime, size
+                      in self.connection.execute('SELECT path, mtime_ns, size FROM files')))
+        pending = []
+        skipped = 0
+        errors = []
+        for path in dict.fromkeys(archive_path(os.path.abspath(p)) for p in iter_archives(paths)):
+            try:
+                signature = _signature(path)
+            except OSError as e:
+                errors.append((path, str(e)))
+                continue
+            if known.get(path) == signature:
+                skipped += 1
+            else:
+                pending.append(path)
+
+        if workers == 1 or len(pending) < 2:
+            results = map(_read_task, pending)
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(workers)
+            results = pool.map(_read_task, pending, chunksize=16)
+        indexed = 0
+        try:
+            with self.connection:
+                for path, items, error in results:
+                    if error is not None:
+                        errors.append((path, error))
+                        continue
+                    self._store(path, items)
+                    indexed += 1
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return indexed, skipped, errors
+
+    def _store(self, path, items):
+        mtime, size = _signature(path)
+        cursor = self.connection.cursor()
+        row = cursor.execute('SELECT id FROM files WHERE path = ?', (path,)).fetchone()
+        if row is None:
+            cursor.execute('INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)', (path, mtime, size))
+            file_id = cursor.lastrowid
+        else:
+            file_id = row[0]
+            cursor.execute('UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?', (mtime, size, file_id))
+            cursor.execute('DELETE FROM postings WHERE file_id = ?', (file_id,))
+        cursor.executemany('INSERT OR IGNORE INTO words (word) VALUES (?)', ((word,) for word, _, _ in items))
+        cursor.executemany(
+            'INSERT OR REPLACE INTO postings (word_id, file_id, rank, count) '
+            'SELECT id, ?, ?, ? FROM words WHERE word = ?',
+            ((file_id, rank, count, word) for word, rank, count in items))
+
+    def remove(self, path):
+        """Удаляет архив из индекса"""
+        with self.connection:
+            row = self.connection.execute('SELECT id FROM files WHERE path = ?', (archive_path(os.path.abspath(path)),)).fetchone()
+            if row is not None:
+                self.connection.execute('DELETE FROM postings WHERE file_id = ?', row)
+                self.connection.execute('DELETE FROM files WHERE id = ?', row)
+        return row is not None
+
+    def prune(self):
+        """Удаляет из индекса архивы, которых больше нет на диске"""
+        missing = [path for (path,) in self.connection.execute('SELECT path FROM files')
+                   if not os.path.exists(path)]
+        for path in missing:
+            self.remove(path)
+        return missing
+
+    def lookup(self, word):
+        """
+        Архивы, содержащие слово.
+
+        :return: Список (путь, частота или None, номер по частоте) - сначала
+                 файлы, где слово встречается чаще.
+        """
+        return self.connection.execute(LOOKUP_SQL, (word,)).fetchall()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='Добавить архивы в индекс')
+    build.add_argument('index')
+    build.add_argument('paths', nargs='+')
+    build.add_argument('--workers', type=int, default=None)
+    lookup = commands.add_parser('lookup', help='Найти архивы со словом')
+    lookup.add_argument('index')
+    lookup.add_argument('words', nargs='+')
+    prune = commands.add_parser('prune', help='Убрать удаленные архивы')
+    prune.add_argument('index')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    with Index(args.index) as index:
+        if args.command == 'build':
+            start = time.perf_counter()
+            indexed, skipped, errors = index.add(args.paths, args.workers)
+            logger.info('Проиндексировано: %d, без изменений: %d, ошибок: %d, %.2f с',
+                        indexed, skipped, len(errors), time.perf_counter() - start)
+            for path, error in errors:
+                logger.error('Ошибка индексации %s: %s', path, error)
+            return 1 if errors else 0
+        if args.command == 'prune':
+            for path in index.prune():
+                logger.info('Удален из индекса: %s', path)
+            return 0
+        found = False
+        for word in args.words:
+            start = time.perf_counter()
+            rows = index.lookup(word)
+            logger.info('%s: %d файлов за %.3f мс', word, len(rows), (time.perf_counter() - start) * 1000)
+            for path, count, rank in rows:
+                found = True
+                print(f"{word}\t{path}\t{'' if count is None else count}\t{rank}")
+        return 0 if found else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Загрузка версий кодека по имени файла.
+
+Файлы вида DTC_v1.4.py нельзя импортировать обычным import из-за точки
+в имени, поэтому они подгружаются как подмодули пакета DTC (DTC.DTC_v1_4).
+"""
+import importlib.util
+import os
+import sys
+import threading
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Модуль попадает в sys.modules до выполнения: без блокировки другой поток
+# может получить его недогруженным
+_lock = threading.RLock()
+_loading = {}
+
+
+def load_version(filename):
+    """
+    Загружает модуль кодека из файла пакета DTC.
+
+    :param filename: Имя файла, например 'DTC_v1.4.py'.
+    :return: Загруженный модуль (кэшируется в sys.modules).
+    """
+    module_name = 'DTC.' + os.path.splitext(filename)[0].replace('.', '_')
+    module = sys.modules.get(module_name)
+    if module is not None and not _loading.get(module_name):
+        return module
+    with _lock:
+        if module_name in sys.modules:
+            return sys.modules[module_name]
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(PACKAGE_DIR, filename))
+        module = importlib.util.module_from_spec(spec)
+        _loading[module_name] = True
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[module_name]
+            raise
+        finally:
+            del _loading[module_name]
+        return module
@@ -1,6 +1,15 @@
 import os
 import re
-from collections import defaultdict
+import logging
+from collections import Counter
+from itertools import chain
+
+try:
+    from .dtl import export_text, load_dictionary, write_dictionary
+except ImportError:  # запуск как скрипта из папки DTC
+    from dtl import export_text, load_dictionary, write_dictionary
+
+logger = logging.getLogger(__name__)
 
 
 class TextEncryptorDecryptor:
@@ -15,6 +24,8 @@ class TextEncryptorDecryptor:
     def __init__(self, input_filename):
         self.input_filename = input_filename
         self.base_name = os.path.splitext(input_filename)[0]
+        # Частоты слов последнего словаря; сохраняются в .dtl
+        self.word_counts = {}
 
     def get_words_and_separators(self, text):
         pattern = re.compile(
@@ -31,104 +42,131 @@ class TextEncryptorDecryptor:
         return tokens
 
     def create_dictionary(self, tokens):
-        word_counts = defaultdict(int)
-        for token in tokens:
-            if len(token) > 1 or (len(token) == 1 and ord(token[0]) not in self.FORBIDDEN_BYTES):
-                word_counts[token] += 1
+        # Подсчет одним проходом Counter; разделители отбрасываются среди
+        # различных токенов, а не проверяются на каждом вхождении
+        word_counts = Counter(tokens)
+        for token in [token for token in word_counts
+                      if len(token) == 1 and ord(token) in self.FORBIDDEN_BYTES]:
+            del word_counts[token]
+        self.word_counts = word_counts
         sorted_words = sorted(
             word_counts.items(),
             key=lambda x: (-x[1], -len(x[0]), x[0])
         )
-        dictionary = {}
-        used_keys = set()
-        current_key = 0x01
-        for word, _ in sorted_words:
-            while current_key in self.FORBIDDEN_BYTES or current_key in used_keys:
-                current_key = (current_key + 1) % 0x100
-                if current_key == 0x00:
-                    current_key = 0x01
-            if current_key in self.FORBIDDEN_BYTES:
-                raise ValueError("Недостаточно свободных ключей")
-            dictionary[word] = bytes([current_key])
-            used_keys.add(current_key)
-            current_key += 1
-            if current_key > 0xFF:
-                current_key = 0x01
-        return dictionary
-
-    def encrypt_file(self, output_dtc_path, output_dict_path):
+        allowed = [b for b in range(0x01, 0x100) if b not in self.FORBIDDEN_BYTES]
+        leads = self.overflow_leads(len(sorted_words), allowed)
+        if len(sorted_words) > len(allowed) - len(leads) + len(leads) * 0x100:
+            raise ValueError("Недостаточно свободных ключей")
+        # Частые слова получают однобайтовые ключи, редкие - двухбайтовые
+        # ключи за зарезервированными ведущими байтами
+        single_keys = (bytes([b]) for b in allowed if b not in leads)
+        overflow_keys = (bytes([lead, b]) for lead in leads for b in range(0x100))
+        keys = chain(single_keys, overflow_keys)
+        return {word: next(keys) for word, _ in sorted_words}
+
+    def overflow_leads(self, word_count, allowed):
+        """Ведущие байты двухбайтовых ключей: столько старших разрешенных байтов, сколько нужно"""
+        if word_count <= len(allowed):
+            return []
+        lead_count = min(len(allowed), -(-(word_count - len(allowed)) // 0xFF))
+        return allowed[-lead_count:]
+
+    def encode_tokens(self, tokens, dictionary):
+        encrypted_data = bytearray()
+        for token in tokens:
+            if token in dictionary:
+                encrypted_data.extend(dictionary[token])
+            else:
+                encrypted_data.extend(token.encode('utf-8'))
+        return encrypted_data
+
+    def decode_bytes(self, encrypted_data, dictionary):
+        """Побайтовое декодирование с поддержкой двухбайтовых ключей"""
+        leads = {key[0] for key in dictionary if len(key) == 2}
+        decrypted = []
+        i = 0
+        while i < len(encrypted_data):
+            byte = encrypted_data[i:i + 1]
+            if byte in dictionary:
+                decrypted.append(dictionary[byte])
+                i += 1
+            elif byte[0] in leads:
+                decrypted.append(dictionary.get(encrypted_data[i:i + 2], '\uFFFD'))
+                i += 2
+            else:
+                try:
+                    char = encrypted_data[i:i + 1].decode('utf-8')
+                    decrypted.append(char)
+                    i += 1
+                except UnicodeDecodeError:
+                    try:
+                        char = encrypted_data[i:i + 2].decode('utf-8')
+                        decrypted.append(char)
+                        i += 2
+                    except:
+                        decrypted.append('\uFFFD')  # Символ замены
+                        i += 1
+        return ''.join(decrypted)
+
+    def decode_bytes_table(self, encrypted_data, dictionary):
+        """
+        Декодирование через таблицу расширения на 256 элементов.
+        Применимо, когда все ключи однобайтовые: каждый байт заменяется
+        словом или остается собой. Литералы кодировщика - ASCII-разделители
+        и C2 A0, оба байта которого запрещены для ключей.
+        """
+        table = [bytes([b]) for b in range(0x100)]
+        for key, word in dictionary.items():
+            table[key[0]] = word.encode('utf-8')
+        return b''.join(map(table.__getitem__, encrypted_data)).decode('utf-8', errors='replace')
+
+    def encrypt_file(self, output_dtc_path, output_dict_path, debug_dict_path=None):
+        """debug_dict_path: дополнительно выгрузить словарь в текстовом виде"""
         try:
             with open(os.path.join('txt', self.input_filename), 'rb') as f:
                 text = f.read()
             tokens = self.get_words_and_separators(text.decode('utf-8'))
             dictionary = self.create_dictionary(tokens)
-            encrypted_data = bytearray()
-            for token in tokens:
-                if token in dictionary:
-                    encrypted_data.extend(dictionary[token])
-                else:
-                    encrypted_data.extend(token.encode('utf-8'))
+            encrypted_data = self.encode_tokens(tokens, dictionary)
             os.makedirs(os.path.dirname(output_dtc_path), exist_ok=True)
             with open(output_dtc_path, 'wb') as f:
                 f.write(encrypted_data)
-            with open(output_dict_path, 'w', encoding='utf-8') as f:
-                for word, key in dictionary.items():
-                    f.write(f"{key.hex()} {word}\n")
+            write_dictionary(output_dict_path, dictionary, self.word_counts)
+            if debug_dict_path:
+                export_text(debug_dict_path, dictionary)
         except Exception as e:
-            print(f"Ошибка при шифровании: {e}")
+            logger.error('Ошибка при шифровании: %s', e)
 
     def decrypt_file(self, input_dtc_path, output_path, dict_path):
         try:
-            print("Начало дешифрования...")
-            dictionary = {}
-            print(f"Чтение словаря из {dict_path}...")
-            with open(dict_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    parts = line.strip().split(' ', 1)
-                    if len(parts) == 2:
-                        key_hex, word = parts
-                        try:
-                            key = bytes.fromhex(key_hex)
-                            dictionary[key] = word
-                            print(f"Добавлен ключ: {key_hex} -> {word}")
-                        except ValueError:
-                            print(f"Некорректный ключ: {key_hex}")
-                            continue
-            print(f"Количество ключей в словаре: {len(dictionary)}")
-            print(f"Чтение зашифрованных данных из {input_dtc_path}...")
+            logger.info('Начало дешифрования...')
+            logger.info('Чтение словаря из %s...', dict_path)
+            dictionary = load_dictionary(dict_path)
+            # Проверка уровня один раз: отладочный вывод на каждый ключ
+            # иначе доминирует во времени дешифрования больших словарей
+            if logger.isEnabledFor(logging.DEBUG):
+                for key, word in dictionary.items():
+                    logger.debug('Добавлен ключ: %s -> %s', key.hex(), word)
+            logger.info('Количество ключей в словаре: %d', len(dictionary))
+            logger.info('Чтение зашифрованных данных из %s...', input_dtc_path)
             with open(input_dtc_path, 'rb') as f:
                 encrypted_data = f.read()
-            print(f"Размер зашифрованных данных: {len(encrypted_data)} байт")
-            decrypted = []
-            i = 0
-            while i < len(encrypted_data):
-                byte = encrypted_data[i:i + 1]
-                if byte in dictionary:
-                    decrypted.append(dictionary[byte])
-                    i += 1
-                else:
-                    try:
-                        char = encrypted_data[i:i + 1].decode('utf-8')
-                        decrypted.append(char)
-                        i += 1
-                    except UnicodeDecodeError:
-                        try:
-                            char = encrypted_data[i:i + 2].decode('utf-8')
-                            decrypted.append(char)
-                            i += 2
-                        except:
-                            decrypted.append('\uFFFD')  # Символ замены
-                            i += 1
-            print("Дешифрование завершено.")
+            logger.info('Размер зашифрованных данных: %d байт', len(encrypted_data))
+            if all(len(key) == 1 for key in dictionary):
+                decrypted = self.decode_bytes_table(encrypted_data, dictionary)
+            else:
+                decrypted = self.decode_bytes(encrypted_data, dictionary)
+            logger.info('Дешифрование завершено.')
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             with open(output_path, 'w', encoding='utf-8', newline='') as f:
-                f.write(''.join(decrypted))
-            print(f"Дешифрованный файл сохранен: {output_path}")
+                f.write(decrypted)
+            logger.info('Дешифрованный файл сохранен: %s', output_path)
         except Exception as e:
-            print(f"Ошибка при дешифровании: {e}")
+            logger.error('Ошибка при дешифровании: %s', e)
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     input_filename = 'test_file1.txt'
     encryptor_decryptor = TextEncryptorDecryptor(input_filename)
 
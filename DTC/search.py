@@ -0,0 +1,340 @@
+"""
+Поиск слова или фразы в архивах DTC_v1.4 без дешифрования.
+
+Запрос разбивается тем же токенизатором, что и при шифровании, и для
+каждого файла переводится в ключи его словаря. Дальше сканируются
+закодированные данные, открытый текст не восстанавливается.
+
+Границы ключей:
+    classic - ключи состоят только из байтов, не входящих в разделители,
+              поэтому ключ слова в данных - это целая серия таких байтов.
+              Совпадение проверяется регулярным выражением с запретом
+              соседних байтов не-разделителей слева и справа (кроме
+              многобайтовых разделителей вроде кавычек “ ”).
+    escape  - ключи разной длины идут вплотную и могут встречаться внутри
+              других ключей и литералов, поэтому данные проходятся по
+              границам единиц; литералы разбиваются на токены на месте.
+              Перед проходом делается быстрая проверка наличия байтов.
+
+Смещения в результатах - позиции начала совпадения в закодированных данных.
+
+Запуск из корня репозитория:
+    python -m DTC.search "слово" dtc/ --workers 8
+    python -m DTC.search "два слова" dtc/text.dtc --files-only
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from .container import MAGIC as CONTAINER_MAGIC, ContainerReader
+    from .loader import load_version
+except ImportError:  # запуск как скрипта из папки DTC
+    from container import MAGIC as CONTAINER_MAGIC, ContainerReader
+    from loader import load_version
+
+logger = logging.getLogger(__name__)
+
+CODEC_FILE = 'DTC_v1.4.py'
+
+
+def codec():
+    return load_version(CODEC_FILE)
+
+
+class Query:
+    """Запрос, разбитый на токены в рабочей кодировке файла"""
+
+    def __init__(self, text, stored_encoding):
+        dtc = codec()
+        self.processor = dtc.AdvancedEncoder('')
+        encoding = dtc.TARGET_ENCODING
+        if stored_encoding.startswith(dtc.NATIVE_PREFIX):
+            encoding = stored_encoding[len(dtc.NATIVE_PREFIX):]
+            self.processor.use_codepage(encoding)
+        # UnicodeEncodeError: в кодовой странице файла запрос непредставим
+        self.tokens = list(self.processor.tokenize(text.encode(encoding)))
+        if not self.tokens:
+            raise ValueError("Пустой запрос")
+
+    def words(self):
+        return [token for token in self.tokens if not self.processor.is_separator(token)]
+
+    def non_separator_class(self):
+        """Класс байтов, из которых состоят слова и ключи classic-формата"""
+        return b'[^' + b''.join(b'\\x%02x' % b for b in sorted(self.processor.forbidden_bytes)) + b']'
+
+    def word_boundaries(self):
+        """
+        Проверки границы слова classic-формата: (перед ключом, после ключа).
+
+        Граница - начало или конец данных, байт-разделитель или многобайтовый
+        разделитель токенизатора: байты кавычек “ ” (E2 80 9C/9D) сами по
+        себе не разделители, но отделяют слово.
+        """
+        word_byte = self.non_separator_class()
+        separators = [re.escape(sep) for sep in sorted(self.processor.multibyte_separators) if len(sep) > 1]
+        before = b'(?:(?<!' + word_byte + b')' + b''.join(b'|(?<=' + sep + b')' for sep in separators) + b')'
+        after = b'(?:(?!' + word_byte + b')' + b''.join(b'|(?=' + sep + b')' for sep in separators) + b')'
+        return before, after
+
+
+def classic_keys(dictionary, words):
+    """
+    Ищет ключи слов в текстовом словаре 'ключ слово частота' без разбора
+    всего словаря.
+
+    Ни ключи, ни слова не содержат пробела и перевода строки, а частота
+    стоит в конце строки, поэтому b' слово ' (b' слово\\n' в старых словарях
+    без частот) однозначно указывает на строку словаря.
+
+    :return: Словарь {слово: ключ}; отсутствующих слов в нем нет.
+    """
+    first_line = dictionary[:dictionary.find(b'\n')]
+    terminator = b' ' if first_line.count(b' ') == 2 else b'\n'
+    keys = {}
+    for word in words:
+        end = dictionary.find(b' ' + word + terminator)
+        if end < 0:
+            continue
+        keys[word] = dictionary[dictionary.rfind(b'\n', 0, end) + 1:end]
+    return keys
+
+
+def escape_ranks(dictionary, words):
+    """
+    Номера слов в словаре escape-формата (ключ вычисляется из номера).
+
+    :return: (число однобайтовых ключей, {слово: номер}).
+    """
+    dtc = codec()
+    counts = dictionary.startswith(dtc.ESCAPE_DICT_COUNTS_MAGIC)
+    data = memoryview(dictionary)[len(dtc.ESCAPE_DICT_MAGIC):]
+    wanted = {word for word in words if word in dictionary}
+    ranks = {}
+    pos, rank = 1, 0
+    while wanted and pos < len(data):
+        length, pos = dtc.read_varint(data, pos)
+        word = bytes(data[pos:pos + length])
+        if word in wanted:
+            ranks[word] = rank
+            wanted.discard(word)
+        pos += length
+        if counts:
+            _, pos = dtc.read_varint(data, pos)
+        rank += 1
+    return data[0], ranks
+
+
+def search_classic(query, dictionary, read_payload, limit=None):
+    """Поиск в classic-формате: все ключи запроса обязаны быть в словаре"""
+    keys = classic_keys(dictionary, set(query.words()))
+    parts = []
+    for token in query.tokens:
+        if query.processor.is_separator(token):
+            parts.append(re.escape(token))
+        elif token in keys:
+            parts.append(re.escape(keys[token]))
+        else:
+            # Слова нет в словаре файла - данные можно не читать
+            return []
+    before, after = query.word_boundaries()
+    pattern = b''.join(parts)
+    if not query.processor.is_separator(query.tokens[0]):
+        pattern = before + pattern
+    if not query.processor.is_separator(query.tokens[-1]):
+        pattern += after
+    pattern = re.compile(pattern)
+    payload = read_payload()
+    offsets = []
+    # Поиск с шагом в один байт: совпадения фразы могут перекрываться (' а а ')
+    match = pattern.search(payload)
+    while match is not None:
+        offsets.append(match.start())
+        if limit is not None and len(offsets) >= limit:
+            break
+        match = pattern.search(payload, match.start() + 1)
+    return offsets
+
+
+def iter_escape_tokens(payload, one_byte_keys, token_pattern):
+    """
+    Проход escape-данных по границам единиц без восстановления текста.
+
+    :return: Генератор (смещение, токен): номер слова для ключа или байты
+             токена из литерала.
+    """
+    dtc = codec()
+    long_base = one_byte_keys + (dtc.ESCAPE_LONG_LEAD - 1 - one_byte_keys) * 256
+    i = len(dtc.ESCAPE_MAGIC)
+    end = len(payload)
+    while i < end:
+        lead = payload[i]
+        if lead == dtc.ESCAPE_LITERAL:
+            length, i = dtc.read_varint(payload, i + 1)
+            for match in token_pattern.finditer(payload, i, i + length):
+                yield match.start(), match.group(0)
+            i += length
+        elif lead <= one_byte_keys:
+            yield i, lead - 1
+            i += 1
+        elif lead < dtc.ESCAPE_LONG_LEAD:
+            yield i, one_byte_keys + (lead - one_byte_keys - 1) * 256 + payload[i + 1]
+            i += 2
+        else:
+            yield i, long_base + int.from_bytes(payload[i + 1:i + 4], 'big')
+            i += 4
+
+
+def search_escape(query, dictionary, read_payload, limit=None):
+    """
+    Поиск в escape-формате. Токен из словаря всегда записан ключом,
+    остальные - всегда внутри литералов, поэтому запрос однозначно
+    переводится в последовательность номеров слов и байтов литералов.
+    """
+    dtc = codec()
+    one_byte_keys, ranks = escape_ranks(dictionary, set(query.tokens))
+    target = [ranks.get(token, token) for token in query.tokens]
+    payload = read_payload()
+    # Быстрый отказ: байтов какого-то токена нет в данных вовсе
+    for token in target:
+        needle = dtc.escape_key(token, one_byte_keys) if isinstance(token, int) else token
+        if needle not in payload:
+            return []
+
+    offsets = []
+    window = deque(maxlen=len(target))
+    for offset, token in iter_escape_tokens(payload, one_byte_keys, query.processor.token_pattern):
+        window.append((offset, token))
+        if token == target[-1] and len(window) == len(target) and all(
+                seen == wanted for (_, seen), wanted in zip(window, target)):
+            offsets.append(window[0][0])
+            if limit is not None and len(offsets) >= limit:
+                break
+    return offsets
+
+
+def search_file(query, path, dict_path=None, limit=None):
+    """
+    Ищет запрос в одном архиве: контейнере или паре .dtc + .dtl.
+
+    :param query: Слово или фраза (str).
+    :param path: Путь к .dtc.
+    :param dict_path: Словарь для .dtc без контейнера (по умолчанию рядом, .dtl).
+    :param limit: Максимум смещений на файл (1 - только факт наличия).
+    :return: Список смещений совпадений в закодированных данных.
+    """
+    dtc = codec()
+    with open(path, 'rb') as f:
+        head = f.read(max(len(CONTAINER_MAGIC), len(dtc.ESCAPE_MAGIC)))
+        if head.startswith(CONTAINER_MAGIC):
+            f.seek(0)
+            reader = ContainerReader(f)
+            stored_encoding = reader.encoding
+            escape = reader.header.get('layout') == dtc.LAYOUT_ESCAPE
+            dictionary = reader.dictionary
+            read_payload = lambda: reader.payload
+        else:
+            payload_size, stored_encoding, _ = dtc.read_trailer(f)
+            escape = head.startswith(dtc.ESCAPE_MAGIC)
+            with open(dict_path or os.path.splitext(path)[0] + '.dtl', 'rb') as d:
+                dictionary = d.read()
+
+            def read_payload():
+                f.seek(0)
+                return f.read(payload_size)
+
+        try:
+            query = Query(query, stored_encoding)
+        except UnicodeEncodeError:
+            return []
+        if escape:
+            return search_escape(query, dictionary, read_payload, limit)
+        return search_classic(query, dictionary, read_payload, limit)
+
+
+def iter_archives(paths):
+    """Файлы из списка путей; папки обходятся рекурсивно в поиске *.dtc"""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.endswith('.dtc'):
+                    yield os.path.join(root, name)
+
+
+def _search_task(task):
+    query, path, limit = task
+    try:
+        return path, search_file(query, path, limit=limit), None
+    except Exception as e:
+        return path, [], str(e)
+
+
+def search(query, paths, workers=None, limit=None, errors=None):
+    """
+    Ищет запрос во многих архивах параллельно.
+
+    :param query: Слово или фраза.
+    :param paths: Файлы и папки с архивами.
+    :param workers: Число процессов (None - по числу ядер, 1 - без пула).
+    :param limit: Максимум смещений на файл.
+    :param errors: Список, куда добавляются (путь, сообщение) для файлов,
+                   которые не удалось прочитать; без него ошибки пишутся в лог.
+    :return: Генератор (путь, смещения) только для файлов с совпадениями,
+             в порядке путей.
+    """
+    tasks = ((query, path, limit) for path in iter_archives(paths))
+    if workers == 1:
+        results = map(_search_task, tasks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(workers)
+        results = pool.map(_search_task, tasks, chunksize=16)
+    try:
+        for path, offsets, error in results:
+            if error is not None:
+                if errors is None:
+                    logger.error('Ошибка поиска в %s: %s', path, error)
+                else:
+                    errors.append((path, error))
+            elif offsets:
+                yield path, offsets
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('query', help='Слово или фраза')
+    parser.add_argument('paths', nargs='+', help='Архивы .dtc или папки с ними')
+    parser.add_argument('--workers', type=int, default=None, help='Число процессов')
+    parser.add_argument('-l', '--files-only', action='store_true', help='Только имена файлов')
+    parser.add_argument('--limit', type=int, default=None, help='Максимум смещений на файл')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    errors = []
+    limit = 1 if args.files_only else args.limit
+    found = False
+    for path, offsets in search(args.query, args.paths, args.workers, limit, errors):
+        found = True
+        if args.files_only:
+            print(path)
+        else:
+            print(f"{path}: {' '.join(map(str, offsets))}")
+    for path, error in errors:
+        logger.error('Ошибка поиска в %s: %s', path, error)
+    # Как у grep: 0 - найдено, 1 - не найдено, 2 - ошибки чтения
+    return 2 if errors else (0 if found else 1)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Статистика коллекции архивов по словарям, без дешифрования.
+
+Частоты слов берутся из словарей .dtl (см. vocabulary.py): размер словаря,
+число слов, самые частые слова по каждому документу и по всей коллекции.
+
+Словари читаются параллельно в процессах, результаты сливаются в общий
+счетчик. Чтобы память не росла с размером коллекции, счетчик при
+превышении max_terms сбрасывается на диск отсортированной порцией, а в
+конце порции сливаются потоково (heapq.merge) - одновременно в памяти
+только по одному пакету из каждой порции и top-N.
+
+Запуск из корня репозитория:
+    python -m DTC.stats dtc/ --top 20 --workers 8
+    python -m DTC.stats dtc/ --per-document --output stats.json
+"""
+import argparse
+import heapq
+import json
+import logging
+import pickle
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+
+try:
+    from .search import iter_archives
+    from .vocabulary import archive_path, read_vocabulary
+except ImportError:  # запуск как скрипта из папки DTC
+    from search import iter_archives
+    from vocabulary import archive_path, read_vocabulary
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP = 20
+DEFAULT_MAX_TERMS = 1_000_000  # Слов в памяти до сброса порции на диск
+RUN_BATCH_SIZE = 10_000  # Записей в одном pickle внутри порции
+
+
+class DocumentStats:
+    """Статистика одного архива"""
+
+    def __init__(self, path, vocabulary_size, tokens, top):
+        self.path = path
+        self.vocabulary_size = vocabulary_size
+        # Число слов в тексте; None, если словарь записан без частот
+        self.tokens = tokens
+        self.top = top
+
+    def as_dict(self):
+        return {'path': self.path, 'vocabulary_size': self.vocabulary_size,
+                'tokens': self.tokens, 'top': self.top}
+
+
+class CorpusStats:
+    """Сводная статистика коллекции"""
+
+    def __init__(self):
+        self.documents = 0
+        self.documents_without_counts = 0
+        self.vocabulary_size = 0
+        self.tokens = 0
+        # (слово, частота, число документов) по убыванию частоты
+        self.top = []
+        self.per_document = []
+
+    def as_dict(self):
+        return {
+            'documents': self.documents,
+            'documents_without_counts': self.documents_without_counts,
+            'vocabulary_size': self.vocabulary_size,
+            'tokens': self.tokens,
+            'top': self.top,
+            'per_document': [document.as_dict() for document in self.per_document],
+        }
+
+
+def document_stats(vocabulary, top=DEFAULT_TOP):
+    """Статистика архива по его словарю (Vocabulary)"""
+    if vocabulary.counts is None:
+        # Без частот остается порядок слов: он и есть порядок убывания частоты
+        return DocumentStats(vocabulary.path, len(vocabulary), None,
+                             [(word, None) for word in vocabulary.words[:top]])
+    return DocumentStats(vocabulary.path, len(vocabulary), sum(vocabulary.counts),
+                         list(zip(vocabulary.words[:top], vocabulary.counts[:top])))
+
+
+def _read_task(task):
+    path, top = task
+    try:
+        vocabulary = read_vocabulary(path)
+    except Exception as e:
+        return path, None, None, str(e)
+    counts = vocabulary.counts or [0] * len(vocabulary)
+    return path, document_stats(vocabulary, top), list(zip(vocabulary.words, counts)), None
+
+
+class _SpillingCounter:
+    """Счетчик слово -> [частота, документы] с ограничением памяти"""
+
+    def __init__(self, max_terms, temp_dir=None):
+        self.max_terms = max_terms
+        self.temp_dir = temp_dir
+        self.terms = {}
+        self.runs = []
+
+    def update(self, items):
+        terms = self.terms
+        for word, count in items:
+            entry = terms.get(word)
+            if entry is None:
+                terms[word] = [count, 1]
+            else:
+                entry[0] += count
+                entry[1] += 1
+        if len(terms) > self.max_terms:
+            self.spill()
+
+    def spill(self):
+        """Сбрасывает счетчик на диск отсортированной по слову порцией"""
+        run = tempfile.TemporaryFile(dir=self.temp_dir)
+        items = sorted(self.terms.items())
+        for start in range(0, len(items), RUN_BATCH_SIZE):
+            pickle.dump(items[start:start + RUN_BATCH_SIZE], run, pickle.HIGHEST_PROTOCOL)
+        run.seek(0)
+        self.runs.append(run)
+        self.terms = {}
+        logger.debug('Порция %d сброшена на диск: %d слов', len(self.runs), len(items))
+
+    @staticmethod
+    def _read_run(run):
+        while True:
+            try:
+                batch = pickle.load(run)
+            except EOFError:
+                return
+            yield from batch
+
+    def merged(self):
+        """Поток (слово, частота, документы) по возрастанию слова, без дублей"""
+        sources = [self._read_run(run) for run in self.runs]
+        sources.append(iter(sorted(self.terms.items())))
+        self.terms = {}
+        for word, group in groupby(heapq.merge(*sources, key=lambda item: item[0]), key=lambda item: item[0]):
+            count = documents = 0
+            for _, (part_count, part_documents) in group:
+                count += part_count
+                documents += part_documents
+            yield word, count, documents
+
+    def close(self):
+        for run in self.runs:
+            run.close()
+        self.runs = []
+
+
+def corpus_stats(paths, top=DEFAULT_TOP, workers=None, max_terms=DEFAULT_MAX_TERMS,
+                 per_document=False, errors=None, temp_dir=None):
+    """
+    Сводная статистика коллекции архивов.
+
+    :param paths: Архивы .dtc, их словари .dtl или папки с ними.
+    :param top: Сколько самых частых слов выдавать.
+    :param workers: Число процессов (None - по числу ядер, 1 - без пула).
+    :param max_terms: Максимум слов в памяти до сброса порции на диск.
+    :param per_document: Сохранять статистику каждого документа.
+    :param errors: Список для (путь, сообщение) по нечитаемым архивам;
+                   без него ошибки пишутся в лог.
+    :param temp_dir: Папка для порций (по умолчанию системная).
+    :return: CorpusStats.
+    """
+    result = CorpusStats()
+    tasks = [(path, top) for path in dict.fromkeys(archive_path(p) for p in iter_archives(paths))]
+    if workers == 1 or len(tasks) < 2:
+        results = map(_read_task, tasks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(workers)
+        results = pool.map(_read_task, tasks, chunksize=16)
+
+    counter = _SpillingCounter(max_terms, temp_dir)
+    try:
+        for path, document, items, error in results:
+            if error is not None:
+                if errors is None:
+                    logger.error('Ошибка чтения словаря %s: %s', path, error)
+                else:
+                    errors.append((path, error))
+                continue
+            result.documents += 1
+            if document.tokens is None:
+                result.documents_without_counts += 1
+            else:
+                result.tokens += document.tokens
+            if per_document:
+                result.per_document.append(document)
+            counter.update(items)
+
+        # top-N по частоте, при равенстве - по числу документов и слову
+        best = []
+        for word, count, documents in counter.merged():
+            result.vocabulary_size += 1
+            entry = (count, documents, word)
+            if len(best) < top:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+        result.top = [(word, count, documents) for count, documents, word in sorted(best, reverse=True)]
+    finally:
+        counter.close()
+        if pool is not None:
+            pool.shutdown()
+    return result
+
+
+def print_stats(stats):
+    print(f"Документов: {stats.documents}")
+    if stats.documents_without_counts:
+        print(f"Без частот в словаре: {stats.documents_without_counts}")
+    print(f"Словарь коллекции: {stats.vocabulary_size}")
+    print(f"Слов в текстах: {stats.tokens}")
+    for word, count, documents in stats.top:
+        print(f"  {word}\t{count}\t{documents}")
+    for document in stats.per_document:
+        print(f"{document.path}: словарь {document.vocabulary_size}, слов {document.tokens}")
+        for word, count in document.top:
+            print(f"  {word}\t{'' if count is None else count}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='+', help='Архивы .dtc, словари .dtl или папки')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-terms', type=int, default=DEFAULT_MAX_TERMS,
+                        help='Слов в памяти до сброса на диск')
+    parser.add_argument('--per-document', action='store_true', help='Статистика по каждому документу')
+    parser.add_argument('--output', default=None, help='JSON с результатами')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    errors = []
+    stats = corpus_stats(args.paths, args.top, args.workers, args.max_terms, args.per_document, errors)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(stats.as_dict(), f, ensure_ascii=False, indent=2)
+    else:
+        print_stats(stats)
+    for path, error in errors:
+        logger.error('Ошибка чтения словаря %s: %s', path, error)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Потоковое шифрование DTC_v1.4 для конвейеров (stdin -> stdout).
+
+Вход произвольной длины режется на кадры, каждый кадр шифруется в
+самостоятельный контейнер (см. container.py). Формат потока:
+
+    b'DTCS\\x01'
+    кадр: длина контейнера (uint64 big-endian) и сам контейнер
+    кадр нулевой длины - конец потока
+
+Кадр заканчивается на последнем переводе строки в окне frame_size, чтобы
+не разрывать слова и многобайтовые символы; строка длиннее окна режется
+по размеру окна. В памяти одновременно не больше нескольких кадров на
+процесс, поэтому память не зависит от длины входа. Кадры обрабатываются
+параллельно в процессах с сохранением порядка.
+"""
+import os
+import struct
+import threading
+from collections import deque
+import concurrent.futures  # ProcessPoolExecutor (и multiprocessing) загружается при первом пуле
+
+try:
+    from .container import MAGIC as CONTAINER_MAGIC
+    from .loader import load_version
+except ImportError:  # запуск как скрипта из папки DTC
+    from container import MAGIC as CONTAINER_MAGIC
+    from loader import load_version
+
+CODEC_FILE = 'DTC_v1.4.py'
+STREAM_MAGIC = b'DTCS\x01'
+FRAME_LENGTH = struct.Struct('>Q')
+DEFAULT_FRAME_SIZE = 4 * 1024 * 1024
+READ_CHUNK_SIZE = 1024 * 1024
+MAX_CONTAINER_SIZE = 256 * 1024 * 1024  # Предел контейнера (кадра) в потоке: вход не читается в память без границы
+FRAMES_PER_WORKER = 2  # Кадров в работе на процесс: ограничивает память при параллельной обработке
+
+_local = threading.local()
+
+
+def session(options):
+    """
+    CodecSession потока для набора параметров (создается один раз).
+    Сессия хранит состояние между вызовами, поэтому у каждого потока своя:
+    кадры можно обрабатывать и в пуле потоков (см. aio.py).
+    """
+    sessions = _local.__dict__.setdefault('sessions', {})
+    key = tuple(sorted(options.items()))
+    if key not in sessions:
+        sessions[key] = load_version(CODEC_FILE).CodecSession(**options)
+    return sessions[key]
+
+
+def iter_frames(f, frame_size=DEFAULT_FRAME_SIZE):
+    """Исходные данные кадрами не длиннее frame_size, по границам строк"""
+    if frame_size <= 0:
+        raise ValueError(f"Размер кадра должен быть положительным: {frame_size}")
+    pending = b''
+    while True:
+        data = f.read(frame_size - len(pending))
+        if not data:
+            break
+        pending += data
+        if len(pending) < frame_size:
+            continue
+        cut = pending.rfind(b'\n') + 1 or len(pending)
+        yield pending[:cut]
+        pending = pending[cut:]
+    if pending:
+        yield pending
+
+
+def read_exact(f, size):
+    """Ровно size байтов из потока; обрыв потока - ValueError"""
+    chunks = []
+    while size:
+        chunk = f.read(min(size, READ_CHUNK_SIZE))
+        if not chunk:
+            raise ValueError("Поток DTCS оборван")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def read_limited(f, limit):
+    """Данные до конца потока, но не больше limit байтов; длиннее - ValueError"""
+    chunks = []
+    size = 0
+    while size <= limit:
+        chunk = f.read(min(limit + 1 - size, READ_CHUNK_SIZE))
+        if not chunk:
+            return b''.join(chunks)
+        chunks.append(chunk)
+        size += len(chunk)
+    raise ValueError(f"Контейнер больше {limit} байтов")
+
+
+def iter_containers(f, max_size=MAX_CONTAINER_SIZE):
+    """
+    Контейнеры кадров из потока DTCS. Поток из одного контейнера без
+    разбиения на кадры тоже принимается.
+
+    :param max_size: Предел размера контейнера; больше - ValueError.
+    """
+    head = read_exact(f, len(STREAM_MAGIC))
+    if head.startswith(CONTAINER_MAGIC):
+        yield head + read_limited(f, max_size - len(head))
+        return
+    if head != STREAM_MAGIC:
+        raise ValueError("Вход не является потоком DTCS или контейнером DTC")
+    while True:
+        (length,) = FRAME_LENGTH.unpack(read_exact(f, FRAME_LENGTH.size))
+        if not length:
+            return
+        if length > max_size:
+            raise ValueError(f"Кадр потока DTCS больше {max_size} байтов")
+        yield read_exact(f, length)
+
+
+def ordered_map(func, items, workers=1):
+    """
+    map с сохранением порядка: при workers > 1 в пуле процессов, в работе
+    не больше workers * FRAMES_PER_WORKER элементов.
+    """
+    if workers == 1:
+        yield from map(func, items)
+        return
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        limit = (workers or os.cpu_count() or 1) * FRAMES_PER_WORKER
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= limit:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _encode_frame(task):
+    options, raw = task
+    return session(options).encode(raw)
+
+
+def _decode_frame(container):
+    return session({}).decode(container)
+
+
+def _verify_frame(container):
+    return session({}).digest(container)
+
+
+def encode_stream(src, dst, frame_size=DEFAULT_FRAME_SIZE, workers=1, **options):
+    """
+    Шифрует поток в поток DTCS.
+
+    :param src: Двоичный файл на чтение (например, sys.stdin.buffer).
+    :param dst: Двоичный файл на запись.
+    :param frame_size: Максимальный размер исходных данных кадра.
+    :param workers: Число процессов (1 - без пула, None - по числу ядер).
+    :param options: Параметры CodecSession (layout, compression, ...).
+    :return: Число кадров.
+    """
+    dst.write(STREAM_MAGIC)
+    frames = 0
+    tasks = ((options, raw) for raw in iter_frames(src, frame_size))
+    for container in ordered_map(_encode_frame, tasks, workers):
+        if len(container) > MAX_CONTAINER_SIZE:
+            # Такой поток не прочитал бы decode_stream
+            raise ValueError(f"Кадр больше {MAX_CONTAINER_SIZE} байтов, уменьшите frame_size")
+        dst.write(FRAME_LENGTH.pack(len(container)))
+        dst.write(container)
+        frames += 1
+    dst.write(FRAME_LENGTH.pack(0))
+    dst.flush()
+    return frames
+
+
+def decode_stream(src, dst, workers=1):
+    """
+    Дешифрует поток DTCS (или одиночный контейнер) в исходные данные.
+
+    :return: Число кадров.
+    """
+    frames = 0
+    for data in ordered_map(_decode_frame, iter_containers(src), workers):
+        dst.write(data)
+        frames += 1
+    dst.flush()
+    return frames
+
+
+def verify_stream(src, workers=1):
+    """
+    Проверяет кадры потока по хешам из заголовков без вывода данных.
+
+    :return: (число кадров, список (номер кадра, ошибка)).
+    """
+    failures = []
+    frames = 0
+    for number, (actual, stored) in enumerate(ordered_map(_verify_frame, iter_containers(src), workers)):
+        frames += 1
+        if stored is None:
+            failures.append((number, "нет хеша в заголовке"))
+        elif actual != stored:
+            failures.append((number, f"хеш не совпадает: {actual} вместо {stored}"))
+    return frames, failures
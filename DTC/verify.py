@@ -0,0 +1,126 @@
+"""
+Проверка архивов DTC_v1.4 по хешу исходного файла.
+
+При шифровании в заголовок контейнера (digest=blake2b:<hex>) или в хвост
+.dtc без контейнера пишется BLAKE2b исходного файла. Проверка дешифрует
+архив в хеш - порции декодера проходят через DigestWriter и на диск не
+пишутся - и сравнивает его с записанным. Для архивов без хеша (.dtc и
+контейнеры, записанные до появления хеша) эталоном служит исходный файл
+из папки originals, он тоже читается потоково.
+
+Архивы проверяются параллельно в процессах; в отчет попадают все
+несовпавшие и нечитаемые файлы, а не только первый.
+
+Запуск из корня репозитория:
+    python -m DTC.verify dtc/ --workers 8
+    python -m DTC.verify dtc/ --originals txt/
+"""
+import argparse
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from .loader import load_version
+    from .search import iter_archives
+except ImportError:  # запуск как скрипта из папки DTC
+    from loader import load_version
+    from search import iter_archives
+
+logger = logging.getLogger(__name__)
+
+CODEC_FILE = 'DTC_v1.4.py'
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path, chunk_size=READ_CHUNK_SIZE, text=False):
+    """
+    Хеш файла в формате заголовка контейнера, с чтением порциями.
+
+    :param text: Хешировать текст с универсальными переводами строк (CRLF и
+                 LF дают один хеш), как при сравнении текстов. Байты, которые
+                 не декодируются как UTF-8 (cp1251 и т.п.), хешируются как есть.
+    """
+    codec = load_version(CODEC_FILE)
+    digest = codec.new_digest()
+    if text:
+        with open(path, 'r', encoding='utf-8', errors='surrogateescape') as f:
+            for chunk in iter(lambda: f.read(chunk_size), ''):
+                digest.update(chunk.encode('utf-8', 'surrogateescape'))
+    else:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+    return codec.format_digest(digest)
+
+
+def original_path(path, originals):
+    """Исходный файл для архива: имя архива с расширением .txt в папке originals"""
+    return os.path.join(originals, os.path.splitext(os.path.basename(path))[0] + '.txt')
+
+
+def verify_file(path, originals=None):
+    """
+    Проверяет один архив.
+
+    :param path: Путь к .dtc (словарь .dtl для обычного .dtc ищется рядом).
+    :param originals: Папка с исходными файлами; если задана, эталон -
+                      исходный файл, иначе хеш, записанный в архиве.
+    :return: None при совпадении, иначе текст ошибки.
+    """
+    codec = load_version(CODEC_FILE)
+    decoder = codec.AdvancedDecoder(os.path.basename(path))
+    actual, stored = decoder.digest_file(path, os.path.splitext(path)[0] + '.dtl')
+    expected = file_digest(original_path(path, originals)) if originals else stored
+    if expected is None:
+        return "в архиве нет хеша, нужен исходный файл (--originals)"
+    if actual != expected:
+        return f"хеш не совпадает: {actual} вместо {expected}"
+    return None
+
+
+def _verify_task(task):
+    path, originals = task
+    try:
+        return path, verify_file(path, originals)
+    except Exception as e:
+        return path, f"ошибка чтения: {e}"
+
+
+def verify(paths, originals=None, workers=None):
+    """
+    Проверяет архивы параллельно.
+
+    :param paths: Архивы .dtc или папки с ними.
+    :param originals: Папка с исходными файлами (необязательно).
+    :param workers: Число процессов (None - по числу ядер, 1 - без пула).
+    :return: (число проверенных, список (путь, ошибка) по всем сбоям).
+    """
+    tasks = [(path, originals) for path in iter_archives(paths)]
+    if workers == 1 or len(tasks) < 2:
+        results = list(map(_verify_task, tasks))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_verify_task, tasks))
+    failures = [(path, error) for path, error in results if error is not None]
+    return len(results), failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='+', help='Архивы .dtc или папки с ними')
+    parser.add_argument('--originals', default=None, help='Папка с исходными файлами')
+    parser.add_argument('--workers', type=int, default=None, help='Число процессов')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    checked, failures = verify(args.paths, args.originals, args.workers)
+    for path, error in failures:
+        logger.error('%s: %s', path, error)
+    logger.info('Проверено: %d, с ошибками: %d', checked, len(failures))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Чтение словаря архива без дешифрования данных.
+
+Поддерживаемые архивы:
+    DTC_v1.4, контейнер      - секция словаря и секция кодировки
+    DTC_v1.4, .dtc + .dtl    - текстовый (classic) или escape-словарь,
+                               кодировка из блока в конце .dtc
+    DTC_v4 / prof_dtc        - двоичный словарь dtl.py рядом с .dtc
+
+Слова во всех словарях записаны в порядке убывания частоты, поэтому номер
+слова (rank) - его место по частоте в файле. Точные частоты есть в словарях,
+записанных с ними (все новые словари); в старых counts - None. Разделители из escape-словарей
+отбрасываются. Токены, не являющиеся текстом в рабочей кодировке файла,
+пропускаются: токенизатор DTC_v1.4 для UTF-8 режет слова на байтах 0xA0
+и 0xC2, и такие слова попадают в словарь кусками.
+"""
+import os
+
+try:
+    from . import dtl
+    from .container import ContainerReader
+    from .loader import load_version
+except ImportError:  # запуск как скрипта из папки DTC
+    import dtl
+    from container import ContainerReader
+    from loader import load_version
+
+CODEC_FILE = 'DTC_v1.4.py'
+
+
+class Vocabulary:
+    """Слова архива в порядке убывания частоты"""
+
+    def __init__(self, path, words, counts=None):
+        self.path = path
+        self.words = words
+        # Точные частоты, если словарь их хранит, иначе None
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.words)
+
+    def items(self):
+        """Пары (слово, номер по частоте, частота или None)"""
+        counts = self.counts or [None] * len(self.words)
+        return zip(self.words, range(len(self.words)), counts)
+
+
+def archive_path(path):
+    """Путь к архиву .dtc для пути к .dtc или к его словарю .dtl"""
+    if path.endswith('.dtl'):
+        return path[:-len('.dtl')] + '.dtc'
+    return path
+
+
+def stored_encoding(dtc_path):
+    """Блок кодировки из конца .dtc DTC_v1.4 (без чтения остальных данных)"""
+    codec = load_version(CODEC_FILE)
+    if not os.path.exists(dtc_path):
+        return codec.TARGET_ENCODING
+    with open(dtc_path, 'rb') as f:
+        return codec.read_trailer(f)[1]
+
+
+def codec_words(dictionary, encoding):
+    """
+    Слова словаря DTC_v1.4 (classic или escape) как строки.
+
+    :return: (слова, частоты или None для словаря без частот).
+    """
+    codec = load_version(CODEC_FILE)
+    decoder = codec.AdvancedDecoder('')
+    decoder.load_dictionary_data(dictionary)
+    tokens = decoder.escape_words or decoder.reverse_dict.values()
+
+    processor = codec.AdvancedEncoder('')
+    text_encoding = codec.TARGET_ENCODING
+    if encoding.startswith(codec.NATIVE_PREFIX):
+        text_encoding = encoding[len(codec.NATIVE_PREFIX):]
+        processor.use_codepage(text_encoding)
+    words = []
+    counts = []
+    for token in tokens:
+        if processor.is_separator(token):
+            continue
+        try:
+            words.append(token.decode(text_encoding))
+        except UnicodeDecodeError:
+            continue
+        counts.append(decoder.word_counts.get(token))
+    return words, counts if decoder.word_counts else None
+
+
+def read_vocabulary(path):
+    """
+    Читает словарь архива.
+
+    :param path: Путь к .dtc (контейнеру или обычному) или к его .dtl.
+    :return: Vocabulary; path в нем - путь к архиву .dtc.
+    """
+    path = archive_path(path)
+    dict_path = os.path.splitext(path)[0] + '.dtl'
+    if not os.path.exists(dict_path):
+        with ContainerReader(path) as reader:
+            return Vocabulary(path, *codec_words(reader.dictionary, reader.encoding))
+
+    with open(dict_path, 'rb') as f:
+        data = f.read()
+    if data.startswith(dtl.MAGIC):
+        dictionary, counts = dtl.read_dictionary_counts(data)
+        return Vocabulary(path, list(dictionary.values()), counts)
+    return Vocabulary(path, *codec_words(data, stored_encoding(path)))
+
@@ -0,0 +1,41 @@
+"""
+Общие настройки тестов: корень репозитория в sys.path и замена chardet,
+если пакет не установлен (кодеку достаточно detect для UTF-8 и cp1251).
+"""
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import chardet  # noqa: F401
+except ImportError:
+    def _detect(data):
+        for encoding in ('ascii', 'utf-8', 'windows-1251'):
+            try:
+                data.decode(encoding)
+                return {'encoding': encoding, 'confidence': 0.99, 'language': ''}
+            except UnicodeDecodeError:
+                continue
+        return {'encoding': None, 'confidence': 0.0, 'language': ''}
+
+    sys.modules['chardet'] = types.SimpleNamespace(detect=_detect)
+
+
+@pytest.fixture(scope='session')
+def dtc():
+    """Текущая версия кодека (DTC_v1.4)"""
+    from DTC import load_version
+    return load_version('DTC_v1.4.py')
+
+
+@pytest.fixture
+def corpus():
+    """Небольшой русский текст с повторами, пунктуацией и переводами строк"""
+    lines = []
+    for i in range(200):
+        lines.append(f'Строка {i}: слово, другое слово и ещё одно — «цитата» {i % 7}.')
+    return ('\n'.join(lines) + '\n').encode('utf-8')
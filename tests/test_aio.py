@@ -0,0 +1,120 @@
+import asyncio
+import concurrent.futures
+import io
+
+import pytest
+
+from DTC import aio, stream
+
+
+class FirstOnlyExecutor(concurrent.futures.Executor):
+    """Выполняет только первую задачу, остальные остаются в работе"""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        future = concurrent.futures.Future()
+        if not self.futures:
+            future.set_result(fn(*args))
+        self.futures.append(future)
+        return future
+
+
+class BrokenWriter:
+    """StreamWriter, у которого drain() падает (клиент отключился)"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def write(self, data):
+        self.buffer += data
+
+    async def drain(self):
+        raise ConnectionResetError("клиент отключился")
+
+
+class MemoryWriter(BrokenWriter):
+    async def drain(self):
+        pass
+
+
+def make_reader(data):
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+def run_broken(coroutine_factory):
+    """
+    Запускает корутину с падающим drain(); возвращает задачи цикла
+    (asyncio.Future) в том состоянии, в каком они были в момент ошибки.
+    """
+    async def main():
+        loop = asyncio.get_running_loop()
+        futures = []
+        run_in_executor = loop.run_in_executor
+
+        def recording_run_in_executor(*args):
+            futures.append(run_in_executor(*args))
+            return futures[-1]
+
+        loop.run_in_executor = recording_run_in_executor
+        try:
+            await coroutine_factory(FirstOnlyExecutor())
+        except ConnectionResetError:
+            # Без aclosing генератор закрылся бы позже, из финализатора цикла
+            return [future.cancelled() for future in futures]
+        raise AssertionError("drain() не вызвал ошибку")
+
+    return asyncio.run(main())
+
+
+def test_encode_cancels_pending_frames_when_drain_fails(corpus):
+    cancelled = run_broken(lambda executor: aio.encode_stream(
+        make_reader(corpus), BrokenWriter(), frame_size=256, executor=executor))
+    assert cancelled == [False, True]
+
+
+def test_decode_cancels_pending_frames_when_drain_fails(corpus):
+    encoded = io.BytesIO()
+    assert stream.encode_stream(io.BytesIO(corpus), encoded, frame_size=256) > 2
+    cancelled = run_broken(lambda executor: aio.decode_stream(
+        make_reader(encoded.getvalue()), BrokenWriter(), executor=executor))
+    assert cancelled == [False, True]
+
+
+@pytest.mark.parametrize('layout', ['classic', 'escape'])
+def test_async_round_trip_is_compatible_with_stream(corpus, layout):
+    async def encode():
+        writer = MemoryWriter()
+        frames = await aio.encode_stream(make_reader(corpus), writer, frame_size=256, layout=layout)
+        return frames, bytes(writer.buffer)
+
+    frames, encoded = asyncio.run(encode())
+    assert frames > 2
+    decoded = io.BytesIO()
+    assert stream.decode_stream(io.BytesIO(encoded), decoded) == frames
+    assert decoded.getvalue() == corpus
+
+    async def decode():
+        writer = MemoryWriter()
+        await aio.decode_stream(make_reader(encoded), writer)
+        return bytes(writer.buffer)
+
+    assert asyncio.run(decode()) == corpus
+
+
+def test_single_container_size_is_limited(dtc, corpus):
+    single = dtc.CodecSession().encode(corpus)
+
+    async def containers(data, max_size):
+        return [container async for container in aio.iter_containers(make_reader(data), max_size)]
+
+    assert asyncio.run(containers(single, len(single))) == [single]
+    with pytest.raises(ValueError):
+        asyncio.run(containers(single, len(single) - 1))
+    framed = stream.STREAM_MAGIC + stream.FRAME_LENGTH.pack(len(single)) + single
+    with pytest.raises(ValueError):
+        asyncio.run(containers(framed, len(single) - 1))
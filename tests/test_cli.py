@@ -0,0 +1,79 @@
+import io
+import types
+
+import pytest
+
+from DTC import cli, stream
+
+
+@pytest.fixture
+def stdio(monkeypatch):
+    """Подменяет stdin/stdout: run(входные байты, аргументы) -> (код выхода, вывод)"""
+    def run(data, argv):
+        stdout = io.BytesIO()
+        monkeypatch.setattr('sys.stdin', types.SimpleNamespace(buffer=io.BytesIO(data)))
+        monkeypatch.setattr('sys.stdout', types.SimpleNamespace(buffer=stdout))
+        return cli.main(argv), stdout.getvalue()
+    return run
+
+
+@pytest.fixture
+def txt(tmp_path, corpus):
+    source = tmp_path / 'txt'
+    (source / 'sub').mkdir(parents=True)
+    (source / 'a.txt').write_bytes(corpus)
+    (source / 'sub' / 'b.txt').write_bytes(corpus.decode('utf-8').encode('cp1251'))
+    return source
+
+
+def test_stream_roundtrip_through_stdin_stdout(stdio, monkeypatch, corpus):
+    monkeypatch.setattr(cli, 'MB', 512)  # --frame-size 1 -> кадры по 512 байт
+    code, encoded = stdio(corpus, ['encode', '--frame-size', '1', '--workers', '1'])
+    assert code == 0 and encoded.startswith(stream.STREAM_MAGIC)
+    assert sum(1 for _ in stream.iter_containers(io.BytesIO(encoded))) > 2
+
+    code, decoded = stdio(encoded, ['decode', '-', '--workers', '1'])
+    assert code == 0 and decoded == corpus
+    assert stdio(encoded, ['verify', '--workers', '1']) == (0, b'')
+
+
+def test_exit_codes(stdio, tmp_path, txt):
+    assert stdio(b'', ['encode', str(txt), '--workers', '1'])[0] == 0
+    assert stdio(b'', ['verify', str(txt), '--workers', '1'])[0] == 0
+    archive = txt / 'a.dtc'
+    data = bytearray(archive.read_bytes())
+    data[-1] ^= 0xFF  # испорчен последний байт данных
+    archive.write_bytes(data)
+    assert stdio(b'', ['verify', str(archive), '--workers', '1'])[0] == 1
+    # Оборванный поток и несуществующий файл - ошибки обработки
+    assert stdio(stream.STREAM_MAGIC + b'\x00', ['decode', '--workers', '1'])[0] == 1
+    assert stdio(b'', ['decode', str(tmp_path / 'missing.dtc'), '--workers', '1'])[0] == 1
+    # Неверные аргументы - argparse
+    for argv in (['unknown'], ['encode', '--layout', 'nope'], [], ['encode', '--frame-size', '0'],
+                 ['encode', '--frame-size', '-1']):
+        with pytest.raises(SystemExit) as exit_info:
+            cli.main(argv)
+        assert exit_info.value.code == 2
+
+
+def test_files_with_output_dir_and_force(stdio, tmp_path, txt, corpus):
+    out, decrypted = tmp_path / 'out', tmp_path / 'decrypted'
+    assert stdio(b'', ['encode', str(txt), '--output-dir', str(out), '--workers', '1'])[0] == 0
+    assert sorted(path.name for path in out.iterdir()) == ['a.dtc', 'b.dtc']
+    assert stdio(b'', ['decode', str(out), '--output-dir', str(decrypted), '--workers', '1'])[0] == 0
+    assert (decrypted / 'a.txt').read_bytes() == corpus
+    assert (decrypted / 'b.txt').read_bytes() == (txt / 'sub' / 'b.txt').read_bytes()
+
+    # Без --force существующие результаты не перезаписываются
+    (decrypted / 'a.txt').write_bytes(b'old')
+    assert stdio(b'', ['decode', str(out), '--output-dir', str(decrypted), '--workers', '1'])[0] == 1
+    assert (decrypted / 'a.txt').read_bytes() == b'old'
+    code, _ = stdio(b'', ['decode', str(out), '--output-dir', str(decrypted), '--force', '--workers', '1'])
+    assert code == 0 and (decrypted / 'a.txt').read_bytes() == corpus
+
+
+def test_encode_next_to_sources_by_glob(stdio, txt):
+    assert stdio(b'', ['encode', str(txt / '**' / '*.txt'), '--workers', '1'])[0] == 0
+    assert (txt / 'a.dtc').exists() and (txt / 'sub' / 'b.dtc').exists()
+    assert stdio(b'', ['encode', str(txt / '**' / '*.txt'), '--workers', '1'])[0] == 1
+    assert stdio(b'', ['encode', str(txt / '**' / '*.txt'), '--force', '--workers', '1'])[0] == 0
@@ -0,0 +1,74 @@
+import io
+
+import pytest
+
+from DTC import container
+
+
+@pytest.mark.parametrize('layout', ['classic', 'escape'])
+def test_container_is_read_by_sections(dtc, corpus, tmp_path, monkeypatch, layout):
+    encoder = dtc.AdvancedEncoder('a.txt', layout=layout)
+    stats = dtc.PipelineStats()
+    with open(tmp_path / 'a.dtc', 'wb') as f:
+        encoder.encode_container(f, corpus, stats=stats)
+    names = [record.name for record in stats.stages]
+    assert names.index('write_dictionary') < names.index('encrypt_data')
+
+    # Архив не должен читаться целиком: только каталог и нужные секции
+    def no_read_input(source):
+        raise AssertionError("архив прочитан целиком")
+    monkeypatch.setattr(dtc, 'read_input', no_read_input)
+
+    decrypted, encoding, header = dtc.AdvancedDecoder().decrypt_archive(str(tmp_path / 'a.dtc'))
+    assert bytes(decrypted) == corpus and header['layout'] == layout
+
+    # Открытый файл с данными перед контейнером читается с текущей позиции
+    data = b'prefix' + (tmp_path / 'a.dtc').read_bytes()
+    f = io.BytesIO(data)
+    f.seek(len(b'prefix'))
+    decrypted, _, _ = dtc.AdvancedDecoder().decrypt_archive(f)
+    assert bytes(decrypted) == corpus
+
+
+def test_plain_dtc_from_open_file(dtc, corpus, tmp_path, monkeypatch):
+    (tmp_path / 'txt').mkdir()
+    (tmp_path / 'txt' / 'a.txt').write_bytes(corpus)
+    monkeypatch.chdir(tmp_path)
+    assert dtc.AdvancedEncoder('a.txt').encrypt_file('a.dtc', 'a.dtl')
+
+    f = io.BytesIO(b'prefix' + (tmp_path / 'a.dtc').read_bytes())
+    f.seek(len(b'prefix'))
+    decrypted, encoding, header = dtc.AdvancedDecoder().decrypt_archive(f, 'a.dtl')
+    assert bytes(decrypted) == corpus
+    assert header['digest'] == dtc.format_digest(dtc.new_digest(corpus))
+
+
+def write_sections(sections):
+    f = io.BytesIO()
+    container.write_container(f, sections)
+    return bytearray(f.getvalue())
+
+
+@pytest.mark.parametrize('compression', ['zlib', 'bz2', 'lzma:9'])
+def test_truncated_section_is_an_error(corpus, compression):
+    data = write_sections([(container.SECTION_PAYLOAD, corpus, compression)])
+    assert container.ContainerReader(bytes(data)).payload == corpus
+
+    # Длина секции в каталоге на 5 байт меньше: конец сжатого потока не прочитан
+    kind, method, offset, length = container.ENTRY.unpack_from(data, container.PREFIX.size)
+    container.ENTRY.pack_into(data, container.PREFIX.size, kind, method, offset, length - 5)
+    with pytest.raises(ValueError):
+        container.ContainerReader(bytes(data)).payload
+    with pytest.raises(ValueError):
+        b''.join(container.ContainerReader(bytes(data)).iter_section(container.SECTION_PAYLOAD, 64))
+
+
+@pytest.mark.parametrize('shift', [(0, 1), (-1, 0), (1 << 40, 0)])
+def test_section_outside_file_is_rejected(corpus, shift):
+    data = write_sections([(container.SECTION_PAYLOAD, corpus, None)])
+    kind, method, offset, length = container.ENTRY.unpack_from(data, container.PREFIX.size)
+    container.ENTRY.pack_into(data, container.PREFIX.size, kind, method, offset + shift[0], length + shift[1])
+    with pytest.raises(ValueError, match='за пределами'):
+        container.ContainerReader(bytes(data))
+    with pytest.raises(ValueError):
+        container.ContainerReader(bytes(data[:container.PREFIX.size + 3]))
@@ -0,0 +1,30 @@
+import pytest
+
+from DTC import dtl
+
+
+def test_large_counts_are_stored_as_uint64(tmp_path):
+    path = tmp_path / 'a.dtl'
+    dictionary = {'слово': b'\x01', 'редкое': b'\x02'}
+    counts = {'слово': 2 ** 32, 'редкое': 1}
+    dtl.write_dictionary(path, dictionary, counts)
+
+    data = path.read_bytes()
+    assert data[5] & dtl.FLAG_WIDE_COUNTS
+    assert dtl.read_dictionary_counts(data) == ({b'\x01': 'слово', b'\x02': 'редкое'}, [2 ** 32, 1])
+
+
+def test_small_counts_keep_uint32(tmp_path):
+    path = tmp_path / 'a.dtl'
+    dtl.write_dictionary(path, {'слово': b'\x01'}, {'слово': 2 ** 32 - 1})
+    data = path.read_bytes()
+    assert data[5] == dtl.FLAG_COUNTS
+    assert dtl.read_dictionary_counts(data)[1] == [2 ** 32 - 1]
+
+
+@pytest.mark.parametrize('count', [-1, 2 ** 64])
+def test_count_out_of_range_is_rejected_before_writing(tmp_path, count):
+    path = tmp_path / 'a.dtl'
+    with pytest.raises(ValueError):
+        dtl.write_dictionary(path, {'слово': b'\x01'}, {'слово': count})
+    assert not path.exists()
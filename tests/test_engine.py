@@ -0,0 +1,54 @@
+import pytest
+
+
+@pytest.fixture
+def numpy_engine(dtc):
+    if dtc.load_numpy() is None:
+        pytest.skip('NumPy не установлен')
+    return dtc.ENGINE_NUMPY
+
+
+def encode_python(dtc, tokens, pieces_of, trailer):
+    pieces = [pieces_of(token) for token in tokens]
+    return dtc.fill_exact(sum(map(len, pieces)) + len(trailer), iter(pieces), trailer)
+
+
+@pytest.mark.parametrize('layout', ['classic', 'escape'])
+@pytest.mark.parametrize('trailer', [b'', b'utf-8'.ljust(20, b'\x00')])
+def test_fill_numpy_matches_fill_exact(dtc, numpy_engine, corpus, layout, trailer):
+    encoder = dtc.AdvancedEncoder('', layout=layout)
+    tokens = list(encoder.tokenize(encoder.detect_encoding(corpus)))
+    encoder.build_dictionary(tokens)
+    keys = encoder.word_dictionary
+    pieces_of = lambda token: keys.get(token, token)
+
+    expected = encode_python(dtc, tokens, pieces_of, trailer)
+    assert dtc.fill_numpy(tokens, pieces_of, trailer) == expected
+    assert dtc.fill_numpy(tokens, pieces_of, trailer, chunk_bytes=7) == expected
+
+
+@pytest.mark.parametrize('trailer', [b'', b'tail'])
+def test_fill_numpy_empty_and_long_tokens(dtc, numpy_engine, trailer):
+    assert dtc.fill_numpy([], bytes, trailer) == bytearray(trailer)
+    tokens = [b'', b'a', b'!' * 100000, b'a', b'']
+    assert dtc.fill_numpy(tokens, bytes, trailer) == encode_python(dtc, tokens, bytes, trailer)
+
+
+def test_numpy_engine_encodes_like_python(dtc, numpy_engine, corpus):
+    python = dtc.AdvancedEncoder('', engine=dtc.ENGINE_PYTHON)
+    numpy = dtc.AdvancedEncoder('', engine=numpy_engine)
+    results = []
+    for encoder in (python, numpy):
+        tokens = list(encoder.tokenize(encoder.detect_encoding(corpus)))
+        encoder.build_dictionary(tokens)
+        results.append(encoder.encrypt_data(tokens))
+    assert results[0] == results[1]
+
+
+def test_numpy_engine_falls_back_without_numpy(dtc, monkeypatch, caplog):
+    monkeypatch.setattr(dtc, 'load_numpy', lambda: None)
+    assert dtc.resolve_engine(dtc.ENGINE_NUMPY) == dtc.ENGINE_PYTHON
+    assert 'NumPy' in caplog.text
+    assert dtc.resolve_engine(dtc.ENGINE_AUTO) == dtc.ENGINE_PYTHON
+    with pytest.raises(ValueError):
+        dtc.resolve_engine('fortran')
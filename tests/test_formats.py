@@ -0,0 +1,134 @@
+import io
+
+import pytest
+
+from DTC import dtl, load_version, stream
+
+PAYLOAD_COMPRESSIONS = [None, 'zlib', 'bz2', 'lzma:9']
+
+
+def test_binary_dtl_roundtrip(tmp_path):
+    dictionary = {'слово': b'\x01', 'два слова': b'\x02\x03', 'строка\nс переводом': b'\x04',
+                  'д' * 0x10000: b'\x05\x06\x07'}
+    counts = {word: i + 1 for i, word in enumerate(dictionary)}
+    path = tmp_path / 'a.dtl'
+    dtl.write_dictionary(path, dictionary, counts)
+
+    data = path.read_bytes()
+    assert data[5] & dtl.FLAG_WIDE_LENGTHS
+    reverse = {key: word for word, key in dictionary.items()}
+    assert dtl.read_dictionary_counts(data) == (reverse, [1, 2, 3, 4])
+    assert dtl.load_dictionary(path) == reverse
+
+
+def test_text_dtl_is_still_readable(tmp_path):
+    dictionary = {'слово': b'\x01', 'другое': b'\x02\x03'}
+    path = tmp_path / 'a.dtl'
+    dtl.export_text(path, dictionary)
+    assert dtl.load_dictionary(path) == {b'\x01': 'слово', b'\x02\x03': 'другое'}
+
+
+@pytest.mark.parametrize('version', ['DTC_v4.py', 'prof_dtc.py'])
+def test_file_codecs_with_binary_dtl(tmp_path, monkeypatch, corpus, version):
+    (tmp_path / 'txt').mkdir()
+    (tmp_path / 'txt' / 'a.txt').write_bytes(corpus)
+    monkeypatch.chdir(tmp_path)
+    codec = load_version(version).TextEncryptorDecryptor('a.txt')
+    codec.encrypt_file('dtc/a.dtc', 'dtc/a.dtl')
+    assert (tmp_path / 'dtc' / 'a.dtl').read_bytes().startswith(dtl.MAGIC)
+    codec.decrypt_file('dtc/a.dtc', 'decrypted/a.txt', 'dtc/a.dtl')
+    assert (tmp_path / 'decrypted' / 'a.txt').read_bytes() == corpus
+
+
+@pytest.mark.parametrize('layout', ['classic', 'escape'])
+@pytest.mark.parametrize('payload_compression', PAYLOAD_COMPRESSIONS)
+def test_container_roundtrip(dtc, corpus, layout, payload_compression):
+    session = dtc.CodecSession(layout=layout, compression='lzma', payload_compression=payload_compression)
+    container = session.encode(corpus)
+    assert container.startswith(dtc.CONTAINER_MAGIC)
+    assert session.decode(container) == corpus
+    # Контейнер самодостаточен: новая сессия восстанавливает его без словаря
+    assert dtc.CodecSession().decode(container) == corpus
+
+
+@pytest.mark.parametrize('native_codepage', [False, True])
+def test_container_restores_codepage(dtc, corpus, native_codepage):
+    text = corpus.decode('utf-8').encode('cp1251')
+    session = dtc.CodecSession(layout='escape', native_codepage=native_codepage)
+    assert session.decode(session.encode(text)) == text
+
+
+def test_escape_layout_restores_any_bytes(dtc, corpus):
+    data = bytes(range(256)) * 4 + corpus + b'\x00\xff\x00'
+    session = dtc.CodecSession(layout='escape', payload_compression='zlib')
+    assert session.decode(session.encode(data)) == data
+
+
+@pytest.mark.parametrize('layout', ['classic', 'escape'])
+def test_dtcs_stream_roundtrip(corpus, layout):
+    encoded = io.BytesIO()
+    frames = stream.encode_stream(io.BytesIO(corpus), encoded, frame_size=512, layout=layout,
+                                  payload_compression='zlib')
+    assert frames > 2
+    assert encoded.getvalue().startswith(stream.STREAM_MAGIC)
+
+    decoded = io.BytesIO()
+    assert stream.decode_stream(io.BytesIO(encoded.getvalue()), decoded) == frames
+    assert decoded.getvalue() == corpus
+    assert stream.verify_stream(io.BytesIO(encoded.getvalue())) == (frames, [])
+
+
+def test_dtcs_stream_truncated(corpus):
+    encoded = io.BytesIO()
+    stream.encode_stream(io.BytesIO(corpus), encoded, frame_size=512)
+    with pytest.raises(ValueError):
+        stream.decode_stream(io.BytesIO(encoded.getvalue()[:-20]), io.BytesIO())
+
+
+@pytest.mark.parametrize('frame_size', [0, -1])
+def test_dtcs_stream_rejects_empty_frames(corpus, frame_size):
+    with pytest.raises(ValueError):
+        stream.encode_stream(io.BytesIO(corpus), io.BytesIO(), frame_size=frame_size)
+
+
+def test_dtcs_container_size_is_limited(dtc, corpus):
+    single = dtc.CodecSession().encode(corpus)
+    assert list(stream.iter_containers(io.BytesIO(single), max_size=len(single))) == [single]
+    with pytest.raises(ValueError):
+        list(stream.iter_containers(io.BytesIO(single), max_size=len(single) - 1))
+
+    encoded = io.BytesIO()
+    stream.encode_stream(io.BytesIO(corpus), encoded, frame_size=512)
+    largest = max(len(frame) for frame in stream.iter_containers(io.BytesIO(encoded.getvalue())))
+    assert len(list(stream.iter_containers(io.BytesIO(encoded.getvalue()), max_size=largest))) > 2
+    with pytest.raises(ValueError):
+        list(stream.iter_containers(io.BytesIO(encoded.getvalue()), max_size=largest - 1))
+
+
+def test_prof_dtc_overflow_keys_roundtrip(tmp_path, monkeypatch):
+    codec = load_version('prof_dtc.py').TextEncryptorDecryptor('a.txt')
+    allowed = 0x100 - len(codec.FORBIDDEN_BYTES)
+    # Слов больше, чем однобайтовых ключей: редкие получают двухбайтовые
+    words = [f'слово{i}' for i in range(allowed * 3)]
+    text = ('\n'.join(' '.join(words[:i + 1]) for i in range(0, len(words), 50)) + '\n').encode('utf-8')
+    (tmp_path / 'txt').mkdir()
+    (tmp_path / 'txt' / 'a.txt').write_bytes(text)
+    monkeypatch.chdir(tmp_path)
+
+    codec.encrypt_file('dtc/a.dtc', 'dtc/a.dtl')
+    dictionary = dtl.load_dictionary('dtc/a.dtl')
+    assert {len(key) for key in dictionary} == {1, 2}
+    codec.decrypt_file('dtc/a.dtc', 'decrypted/a.txt', 'dtc/a.dtl')
+    assert (tmp_path / 'decrypted' / 'a.txt').read_bytes() == text
+
+
+def test_prof_dtc_table_decode_matches_bytewise(corpus):
+    codec = load_version('prof_dtc.py').TextEncryptorDecryptor('a.txt')
+    # Двадцать строк: различных слов меньше, чем однобайтовых ключей
+    text = ''.join(corpus.decode('utf-8').splitlines(keepends=True)[:20]) + '\xa0неразрывный\xa0пробел\n'
+    tokens = codec.get_words_and_separators(text)
+    dictionary = codec.create_dictionary(tokens)
+    assert all(len(key) == 1 for key in dictionary.values())
+    encrypted = bytes(codec.encode_tokens(tokens, dictionary))
+    reverse = {key: word for word, key in dictionary.items()}
+    assert codec.decode_bytes_table(encrypted, reverse) == codec.decode_bytes(encrypted, reverse) == ''.join(tokens)
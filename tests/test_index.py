@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from DTC import index
+
+
+def write_archive(dtc, path, text):
+    dtc.CodecSession(layout='classic').encode_to(text.encode('utf-8'), str(path))
+    return str(path)
+
+
+@pytest.fixture
+def archives(tmp_path, dtc):
+    """Папка с двумя контейнерами"""
+    folder = tmp_path / 'dtc'
+    folder.mkdir()
+    write_archive(dtc, folder / 'a.dtc', 'кот кот кот кот кот пёс\n')
+    write_archive(dtc, folder / 'b.dtc', 'кот кот мышь мышь мышь\n')
+    return folder
+
+
+@pytest.fixture
+def idx(tmp_path):
+    with index.Index(str(tmp_path / 'collection.idx')) as idx:
+        yield idx
+
+
+def test_lookup_order_and_counts(archives, idx):
+    assert idx.add([str(archives)], workers=1) == (2, 0, [])
+    a, b = str(archives / 'a.dtc'), str(archives / 'b.dtc')
+    # Сначала файлы, где слово чаще; rank - место слова по частоте в файле
+    assert idx.lookup('кот') == [(a, 5, 0), (b, 2, 1)]
+    assert idx.lookup('мышь') == [(b, 3, 0)]
+    assert idx.lookup('слон') == []
+
+
+def test_incremental_add(dtc, archives, idx):
+    assert idx.add([str(archives)], workers=1) == (2, 0, [])
+    assert idx.add([str(archives)], workers=1) == (0, 2, [])
+
+    path = write_archive(dtc, archives / 'b.dtc', 'слон слон кот\n')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert idx.add([str(archives)], workers=1) == (1, 1, [])
+    assert idx.lookup('мышь') == []
+    assert idx.lookup('слон') == [(path, 2, 0)]
+    assert [row[0] for row in idx.lookup('кот')] == [str(archives / 'a.dtc'), path]
+    assert len(idx) == 2
+
+
+def test_prune_deleted_files(archives, idx):
+    idx.add([str(archives)], workers=1)
+    os.remove(archives / 'a.dtc')
+    assert idx.prune() == [str(archives / 'a.dtc')]
+    assert len(idx) == 1
+    assert idx.lookup('кот') == [(str(archives / 'b.dtc'), 2, 1)]
+    assert idx.lookup('пёс') == []
+    assert idx.prune() == []
+
+
+def test_unreadable_archive_is_reported(archives, idx):
+    (archives / 'broken.dtc').write_bytes(b'not an archive')
+    indexed, skipped, errors = idx.add([str(archives)], workers=1)
+    assert (indexed, skipped) == (2, 0)
+    assert [path for path, _ in errors] == [str(archives / 'broken.dtc')]
@@ -0,0 +1,25 @@
+import logging
+
+import pytest
+
+from DTC import load_version
+
+VERSIONS = ['DTC_v1.0.py', 'DTC_v1.1.py', 'DTC_v1.2.py', 'DTC_v1.3.py']
+
+
+@pytest.mark.parametrize('filename', VERSIONS)
+def test_legacy_versions_log_through_module_logger(tmp_path, monkeypatch, caplog, corpus, filename):
+    module = load_version(filename)
+    (tmp_path / 'txt').mkdir()
+    (tmp_path / 'txt' / 'a.txt').write_bytes(corpus + 'слово\tслово\xa0'.encode('utf-8') * 50)
+    monkeypatch.chdir(tmp_path)
+
+    caplog.set_level(logging.DEBUG)
+    codec = module.TextEncryptorDecryptor('a.txt')
+    codec.encrypt_file('dtc/a.dtc', 'dtc/a.dtl')
+    codec.decrypt_file('dtc/a.dtc', 'decrypted/a.txt', 'dtc/a.dtl')
+
+    assert (tmp_path / 'decrypted' / 'a.txt').exists()
+    assert all(record.name == module.__name__ for record in caplog.records)
+    # Сообщения на каждый токен не пишутся даже на уровне DEBUG
+    assert len(caplog.records) < 10
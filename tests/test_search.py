@@ -0,0 +1,25 @@
+import pytest
+
+from DTC import search
+
+
+@pytest.mark.parametrize('layout', ['classic', 'escape'])
+def test_search_finds_words_in_curly_quotes(tmp_path, dtc, layout):
+    text = ('текст слово и\n' * 12 + 'он сказал “слово” и\n' * 3 + '“слово\n').encode('utf-8')
+    path = tmp_path / 'quotes.dtc'
+    session = dtc.CodecSession(layout=layout)
+    path.write_bytes(session.encode(text))
+
+    assert session.decode(path.read_bytes()) == text
+    assert len(search.search_file('слово', str(path))) == 16
+    assert len(search.search_file('сказал “слово”', str(path))) == 3
+
+
+@pytest.mark.parametrize('layout', ['classic', 'escape'])
+def test_search_respects_word_boundaries(tmp_path, dtc, layout):
+    text = 'слово словом пересловом “словом”\n'.encode('utf-8') * 5
+    path = tmp_path / 'words.dtc'
+    path.write_bytes(dtc.CodecSession(layout=layout).encode(text))
+
+    assert len(search.search_file('слово', str(path))) == 5
+    assert search.search_file('отсутствует', str(path)) == []
@@ -0,0 +1,47 @@
+import pytest
+
+from DTC import container
+
+INPUTS = [
+    'кот и пёс, кот и мышь\n' * 20,
+    'слон слон слон — «жираф»\n' * 15,
+    'Tabby cat and a dog; the cat again\n' * 10,
+]
+
+
+def dictionary_words(dtc, data):
+    """Слова из секции словаря контейнера"""
+    with container.ContainerReader(data) as reader:
+        decoder = dtc.AdvancedDecoder()
+        decoder.load_dictionary_data(reader.dictionary)
+        return set(decoder.escape_words or decoder.reverse_dict.values())
+
+
+@pytest.mark.parametrize('layout', ['classic', 'escape'])
+def test_session_reuse_matches_fresh_sessions(dtc, layout):
+    session = dtc.CodecSession(layout=layout)
+    # Кодировка меняется между вызовами: UTF-8, cp1251, снова UTF-8
+    sources = [INPUTS[0].encode('utf-8'), INPUTS[1].encode('cp1251'), INPUTS[2].encode('utf-8'),
+               INPUTS[0].encode('cp1251')]
+    containers = [session.encode(source) for source in sources]
+    for source, data in zip(sources, containers):
+        # Повторно использованная сессия дает тот же контейнер, что и новая
+        assert data == dtc.CodecSession(layout=layout).encode(source)
+        assert session.decode(data) == source
+
+    # Слова одного входа не попадают в словарь следующего
+    assert 'слон'.encode('utf-8') not in dictionary_words(dtc, containers[2])
+    assert 'кот'.encode('cp1251') not in dictionary_words(dtc, containers[1])
+    assert 'кот'.encode('utf-8') in dictionary_words(dtc, containers[0])
+
+
+def test_one_decoder_for_both_layouts(dtc):
+    classic, escape = dtc.CodecSession(layout='classic'), dtc.CodecSession(layout='escape')
+    decoder = dtc.CodecSession()
+    for text in INPUTS + INPUTS[::-1]:
+        source = text.encode('utf-8')
+        for encoder in (classic, escape):
+            assert decoder.decode(encoder.encode(source)) == source
+    # Словарь .dtc без контейнера не остается от предыдущего контейнера
+    with pytest.raises(ValueError):
+        decoder.decode(b'\x01\x02' + dtc.encoding_block('utf-8'))
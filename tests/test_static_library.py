@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from DTC import bench, daemon, load_version
+
+SAMPLES = {
+    'crlf': 'первая строка\r\nвторая  строка\r\n\r\n'.encode('utf-8'),
+    'cp1251': 'слово и ещё слово\n'.encode('cp1251'),
+    'mixed': 'слово \xff\xfe слово\n'.encode('utf-8') + b'\xff\x00 tail',
+}
+
+
+@pytest.fixture(scope='module')
+def static():
+    return load_version('DTC.py')
+
+
+@pytest.fixture
+def library(tmp_path, static):
+    words = ['слово', 'строка', 'первая', 'вторая', 'и', 'tail']
+    path = tmp_path / 'word_lib.dtl'
+    static.save_binary_library(words, static.generate_hex_codes(len(words)), str(path))
+    return str(path)
+
+
+def test_binary_library_roundtrip(static, library):
+    words = static.load_binary_library(library)
+    assert list(words) == ['слово', 'строка', 'первая', 'вторая', 'и', 'tail']
+    assert len(set(words.values())) == len(words)
+
+
+@pytest.mark.parametrize('name', sorted(SAMPLES))
+def test_binary_mode_restores_bytes(tmp_path, static, library, name):
+    source, encrypted, restored = tmp_path / 'a.txt', tmp_path / 'a.dtc', tmp_path / 'b.txt'
+    source.write_bytes(SAMPLES[name])
+    static.encrypt_file(str(source), str(encrypted), library, binary=True)
+    assert encrypted.read_bytes().startswith(static.BINARY_MAGIC)
+    static.decrypt_file(str(encrypted), str(restored), library)
+    assert restored.read_bytes() == SAMPLES[name]
+
+
+def test_daemon_matches_in_process(tmp_path, static, library):
+    server = daemon.CodecServer(str(tmp_path / 'dtc.sock'), [library])
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with daemon.Client(str(tmp_path / 'dtc.sock')) as client:
+            for name, data in SAMPLES.items():
+                source = tmp_path / f'{name}.txt'
+                source.write_bytes(data)
+                static.encrypt_file(str(source), str(tmp_path / 'local.dtc'), library, binary=True)
+                client.encrypt_file(str(source), str(tmp_path / 'remote.dtc'), library, binary=True)
+                assert (tmp_path / 'remote.dtc').read_bytes() == (tmp_path / 'local.dtc').read_bytes()
+                client.decrypt_file(str(tmp_path / 'remote.dtc'), str(tmp_path / 'back.txt'), library)
+                assert (tmp_path / 'back.txt').read_bytes() == data
+            assert client.metrics()['operations']['encode']['count'] == len(SAMPLES)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize('target', ['DTC.DTC', 'DTC.daemon'])
+def test_import_has_no_heavy_modules(target):
+    result, = bench.bench_imports([target], repeat=1)
+    assert 'error' not in result and result['heavy'] == '-'
@@ -0,0 +1,43 @@
+import pytest
+
+from DTC import stats
+
+TEXTS = {
+    'a.dtc': 'кот кот кот пёс пёс мышь\n',
+    'b.dtc': 'кот пёс пёс пёс пёс слон\n',
+    'c.dtc': 'кот мышь мышь\n',
+}
+
+
+@pytest.fixture
+def archives(tmp_path, dtc):
+    for name, text in TEXTS.items():
+        dtc.CodecSession(layout='classic').encode_to(text.encode('utf-8'), str(tmp_path / name))
+    return tmp_path
+
+
+def test_top_and_document_frequency(archives):
+    result = stats.corpus_stats([str(archives)], top=3, workers=1, per_document=True)
+    assert result.documents == 3 and result.documents_without_counts == 0
+    assert result.tokens == 15
+    assert result.vocabulary_size == 4
+    # (слово, частота, число документов); при равной частоте выше слово из большего числа документов
+    assert result.top == [('пёс', 6, 2), ('кот', 5, 3), ('мышь', 3, 2)]
+    first = result.per_document[0]
+    assert first.path.endswith('a.dtc') and first.top[:2] == [('кот', 3), ('пёс', 2)]
+
+
+def test_spilled_run_matches_in_memory(archives, monkeypatch):
+    in_memory = stats.corpus_stats([str(archives)], top=10, workers=1, per_document=True)
+
+    spills = []
+    spill = stats._SpillingCounter.spill
+
+    def counting_spill(counter):
+        spills.append(len(counter.terms))
+        spill(counter)
+    monkeypatch.setattr(stats._SpillingCounter, 'spill', counting_spill)
+    spilled = stats.corpus_stats([str(archives)], top=10, workers=1, per_document=True, max_terms=1,
+                                 temp_dir=str(archives))
+    assert len(spills) == 3
+    assert spilled.as_dict() == in_memory.as_dict()
@@ -0,0 +1,42 @@
+import pytest
+
+from DTC import decrypt_dtc, encript_dtc
+from DTC.encript_dtc import CODE_ALPHABET, CodeSequence
+
+
+def test_code_sequence_length_and_indexing():
+    base = len(CODE_ALPHABET)
+    codes = CodeSequence(base + base * base + 3)
+    assert len(codes) == base + base * base + 3
+    assert codes[0] == 'a' and codes[base - 1] == '9'
+    assert codes[base] == 'aa' and codes[base + 1] == 'ab'
+    assert codes[base + base * base] == 'aaa'
+    assert codes[-1] == 'aac'
+    assert codes[base - 2:base + 1] == ['8', '9', 'aa']
+    with pytest.raises(IndexError):
+        codes[len(codes)]
+    with pytest.raises(IndexError):
+        codes[-len(codes) - 1]
+    # Перебор и доступ по номеру дают одну и ту же последовательность без повторов
+    assert list(codes) == [codes[i] for i in range(len(codes))]
+    assert len(set(codes)) == len(codes)
+
+
+def test_scripts_share_code_sequence():
+    assert decrypt_dtc.CodeSequence is encript_dtc.CodeSequence
+    assert list(decrypt_dtc.generate_codes(100)) == list(encript_dtc.generate_codes(100))
+
+
+def test_text_mode_roundtrip():
+    text = 'кот и пёс, кот!\nпёс и кот\n' * 3
+    words = [token.strip() for token in encript_dtc.split_into_words(encript_dtc.sanitize_text(text))]
+    word_dict, reverse_dict = encript_dtc.create_word_dictionary([word for word in words if word])
+    assert decrypt_dtc.create_word_dictionary([word for word in words if word]) == (word_dict, reverse_dict)
+    assert word_dict['кот'] == 'a'  # самое частое слово - самый короткий код
+    assert {reverse_dict[code]: code for code in reverse_dict} == word_dict
+
+    encrypted = encript_dtc.encrypt_text(text, word_dict)
+    assert 'кот' not in encrypted
+    # Текстовый режим не хранит пробельные символы: восстанавливаются слова и знаки
+    expected = ''.join(encript_dtc.sanitize_text(text).split())
+    assert decrypt_dtc.decrypt_text(encrypted, reverse_dict) == expected
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from DTC import load_version, verify
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch, corpus):
+    """Папка с txt/ как у AdvancedEncoder.encrypt_file"""
+    (tmp_path / 'txt').mkdir()
+    (tmp_path / 'txt' / 'a.txt').write_bytes(corpus)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize('layout', ['classic', 'escape'])
+def test_plain_dtc_carries_digest(dtc, workdir, layout):
+    encoder = dtc.AdvancedEncoder('a.txt', layout=layout)
+    assert encoder.encrypt_file('a.dtc', 'a.dtl')
+
+    assert verify.verify_file('a.dtc') is None
+    actual, stored = dtc.AdvancedDecoder().digest_file('a.dtc', 'a.dtl')
+    assert actual == stored == verify.file_digest('txt/a.txt')
+
+    data = bytearray((workdir / 'a.dtc').read_bytes())
+    data[-dtc.ENCODING_BLOCK_SIZE - 1] ^= 0xFF  # последний байт хеша
+    (workdir / 'a.dtc').write_bytes(data)
+    assert 'хеш не совпадает' in verify.verify_file('a.dtc')
+
+
+def test_legacy_trailer_without_digest(dtc, workdir):
+    assert dtc.AdvancedEncoder('a.txt').encrypt_file('a.dtc', 'a.dtl')
+    data = (workdir / 'a.dtc').read_bytes()
+    payload = data[:-dtc.ENCODING_BLOCK_SIZE - dtc.DIGEST_SIZE]
+    (workdir / 'a.dtc').write_bytes(payload + b'utf-8'.ljust(dtc.ENCODING_BLOCK_SIZE, b'\x00'))
+
+    decoder = dtc.AdvancedDecoder()
+    decrypted, encoding, header = decoder.decrypt_archive('a.dtc', 'a.dtl')
+    assert bytes(decrypted) == (workdir / 'txt' / 'a.txt').read_bytes()
+    assert encoding == 'utf-8' and header == {}
+    assert 'нет хеша' in verify.verify_file('a.dtc')
+    assert verify.verify_file('a.dtc', originals='txt') is None
+
+
+@pytest.mark.parametrize('layout', ['classic', 'escape'])
+def test_digest_is_streamed_in_chunks(dtc, corpus, layout):
+    text = corpus.decode('utf-8').encode('cp1251')  # с перекодировкой при выводе
+    session = dtc.CodecSession(layout=layout)
+    container = session.encode(text)
+
+    decoder = session.decoder
+    payload, encoding, header = decoder.open_archive(container)
+    method = decoder.iter_data_escape if layout == 'escape' else decoder.iter_data
+    data = payload[len(dtc.ESCAPE_MAGIC):] if layout == 'escape' else payload
+    pieces = list(method(data, chunk_size=64))
+    assert len(pieces) > 10
+    assert dtc.collect(pieces) == decoder.decrypt_payload(payload)
+
+    actual, stored = session.digest(container)
+    assert actual == stored == dtc.format_digest(dtc.new_digest(text))
+
+
+def test_verify_files_compares_text(tmp_path, monkeypatch):
+    module = load_version('DTC.py')
+    original, decrypted = tmp_path / 'txt', tmp_path / 'decrypted'
+    original.mkdir()
+    decrypted.mkdir()
+    (original / 'a.txt').write_bytes('строка\r\nещё\r\n'.encode('utf-8'))
+    (decrypted / 'a.txt').write_bytes('строка\nещё\n'.encode('utf-8'))
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError('пул процессов для одной пары не нужен')
+    monkeypatch.setattr('concurrent.futures.ProcessPoolExecutor', no_pool)
+    assert module.verify_files(str(original), str(decrypted))
+
+    (decrypted / 'a.txt').write_bytes('строка\nещё!\n'.encode('utf-8'))
+    assert not module.verify_files(str(original), str(decrypted))
+    os.remove(decrypted / 'a.txt')
+    assert not module.verify_files(str(original), str(decrypted))
+
+
+def test_text_digest_normalizes_newlines_only(tmp_path):
+    crlf, lf = tmp_path / 'crlf.txt', tmp_path / 'lf.txt'
+    crlf.write_bytes('да\r\nнет\r\n'.encode('cp1251'))
+    lf.write_bytes('да\nнет\n'.encode('cp1251'))
+    assert verify.file_digest(str(crlf), text=True) == verify.file_digest(str(lf), text=True)
+    assert verify.file_digest(str(crlf)) != verify.file_digest(str(lf))
+    lf.write_bytes('да\nнёт\n'.encode('cp1251'))
+    assert verify.file_digest(str(crlf), text=True) != verify.file_digest(str(lf), text=True)
@@ -0,0 +1,53 @@
+import pytest
+
+from DTC import load_version, vocabulary
+
+TEXT = 'кот кот кот пёс. кот, кот\nпёс и мышь\n'.encode('utf-8')
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Папка с txt/ как у шифровальщиков из файлов"""
+    (tmp_path / 'txt').mkdir()
+    (tmp_path / 'txt' / 'a.txt').write_bytes(TEXT)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_container(dtc, workdir):
+    dtc.CodecSession(layout='classic').encode_to('txt/a.txt', 'a.dtc')
+    words = vocabulary.read_vocabulary('a.dtc')
+    assert words.path == 'a.dtc'
+    assert list(words.items())[:2] == [('кот', 0, 5), ('пёс', 1, 2)]
+    assert set(words.words) == {'кот', 'пёс', 'и', 'мышь'}
+
+
+@pytest.mark.parametrize('layout', ['classic', 'escape'])
+def test_dtc_and_dtl_pair(dtc, workdir, layout):
+    assert dtc.AdvancedEncoder('a.txt', layout=layout).encrypt_file('a.dtc', 'a.dtl')
+    by_archive = vocabulary.read_vocabulary('a.dtc')
+    by_dictionary = vocabulary.read_vocabulary('a.dtl')
+    assert by_dictionary.path == by_archive.path == 'a.dtc'
+    assert list(by_dictionary.items()) == list(by_archive.items())
+    assert list(by_archive.items())[0] == ('кот', 0, 5)
+    # Разделители escape-словаря в список слов не попадают
+    assert all(word.strip(' .,\n') == word for word in by_archive.words)
+
+
+def test_dtc_pair_in_native_codepage(dtc, workdir):
+    (workdir / 'txt' / 'a.txt').write_bytes(TEXT.decode('utf-8').encode('cp1251'))
+    encoder = dtc.AdvancedEncoder('a.txt', native_codepage=True)
+    assert encoder.encrypt_file('a.dtc', 'a.dtl')
+    assert list(vocabulary.read_vocabulary('a.dtc').items())[0] == ('кот', 0, 5)
+
+
+def test_binary_dtl(workdir):
+    load_version('DTC_v4.py').TextEncryptorDecryptor('a.txt').encrypt_file('dtc/a.dtc', 'dtc/a.dtl')
+    words = vocabulary.read_vocabulary('dtc/a.dtl')
+    assert words.path == 'dtc/a.dtc'
+    assert words.counts is not None
+    counts = dict(zip(words.words, words.counts))
+    # DTC_v4 режет текст только по пробельным символам: пунктуация остается в слове
+    assert counts['кот'] == 4 and counts['кот,'] == 1 and counts['пёс.'] == 1
+    assert words.words[0] == 'кот'
+    assert words.counts == sorted(words.counts, reverse=True)